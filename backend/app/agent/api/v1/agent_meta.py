@@ -1,41 +1,68 @@
 
 
-from fastapi import APIRouter, File, UploadFile
+from fastapi import APIRouter, File, Request, Response, UploadFile
 
 from backend.app.agent.schema.agent_meta import CreateAgentParam, GetAgentMetaDetail
 from backend.app.agent.service.agent_meta_service import agent_meta_service
+from backend.common.exception import errors
+from backend.common.pagination import CursorPageData, DependsCursorParams
+from backend.common.response.response_code import CustomResponse
 from backend.common.response.response_schema import ResponseModel, ResponseSchemaModel, response_base
-from backend.database.db import CurrentSession, CurrentSessionTransaction
+from backend.database.db import CurrentReadSession, CurrentSessionTransaction
+from backend.utils.etag import etag_matches, make_etag, not_modified, row_etag
 
 router = APIRouter()
 
 
 @router.get("/all", summary="获取所有智能体元数据")
 async def get_all_agent_meta(
-    db: CurrentSession
+    request: Request, db: CurrentReadSession
 ) -> ResponseSchemaModel[list[GetAgentMetaDetail]]:
     """获取所有智能体元数据"""
-    agent_meta_list = await agent_meta_service.get_all(db=db)
-    return response_base.success(data=agent_meta_list)
+    etag = make_etag(await agent_meta_service.get_version(db=db))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    items = await agent_meta_service.get_all(db=db)
+    return response_base.fast_success(data=items, schema=list[GetAgentMetaDetail], etag=etag)
+
+
+@router.get("/page", summary="游标分页获取智能体元数据")
+async def get_agent_meta_page(
+    request: Request, db: CurrentReadSession, params: DependsCursorParams
+) -> ResponseSchemaModel[CursorPageData[GetAgentMetaDetail]]:
+    """游标分页获取智能体元数据"""
+    etag = make_etag(await agent_meta_service.get_version(db=db), params.cursor, params.size)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    page = await agent_meta_service.get_page(db=db, params=params)
+    return response_base.fast_success(data=page, schema=CursorPageData[GetAgentMetaDetail], etag=etag)
 
 
 @router.get("/{pk}", summary="获取智能体元数据详情")
 async def get_agent_meta_by_id(
-    db: CurrentSession, pk: int
+    request: Request, db: CurrentReadSession, pk: int
 ) -> ResponseSchemaModel[GetAgentMetaDetail]:
     """获取智能体元数据详情"""
     agent_meta = await agent_meta_service.get(db=db, pk=pk)
-    return response_base.success(data=agent_meta)
+    etag = row_etag(agent_meta)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return response_base.fast_success(data=agent_meta, schema=GetAgentMetaDetail, etag=etag)
 
 
 @router.post("/create", summary="创建智能体元数据")
 async def create_agent_meta(
     db: CurrentSessionTransaction,
+    response: Response,
     obj: CreateAgentParam,
     file: UploadFile = File(default=...)
 ) -> ResponseModel:
-    """创建智能体元数据"""
-    await agent_meta_service.create(db=db, obj=obj, file=file)
+    """创建智能体元数据, 压缩包校验失败时返回 400 及各文件的校验结果"""
+    try:
+        await agent_meta_service.create(db=db, obj=obj, file=file)
+    except errors.ZipError as e:
+        response.status_code = e.code
+        return response_base.fail(res=CustomResponse(code=e.code, msg=e.msg), data=e.data)
     return response_base.success()
 
 
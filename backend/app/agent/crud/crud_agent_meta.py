@@ -1,10 +1,15 @@
 from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
 
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy_crud_plus import CRUDPlus
 
 from backend.app.agent.model.agent_meta import AgentMeta
 from backend.app.agent.schema.agent_meta import CreateAgentInternal
+from backend.common.crud import table_version
+from backend.common.pagination import CursorParams, paginate_by_cursor
 
 
 class CRUDAgentMeta(CRUDPlus[AgentMeta]):
@@ -18,6 +23,18 @@ class CRUDAgentMeta(CRUDPlus[AgentMeta]):
         """获取所有智能体元数据"""
         return await self.select_models(db)
 
+    async def get_page(self, db: AsyncSession, params: CursorParams) -> dict[str, Any]:
+        """游标分页获取智能体元数据"""
+        return await paginate_by_cursor(db, select(AgentMeta), AgentMeta.id, params)
+
+    async def get_version(self, db: AsyncSession) -> tuple[int, int | None, datetime | None]:
+        """查询智能体元数据版本"""
+        return await table_version(db, AgentMeta.id)
+
+    async def get_by_sha256(self, db: AsyncSession, sha256: str) -> AgentMeta | None:
+        """根据文件摘要获取任一引用该文件的智能体元数据"""
+        return await self.select_model_by_column(db, sha256=sha256)
+
     async def create(self, db: AsyncSession, obj: CreateAgentInternal) -> None:
         """创建智能体元数据"""
         await self.create_model(db, obj, flush=True)
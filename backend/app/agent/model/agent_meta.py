@@ -19,4 +19,7 @@ class AgentMeta(Base):
         sa.ARRAY(sa.String(64)), comment="支持的环境模板列表"
     )
     url: Mapped[str] = mapped_column(sa.String(128), comment="智能体下载路径")
+    sha256: Mapped[str | None] = mapped_column(
+        sa.String(64), nullable=True, index=True, comment="智能体文件 SHA-256 摘要"
+    )
 
@@ -24,6 +24,7 @@ class CreateAgentInternal(AgentSchemaBase):
 
     load: str = Field(description="智能体加载名称")
     url: str = Field(description="智能体文件存储路径")
+    sha256: str = Field(description="智能体文件 SHA-256 摘要")
 
 
 class GetAgentMetaDetail(AgentSchemaBase):
@@ -32,6 +33,8 @@ class GetAgentMetaDetail(AgentSchemaBase):
     model_config = ConfigDict(from_attributes=True)
 
     id: int = Field(description="智能体 ID")
+    url: str = Field(description="智能体文件存储路径")
+    sha256: str | None = Field(None, description="智能体文件 SHA-256 摘要, 升级前创建的智能体为空")
     create_at: datetime = Field(description="创建时间")
     update_at: datetime | None = Field(None, description="更新时间")
 
@@ -1,14 +1,18 @@
-import zipfile
+import asyncio
 from collections.abc import Sequence
-from io import BytesIO
+from datetime import datetime
+from typing import Any
 
 from fastapi import UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
 from backend.app.agent.crud.crud_agent_meta import agent_meta_dao
 from backend.app.agent.model.agent_meta import AgentMeta
 from backend.app.agent.schema.agent_meta import CreateAgentInternal, CreateAgentParam
 from backend.common.exception import errors
+from backend.common.pagination import CursorParams
+from backend.utils.file_ops import spool_upload_file, verify_zip_file
 from backend.utils.snowflake import snowflake
 from backend.utils.upload import minio_uploader
 
@@ -29,45 +33,70 @@ class AgentMetaService:
         agent_metas = await agent_meta_dao.get_all(db)
         return agent_metas
 
+    @staticmethod
+    async def get_page(*, db: AsyncSession, params: CursorParams) -> dict[str, Any]:
+        """游标分页获取智能体元数据"""
+        return await agent_meta_dao.get_page(db, params)
+
+    @staticmethod
+    async def get_version(*, db: AsyncSession) -> tuple[int, int | None, datetime | None]:
+        """获取智能体元数据版本, 用于生成集合 ETag"""
+        return await agent_meta_dao.get_version(db)
+
     @staticmethod
     async def create(*, db: AsyncSession, obj: CreateAgentParam, file: UploadFile) -> None:
         """创建智能体
 
-        1. 文件校验，上传
+        1. 文件校验，上传(按 SHA-256 内容寻址, 已有记录的文件不再重复上传)
         2. 结果写入数据库
         """
         # 1. 文件校验，上传
         if not file.filename.endswith(".zip"):
             raise errors.ZipError(msg="智能体文件必须为 zip 格式")
 
-        contents = await file.read()
-        try:
-            with zipfile.ZipFile(BytesIO(contents)) as zf:
-                if zf.testzip():
-                    raise errors.ZipError(msg="智能体文件压缩包损坏")
-        except zipfile.BadZipFile:
-            raise errors.ZipError(msg="智能体文件压缩包损坏")
+        async with spool_upload_file(file, suffix=".zip") as spooled:
+            object_name = f"{spooled.sha256}.zip"
+            # 只信任已提交的数据库记录; 存储中无记录对应的对象可能来自校验失败、正在删除的上传
+            existing = await agent_meta_dao.get_by_sha256(db, spooled.sha256)
+            if existing:
+                url = existing.url
+            else:
+                url = await AgentMetaService._verify_and_upload(spooled.path, object_name)
 
-        # 上传文件到 minio
-        unique_id = snowflake.generate()
-        file_load_name = f"{unique_id}_{obj.load}.zip"
-        url = minio_uploader.upload_file(
-            file_data=contents,
-            object_name=file_load_name,
-            content_type="application/zip",
-        )
         # 2. 结果写入数据库
+        unique_id = snowflake.generate()
         agent = CreateAgentInternal(
             name=obj.name,
-            load=file_load_name.split(".")[0],
+            load=f"{unique_id}_{obj.load}",
             side=obj.side,
             param_schema=obj.param_schema,
             description=obj.description,
             supported_env_templates=obj.supported_env_templates,
             url=url,
+            sha256=spooled.sha256,
         )
         await agent_meta_dao.create(db, agent)
 
+    @staticmethod
+    async def _verify_and_upload(path: str, object_name: str) -> str:
+        """校验与分片上传并行进行, 校验失败时删除已上传的对象"""
+        verify_result, upload_result = await asyncio.gather(
+            run_in_threadpool(verify_zip_file, path),
+            minio_uploader.upload_local_file(
+                object_name=object_name,
+                file_path=path,
+                content_type="application/zip",
+            ),
+            return_exceptions=True,
+        )
+        if isinstance(verify_result, BaseException):
+            if not isinstance(upload_result, BaseException):
+                await minio_uploader.delete_file(object_name)
+            raise verify_result
+        if isinstance(upload_result, BaseException):
+            raise upload_result
+        return upload_result
+
     @staticmethod
     async def delete(*, db: AsyncSession, pk: int) -> int:
         """删除智能体"""
@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+
+from backend.app.deduction.api.v1.task_log import router as task_log_router
+from backend.app.deduction.api.v1.task_status import router as task_status_router
+from backend.app.deduction.api.v1.workflow import router as workflow_router
+from backend.core.conf import settings
+
+v1 = APIRouter(prefix=f"{settings.FAST_API_V1_PATH}/deduction", tags=["推演任务"])
+
+v1.include_router(task_log_router, prefix="/task-log")
+v1.include_router(task_status_router, prefix="/task-status")
+v1.include_router(workflow_router, prefix="/workflow")
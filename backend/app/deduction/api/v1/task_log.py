@@ -0,0 +1,173 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import aclosing
+
+from fastapi import APIRouter, Query, Request, WebSocket, status
+from sqlalchemy import RowMapping
+from starlette.responses import StreamingResponse
+
+from backend.app.deduction.schema.task_log import IngestTaskLogResult, TaskLogBufferStats
+from backend.app.deduction.service.task_log_service import task_log_service
+from backend.app.deduction.service.task_log_stream_service import task_log_hub
+from backend.common.response.response_code import StandardResponseCode
+from backend.common.response.response_schema import ResponseSchemaModel, response_base
+from backend.core.conf import settings
+from backend.utils.serializers import encode_json
+
+router = APIRouter()
+
+_record_schema = {
+    "type": "object",
+    "required": ["task_id", "suffix", "type", "level", "content"],
+    "properties": {
+        "task_id": {"type": "integer"},
+        "suffix": {"type": "integer"},
+        "type": {"type": "string", "enum": ["log", "event", "echart"]},
+        "level": {"type": "string", "enum": ["info", "warning", "error", "critical"]},
+        "content": {"type": "string"},
+    },
+}
+
+
+@router.post(
+    "/ingest",
+    summary="批量写入推演任务日志",
+    status_code=StandardResponseCode.HTTP_202,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/x-ndjson": {"schema": {"type": "string", "description": "每行一个日志对象"}},
+                "application/json": {"schema": {"type": "array", "items": _record_schema}},
+                "application/msgpack": {"schema": {"type": "array", "items": _record_schema}},
+            },
+        }
+    },
+)
+async def ingest_task_logs(request: Request) -> ResponseSchemaModel[IngestTaskLogResult]:
+    """
+    批量写入推演任务日志, 请求体为 NDJSON、JSON 数组或 msgpack 数组
+
+    日志先进入内存缓冲区, 由后台任务批量写库; 缓冲区已满时返回 429 与 Retry-After
+    """
+    body = await request.body()
+    accepted = task_log_service.ingest(request.headers.get("content-type", ""), body)
+    return response_base.success(
+        data=IngestTaskLogResult(accepted=accepted, buffered=task_log_service.buffer.buffered)
+    )
+
+
+@router.get("/ingest/stats", summary="获取推演任务日志缓冲区统计")
+async def get_task_log_buffer_stats() -> ResponseSchemaModel[TaskLogBufferStats]:
+    """获取当前 worker 的日志缓冲区与写库统计"""
+    return response_base.success(data=task_log_service.buffer.stats())
+
+
+def _resume_id(header: str | None, query: int | None) -> int | None:
+    """Last-Event-ID 请求头优先, 其次为查询参数 (EventSource 首次连接无法设置请求头)"""
+    if header and header.strip().isdigit():
+        return int(header)
+    return query
+
+
+async def _cancel(task: asyncio.Future) -> None:
+    """取消并等待读取结束, 之后才能关闭对应的异步生成器"""
+    task.cancel()
+    try:
+        await task
+    except (asyncio.CancelledError, StopAsyncIteration):
+        pass
+
+
+async def _with_heartbeat(stream: AsyncIterator[list[RowMapping]]) -> AsyncIterator[list[RowMapping] | None]:
+    """转发日志批次, 空闲超过心跳间隔时产出 None; 等待超时不取消进行中的读取, 避免中断订阅; 订阅结束时随之结束"""
+    pending = asyncio.ensure_future(anext(stream))
+    try:
+        while True:
+            done, _ = await asyncio.wait({pending}, timeout=settings.TASK_LOG_STREAM_HEARTBEAT)
+            if not done:
+                yield None
+                continue
+            try:
+                rows = pending.result()
+            except StopAsyncIteration:
+                return
+            yield rows
+            pending = asyncio.ensure_future(anext(stream))
+    finally:
+        await _cancel(pending)
+        await stream.aclose()
+
+
+def _format_events(rows: list[RowMapping]) -> bytes:
+    return b"".join(
+        b"id: %d\nevent: %s\ndata: %s\n\n" % (row["id"], row["type"].value.encode(), encode_json(dict(row)))
+        for row in rows
+    )
+
+
+async def _sse_stream(task_id: int, suffix: int | None, last_id: int | None) -> AsyncIterator[bytes]:
+    yield b"retry: 3000\n\n"
+    # 显式关闭, 连接断开时立即退订
+    async with aclosing(_with_heartbeat(task_log_hub.subscribe(task_id, suffix=suffix, last_id=last_id))) as events:
+        async for rows in events:
+            yield b": ping\n\n" if rows is None else _format_events(rows)
+
+
+@router.get("/{task_id}/stream", summary="实时订阅推演任务日志 (SSE)")
+async def stream_task_logs(
+    request: Request,
+    task_id: int,
+    suffix: int | None = Query(None, description="合成ID后缀, 为空时订阅任务的全部日志"),
+    last_event_id: int | None = Query(None, description="已收到的最后一条日志 ID, 0 表示从头开始"),
+) -> StreamingResponse:
+    """
+    以 Server-Sent Events 推送任务的新日志, 事件 id 为日志 ID, 事件类型为消息类型 (log / event / echart)
+
+    断线重连时按 Last-Event-ID 从数据库补齐之后的日志, 再接续实时推送
+    """
+    last_id = _resume_id(request.headers.get("last-event-id"), last_event_id)
+    return StreamingResponse(
+        _sse_stream(task_id, suffix, last_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/{task_id}/ws")
+async def stream_task_logs_ws(
+    websocket: WebSocket,
+    task_id: int,
+    suffix: int | None = None,
+    last_event_id: int | None = None,
+) -> None:
+    """以 WebSocket 推送任务的新日志, 每条消息为一批日志的 JSON 数组, 断线重连时通过 last_event_id 续传"""
+    await websocket.accept()
+    # 客户端消息仅用于感知断开
+    receiver = asyncio.ensure_future(websocket.receive())
+    stream = _with_heartbeat(task_log_hub.subscribe(task_id, suffix=suffix, last_id=last_event_id))
+    pending: asyncio.Future | None = None
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(anext(stream))
+            done, _ = await asyncio.wait({pending, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver in done:
+                if receiver.result()["type"] == "websocket.disconnect":
+                    return
+                receiver = asyncio.ensure_future(websocket.receive())
+                continue
+            try:
+                rows = pending.result()
+            except StopAsyncIteration:
+                # 服务停止, 通知客户端稍后重连
+                await websocket.close(code=status.WS_1012_SERVICE_RESTART)
+                return
+            pending = None
+            if rows is not None:
+                await websocket.send_text(encode_json([dict(row) for row in rows]).decode())
+    finally:
+        if pending is not None:
+            await _cancel(pending)
+        receiver.cancel()
+        await stream.aclose()
@@ -0,0 +1,39 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Body, Request
+
+from backend.app.deduction.schema.task_status import (
+    TaskStatusSnapshot,
+    UpdateTaskStatusParam,
+    UpdateTaskStatusResult,
+)
+from backend.app.deduction.service.task_status_service import task_status_registry
+from backend.common.response.response_schema import ResponseModel, ResponseSchemaModel, response_base
+from backend.utils.etag import etag_matches, make_etag, not_modified
+
+router = APIRouter()
+
+
+@router.post("/update", summary="批量上报推演任务状态")
+async def update_task_status(
+    objs: Annotated[list[UpdateTaskStatusParam], Body(min_length=1, max_length=10000)],
+) -> ResponseSchemaModel[UpdateTaskStatusResult]:
+    """上报推演任务状态, 写入内存后立即返回, 由后台任务批量写库; 与当前状态相同的上报被合并"""
+    changed = task_status_registry.update_many(objs)
+    return response_base.success(data=UpdateTaskStatusResult(received=len(objs), changed=changed))
+
+
+@router.get("/stats", summary="获取推演任务状态注册表统计")
+async def get_task_status_stats() -> ResponseModel:
+    """获取当前 worker 的状态注册表统计"""
+    return response_base.success(data=task_status_registry.stats())
+
+
+@router.get("/{deduce_id}", summary="获取推演方案下所有任务状态")
+async def get_task_status_snapshot(request: Request, deduce_id: int) -> ResponseSchemaModel[TaskStatusSnapshot]:
+    """从内存返回推演方案下所有任务状态的一致快照, 快照版本未变化时返回 304"""
+    snapshot = await task_status_registry.snapshot(deduce_id)
+    etag = make_etag(task_status_registry.token, deduce_id, snapshot.revision)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return response_base.fast_success(data=snapshot, schema=TaskStatusSnapshot, etag=etag)
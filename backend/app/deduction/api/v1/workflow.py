@@ -0,0 +1,25 @@
+from fastapi import APIRouter
+
+from backend.app.deduction.schema.deduction_plan import RunWorkflowResult
+from backend.app.deduction.service.workflow_service import workflow_service
+from backend.common.exception import errors
+from backend.common.response.response_code import StandardResponseCode
+from backend.common.response.response_schema import ResponseModel, ResponseSchemaModel, response_base
+from backend.database.db import CurrentSession
+
+router = APIRouter()
+
+
+@router.post("/{deduce_id}/run", summary="执行推演方案工作流")
+async def run_workflow(db: CurrentSession, deduce_id: int) -> ResponseSchemaModel[RunWorkflowResult]:
+    """按推演方案的 task_config 在后台执行工作流, 节点状态可通过任务状态接口查询; 同一推演方案同时只能执行一次"""
+    graph = await workflow_service.run(db=db, deduce_id=deduce_id)
+    return response_base.success(data=RunWorkflowResult(deduce_id=deduce_id, nodes=len(graph.nodes)))
+
+
+@router.post("/{deduce_id}/cancel", summary="停止推演方案工作流")
+async def cancel_workflow(deduce_id: int) -> ResponseModel:
+    """停止执行中的工作流, 未结束的节点标记为已停止"""
+    if not await workflow_service.cancel(deduce_id=deduce_id):
+        raise errors.HTTPError(code=StandardResponseCode.HTTP_404, msg="推演方案没有执行中的工作流")
+    return response_base.success()
@@ -0,0 +1,15 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy_crud_plus import CRUDPlus
+
+from backend.app.deduction.model.deduction_plan import DeductionPlan
+
+
+class CRUDDeductionPlan(CRUDPlus[DeductionPlan]):
+    """推演方案数据库操作类"""
+
+    async def get(self, db: AsyncSession, pk: int) -> DeductionPlan | None:
+        """获取推演方案"""
+        return await self.select_model(db, pk)
+
+
+deduction_plan_dao: CRUDDeductionPlan = CRUDDeductionPlan(DeductionPlan)
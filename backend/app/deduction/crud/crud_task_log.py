@@ -0,0 +1,123 @@
+from collections.abc import Sequence
+
+from sqlalchemy import RowMapping, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy_crud_plus import CRUDPlus
+
+from backend.app.deduction.model.task_log import TaskLog
+from backend.app.deduction.schema.task_log import TaskLogRecord
+from backend.utils.snowflake import snowflake
+from backend.utils.timezone import timezone
+
+# COPY / INSERT 写入的列, 顺序与 _to_row 一致
+_COLUMNS = ("id", "task_id", "suffix", "content", "type", "level", "create_at")
+# 实时推送读取的列
+_STREAM_COLUMNS = (
+    TaskLog.id,
+    TaskLog.task_id,
+    TaskLog.suffix,
+    TaskLog.type,
+    TaskLog.level,
+    TaskLog.content,
+    TaskLog.create_at,
+)
+# 单条多行 INSERT 的参数上限, asyncpg 与 SQLite 均不超过 32767
+_MAX_PARAMS = 32767
+
+
+class CRUDTaskLog(CRUDPlus[TaskLog]):
+    """推演任务日志数据库操作类"""
+
+    async def bulk_create(self, db: AsyncSession, records: Sequence[TaskLogRecord], *, use_copy: bool) -> int:
+        """
+        批量写入推演任务日志, 主键由雪花算法批量生成, 不构造 ORM 对象
+
+        PostgreSQL (asyncpg) 且 use_copy 为 True 时使用 COPY, 否则按参数上限分块发出多行 INSERT
+
+        :param db: 数据库会话
+        :param records: 待写入的日志
+        :param use_copy: 是否优先使用 COPY
+        :return: 写入的条数
+        """
+        if not records:
+            return 0
+        ids = snowflake.generate_batch(len(records))
+        now = timezone.now()
+        rows = [
+            (pk, r.task_id, r.suffix, r.content, r.type.name, r.level.name, now)
+            for pk, r in zip(ids, records, strict=True)
+        ]
+        if use_copy and db.bind.dialect.driver == "asyncpg":
+            conn = await db.connection()
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                self.model.__tablename__, records=rows, columns=_COLUMNS
+            )
+            return len(rows)
+
+        chunk_size = _MAX_PARAMS // len(_COLUMNS)
+        for start in range(0, len(rows), chunk_size):
+            values = [dict(zip(_COLUMNS, row, strict=True)) for row in rows[start : start + chunk_size]]
+            await db.execute(insert(TaskLog).values(values))
+        return len(rows)
+
+
+    async def get_after(
+        self,
+        db: AsyncSession,
+        task_id: int,
+        after_id: int,
+        *,
+        suffix: int | None = None,
+        until_id: int | None = None,
+        limit: int,
+    ) -> Sequence[RowMapping]:
+        """
+        按主键顺序获取指定任务中 ID 大于 after_id 的日志, 仅查询列, 不构造 ORM 对象
+
+        :param db: 数据库会话
+        :param task_id: 任务运行唯一ID
+        :param after_id: 起始 ID (不含)
+        :param suffix: 合成ID后缀, 为空时不过滤
+        :param until_id: 截止 ID (含), 为空时不限制
+        :param limit: 最多返回条数
+        :return:
+        """
+        stmt = select(*_STREAM_COLUMNS).where(TaskLog.task_id == task_id, TaskLog.id > after_id)
+        if suffix is not None:
+            stmt = stmt.where(TaskLog.suffix == suffix)
+        if until_id is not None:
+            stmt = stmt.where(TaskLog.id <= until_id)
+        result = await db.execute(stmt.order_by(TaskLog.id).limit(limit))
+        return result.mappings().all()
+
+    async def get_ids_after(self, db: AsyncSession, task_id: int, after_id: int, *, limit: int) -> Sequence[int]:
+        """
+        按主键顺序获取指定任务中 ID 大于 after_id 的日志 ID, 可由 (task_id, id) 索引直接返回
+
+        :param db: 数据库会话
+        :param task_id: 任务运行唯一ID
+        :param after_id: 起始 ID (不含)
+        :param limit: 最多返回条数
+        :return:
+        """
+        stmt = (
+            select(TaskLog.id)
+            .where(TaskLog.task_id == task_id, TaskLog.id > after_id)
+            .order_by(TaskLog.id)
+            .limit(limit)
+        )
+        return (await db.execute(stmt)).scalars().all()
+
+    async def get_by_ids(self, db: AsyncSession, ids: Sequence[int]) -> Sequence[RowMapping]:
+        """
+        按主键顺序获取指定 ID 的日志
+
+        :param db: 数据库会话
+        :param ids: 日志 ID
+        :return:
+        """
+        stmt = select(*_STREAM_COLUMNS).where(TaskLog.id.in_(ids)).order_by(TaskLog.id)
+        return (await db.execute(stmt)).mappings().all()
+
+task_log_dao: CRUDTaskLog = CRUDTaskLog(TaskLog)
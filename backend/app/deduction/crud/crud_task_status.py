@@ -0,0 +1,31 @@
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy_crud_plus import CRUDPlus
+
+from backend.app.deduction.model.task_status import TaskStatus
+from backend.common.crud import bulk_upsert
+
+
+class CRUDTaskStatus(CRUDPlus[TaskStatus]):
+    """推演任务状态数据库操作类"""
+
+    async def get_by_deduction(self, db: AsyncSession, deduce_id: int) -> Sequence[TaskStatus]:
+        """获取推演方案下的所有任务状态"""
+        stmt = select(TaskStatus).where(TaskStatus.deduce_id == deduce_id)
+        return (await db.execute(stmt)).scalars().all()
+
+    async def bulk_upsert(self, db: AsyncSession, rows: Sequence[dict[str, Any]]) -> None:
+        """
+        批量写入任务状态, 已存在时仅用更新时间更晚的状态覆盖
+
+        :param db: 数据库会话
+        :param rows: 包含 task_id、suffix、deduce_id、status、create_at、update_at 的数据
+        :return:
+        """
+        await bulk_upsert(db, TaskStatus.__table__, rows, keys=("task_id", "suffix"), newer="update_at")
+
+
+task_status_dao: CRUDTaskStatus = CRUDTaskStatus(TaskStatus)
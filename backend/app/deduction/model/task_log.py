@@ -2,18 +2,24 @@ import sqlalchemy as sa
 from sqlalchemy.orm import Mapped, mapped_column
 
 from backend.common.enums import TaskLogType as MessageType, TaskLogLevel as MessageLevel
-from backend.common.model import Base, snowflake_id_key
+from backend.common.model import Base, UniversalText, snowflake_id_key
 
 
 class TaskLog(Base):
     """推演任务执行日志"""
 
     __tablename__ = "task_log"
+    __table_args__ = (
+        sa.Index("ix_task_log_task_id_suffix_create_at", "task_id", "suffix", "create_at"),
+        sa.Index("ix_task_log_task_id_id", "task_id", "id"),
+        # PostgreSQL 下按雪花 ID 中的时间做范围分区, 分区由 SnowflakeRangePartitioner 按天维护
+        {"postgresql_partition_by": "RANGE (id)"},
+    )
 
-    id: Mapped[int] = mapped_column(comment="日志记录ID")
-    task_id: Mapped[snowflake_id_key] = mapped_column(sa.Integer, comment="任务运行唯一ID")
+    # 主键索引已足够, 不再额外建唯一索引, 减少追加写入的索引维护
+    id: Mapped[snowflake_id_key] = mapped_column(init=False, index=False, unique=False, comment="日志记录ID")
+    task_id: Mapped[int] = mapped_column(sa.BigInteger, comment="任务运行唯一ID")
     suffix: Mapped[int] = mapped_column(sa.Integer, comment="合成ID后缀")
-    content: Mapped[str] = mapped_column(sa.String(512), comment="任务执行日志")
+    content: Mapped[str] = mapped_column(UniversalText, comment="任务执行日志")
     type: Mapped[MessageType] = mapped_column(sa.Enum(MessageType), comment="消息类型")
     level: Mapped[MessageLevel] = mapped_column(sa.Enum(MessageLevel), comment="消息等级")
-
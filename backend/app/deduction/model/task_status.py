@@ -1,10 +1,8 @@
-from datetime import datetime
-
 import sqlalchemy as sa
 from sqlalchemy.orm import Mapped, mapped_column
 
-from backend.common.model import Base, snowflake_id_key
-from backend.common.enums import TaskStatus
+from backend.common.model import Base
+from backend.common.enums import TaskStatus as TaskStatusType
 
 
 class TaskStatus(Base):
@@ -12,6 +10,9 @@ class TaskStatus(Base):
 
     __tablename__ = "task_status"
 
-    task_id: Mapped[snowflake_id_key] = mapped_column(comment="任务运行唯一ID")
-    suffix: Mapped[int] = mapped_column(sa.Integer, comment="合成ID后缀")
-    status: Mapped[TaskStatus] = mapped_column(sa.Enum(TaskStatus), comment="推演任务状态")
+    task_id: Mapped[int] = mapped_column(
+        sa.BigInteger, primary_key=True, autoincrement=False, comment="任务运行唯一ID"
+    )
+    suffix: Mapped[int] = mapped_column(sa.Integer, primary_key=True, autoincrement=False, comment="合成ID后缀")
+    deduce_id: Mapped[int] = mapped_column(sa.BigInteger, index=True, comment="推演方案ID")
+    status: Mapped[TaskStatusType] = mapped_column(sa.Enum(TaskStatusType), comment="推演任务状态")
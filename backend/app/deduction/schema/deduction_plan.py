@@ -38,3 +38,9 @@ class GetDeductionPlanParam(SchemaBase):
     id: int = Field(description="推演方案ID")
     create_at: datetime = Field(description="创建时间")
     update_at: datetime | None = Field(None, description="更新时间")
+
+
+class RunWorkflowResult(SchemaBase):
+    """执行推演工作流结果"""
+    deduce_id: int = Field(description="推演方案ID")
+    nodes: int = Field(description="工作流节点数")
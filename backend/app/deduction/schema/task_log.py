@@ -1,9 +1,9 @@
 from datetime import datetime
 
+import msgspec
 from pydantic import ConfigDict, Field
 
 from backend.common.schema import SchemaBase
-from backend.common.model import snowflake_id_key
 from backend.common.enums import TaskLogType, TaskLogLevel
 
 
@@ -16,14 +16,48 @@ class TaskLogParamBase(SchemaBase):
 
 class CreateTaskLogParam(TaskLogParamBase):
     """创建推演任务日志配置参数(api传入参数)"""
-    task_id: snowflake_id_key = Field(description="任务运行唯一ID")
+    task_id: int = Field(description="任务运行唯一ID")
     suffix: int = Field(description="合成ID后缀")
 
 
 class GetTaskLogDetail(TaskLogParamBase):
     """获取推演日志"""
+    model_config = ConfigDict(from_attributes=True)
+
     id: int = Field(description="日志记录ID")
-    task_id: snowflake_id_key = Field(description="任务运行唯一ID")
+    task_id: int = Field(description="任务运行唯一ID")
     suffix: int = Field(description="合成ID后缀")
     create_at: datetime = Field(description="创建时间")
 
+
+class TaskLogRecord(msgspec.Struct, frozen=True):
+    """
+    批量写入的单条推演任务日志, 字段与 CreateTaskLogParam 一致
+
+    写入接口直接用 msgspec 解码为该结构, 不经过 pydantic 校验
+    """
+    task_id: int
+    suffix: int
+    type: TaskLogType
+    level: TaskLogLevel
+    content: str
+
+
+class IngestTaskLogResult(SchemaBase):
+    """批量写入推演任务日志结果"""
+    accepted: int = Field(description="本次接收的日志条数")
+    buffered: int = Field(description="当前缓冲区中等待写库的日志条数")
+
+
+class TaskLogBufferStats(SchemaBase):
+    """推演任务日志缓冲区统计"""
+    capacity: int = Field(description="缓冲区容量")
+    buffered: int = Field(description="等待写库的日志条数")
+    accepted: int = Field(description="累计接收条数")
+    rejected: int = Field(description="因缓冲区已满累计拒绝的条数")
+    written: int = Field(description="累计写库条数")
+    dropped: int = Field(description="停止时写库失败丢弃的条数")
+    flushes: int = Field(description="累计写库批次数")
+    flush_errors: int = Field(description="累计写库失败次数")
+    last_flush_rows: int = Field(description="最近一次写库条数")
+    last_flush_seconds: float = Field(description="最近一次写库耗时(秒)")
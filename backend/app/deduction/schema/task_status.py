@@ -8,7 +8,7 @@ from backend.common.enums import TaskStatus
 
 class TaskStatusParamBase(SchemaBase):
     """推演任务状态配置参数"""
-    deduce_id: str = Field(description="推演方案ID")
+    deduce_id: int = Field(description="推演方案ID")
     suffix: int = Field(description="合成ID后缀")
     status: TaskStatus = Field(description="推演任务状态")
 
@@ -27,3 +27,29 @@ class GetDeductionTaskDetail(TaskStatusParamBase):
 
     status: TaskStatus = Field(description="推演任务状态")
 
+
+class UpdateTaskStatusParam(TaskStatusParamBase):
+    """上报推演任务状态参数"""
+    task_id: int = Field(description="任务运行唯一ID")
+
+
+class GetTaskStatusDetail(UpdateTaskStatusParam):
+    """获取推演任务状态"""
+    model_config = ConfigDict(from_attributes=True)
+
+    update_at: datetime = Field(description="状态更新时间")
+
+
+class TaskStatusSnapshot(SchemaBase):
+    """推演方案下所有任务状态的一致快照"""
+    model_config = ConfigDict(from_attributes=True)
+
+    deduce_id: int = Field(description="推演方案ID")
+    revision: int = Field(description="快照版本, 任一任务状态变化时递增")
+    items: list[GetTaskStatusDetail] = Field(description="任务状态")
+
+
+class UpdateTaskStatusResult(SchemaBase):
+    """上报推演任务状态结果"""
+    received: int = Field(description="收到的状态条数")
+    changed: int = Field(description="状态发生变化的条数, 其余与当前状态相同被合并")
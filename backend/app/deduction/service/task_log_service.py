@@ -0,0 +1,249 @@
+import asyncio
+import math
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Sequence
+
+import msgspec
+
+from backend.app.deduction.crud.crud_task_log import task_log_dao
+from backend.app.deduction.model.task_log import TaskLog
+from backend.app.deduction.schema.task_log import TaskLogBufferStats, TaskLogRecord
+from backend.app.deduction.service.task_log_stream_service import task_log_hub
+from backend.common.exception import errors
+from backend.common.log import log
+from backend.common.response.response_code import StandardResponseCode
+from backend.core.conf import settings
+from backend.database.db import async_db_session, async_engine
+from backend.database.partition import SnowflakeRangePartitioner
+
+_json_decoder = msgspec.json.Decoder(list[TaskLogRecord])
+_json_line_decoder = msgspec.json.Decoder(TaskLogRecord)
+_msgpack_decoder = msgspec.msgpack.Decoder(list[TaskLogRecord])
+
+NDJSON_TYPES = ("application/x-ndjson", "application/jsonl", "application/json-seq")
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+
+def decode_records(content_type: str, body: bytes) -> list[TaskLogRecord]:
+    """
+    解码批量日志请求体
+
+    - application/x-ndjson: 每行一个 JSON 对象, 空行忽略
+    - application/json: JSON 数组
+    - application/msgpack: msgpack 数组
+
+    :param content_type: 请求的 Content-Type
+    :param body: 请求体
+    :return:
+    """
+    media_type = content_type.partition(";")[0].strip().lower()
+    try:
+        if media_type in NDJSON_TYPES:
+            records = []
+            for lineno, line in enumerate(body.splitlines(), 1):
+                line = line.strip().lstrip(b"\x1e")
+                if not line:
+                    continue
+                try:
+                    records.append(_json_line_decoder.decode(line))
+                except msgspec.ValidationError as e:
+                    raise msgspec.ValidationError(f"第 {lineno} 行: {e}") from None
+            return records
+        if media_type == "application/json":
+            return _json_decoder.decode(body)
+        if media_type in MSGPACK_TYPES:
+            return _msgpack_decoder.decode(body)
+    except msgspec.DecodeError as e:
+        raise errors.HTTPError(code=StandardResponseCode.HTTP_400, msg=f"日志批次解码失败: {e}")
+    raise errors.HTTPError(
+        code=StandardResponseCode.HTTP_415, msg=f"不支持的 Content-Type: {content_type or '(empty)'}"
+    )
+
+
+class TaskLogBuffer:
+    """
+    推演任务日志内存缓冲区
+
+    请求协程只做入队; 后台写库任务在缓冲条数达到 flush_rows 或等待超过 flush_interval 时批量写库。
+    写库失败的批次放回队首并退避重试, 期间缓冲区写满后 offer 返回 False, 由接口向生产者返回 429
+    """
+
+    def __init__(
+        self,
+        writer: Callable[[list[TaskLogRecord]], Awaitable[int]],
+        *,
+        capacity: int,
+        flush_rows: int,
+        flush_interval: float,
+    ) -> None:
+        """
+        初始化缓冲区
+
+        :param writer: 批量写库函数
+        :param capacity: 最多缓冲的日志条数
+        :param flush_rows: 触发写库的条数, 也是单次写库的最大条数
+        :param flush_interval: 最长写库间隔秒数
+        :return:
+        """
+        self.writer = writer
+        self.capacity = capacity
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self._rows: deque[TaskLogRecord] = deque()
+        # 已取出正在写库的条数, 同样占用容量
+        self._inflight = 0
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._stats = dict.fromkeys(
+            ("accepted", "rejected", "written", "dropped", "flushes", "flush_errors", "last_flush_rows"), 0
+        )
+        self._last_flush_seconds = 0.0
+
+    @property
+    def buffered(self) -> int:
+        return len(self._rows) + self._inflight
+
+    def offer(self, records: Sequence[TaskLogRecord]) -> bool:
+        """
+        整批放入缓冲区, 剩余容量不足时整批拒绝
+
+        :param records: 日志
+        :return: 是否接收
+        """
+        if self.buffered + len(records) > self.capacity:
+            self._stats["rejected"] += len(records)
+            return False
+        self._rows.extend(records)
+        self._stats["accepted"] += len(records)
+        if len(self._rows) >= self.flush_rows:
+            self._wakeup.set()
+        return True
+
+    def retry_after(self) -> int:
+        """按当前积压估算生产者的重试等待秒数"""
+        return max(1, math.ceil(self.buffered / self.flush_rows * self.flush_interval))
+
+    async def start(self) -> None:
+        """启动后台写库任务"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """停止后台写库任务并写出剩余日志"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        while self._rows:
+            if not await self._flush_once():
+                self._stats["dropped"] += len(self._rows)
+                log.error("推演任务日志写库失败, 丢弃 {} 条", len(self._rows))
+                self._rows.clear()
+
+    def stats(self) -> TaskLogBufferStats:
+        return TaskLogBufferStats(
+            capacity=self.capacity,
+            buffered=self.buffered,
+            last_flush_seconds=self._last_flush_seconds,
+            **self._stats,
+        )
+
+    async def _run(self) -> None:
+        failures = 0
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+            while self._rows:
+                if await self._flush_once():
+                    failures = 0
+                    if len(self._rows) < self.flush_rows:
+                        break
+                    continue
+                failures += 1
+                await asyncio.sleep(min(0.1 * 2**failures, 5))
+
+    async def _flush_once(self) -> bool:
+        """取出至多 flush_rows 条写库, 失败时放回队首"""
+        count = min(len(self._rows), self.flush_rows)
+        batch = [self._rows.popleft() for _ in range(count)]
+        self._inflight = count
+        start = time.perf_counter()
+        try:
+            await self.writer(batch)
+        except asyncio.CancelledError:
+            self._rows.extendleft(reversed(batch))
+            raise
+        except Exception as e:
+            self._rows.extendleft(reversed(batch))
+            self._stats["flush_errors"] += 1
+            log.error("推演任务日志写库失败, {} 条待重试: {}", count, e)
+            return False
+        finally:
+            self._inflight = 0
+        self._last_flush_seconds = time.perf_counter() - start
+        self._stats["flushes"] += 1
+        self._stats["written"] += count
+        self._stats["last_flush_rows"] = count
+        return True
+
+
+class TaskLogService:
+    """推演任务日志服务类"""
+
+    def __init__(self) -> None:
+        self.buffer = TaskLogBuffer(
+            self._write,
+            capacity=settings.TASK_LOG_BUFFER_SIZE,
+            flush_rows=settings.TASK_LOG_FLUSH_ROWS,
+            flush_interval=settings.TASK_LOG_FLUSH_INTERVAL,
+        )
+
+    @staticmethod
+    async def _write(records: list[TaskLogRecord]) -> int:
+        async with async_db_session.begin() as db:
+            count = await task_log_dao.bulk_create(db, records, use_copy=settings.TASK_LOG_USE_COPY)
+        # 提交后唤醒实时推送, 本 worker 写入的日志无需等待轮询间隔
+        task_log_hub.notify({record.task_id for record in records})
+        return count
+
+    def ingest(self, content_type: str, body: bytes) -> int:
+        """
+        解码日志批次并放入缓冲区
+
+        :param content_type: 请求的 Content-Type
+        :param body: 请求体
+        :return: 接收的日志条数
+        """
+        records = decode_records(content_type, body)
+        if len(records) > settings.TASK_LOG_MAX_BATCH:
+            raise errors.HTTPError(
+                code=StandardResponseCode.HTTP_413,
+                msg=f"单批最多 {settings.TASK_LOG_MAX_BATCH} 条日志, 实际 {len(records)} 条",
+            )
+        if not self.buffer.offer(records):
+            raise errors.HTTPError(
+                code=StandardResponseCode.HTTP_429,
+                msg="日志缓冲区已满, 请稍后重试",
+                headers={"Retry-After": str(self.buffer.retry_after())},
+            )
+        return len(records)
+
+
+task_log_service: TaskLogService = TaskLogService()
+
+task_log_partitioner: SnowflakeRangePartitioner = SnowflakeRangePartitioner(
+    async_engine,
+    TaskLog.__tablename__,
+    premake_days=settings.TASK_LOG_PARTITION_PREMAKE_DAYS,
+    retention_days=settings.TASK_LOG_PARTITION_RETENTION_DAYS,
+    retention_mode=settings.TASK_LOG_PARTITION_RETENTION_MODE,
+    check_interval=settings.TASK_LOG_PARTITION_CHECK_INTERVAL,
+)
@@ -0,0 +1,235 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator, Iterable
+
+from sqlalchemy import RowMapping
+
+from backend.app.deduction.crud.crud_task_log import task_log_dao
+from backend.common.log import log
+from backend.core.conf import settings
+from backend.database.db import async_db_session
+from backend.utils.snowflake import Snowflake
+
+
+def _floor_id_before(seconds: float) -> int:
+    """若干秒前对应的最小雪花 ID"""
+    return Snowflake.floor_id(int((time.time() - seconds) * 1000))
+
+
+class _Subscriber:
+    """单个订阅者, 按 suffix 过滤后接收分发的日志批次, 队列中的 None 表示分发中心已停止"""
+
+    def __init__(self, suffix: int | None, maxsize: int) -> None:
+        self.suffix = suffix
+        self.queue: asyncio.Queue[list[RowMapping] | None] = asyncio.Queue(maxsize)
+        # 队列溢出后不再接收分发, 由订阅者自行从数据库追赶
+        self.lagged = False
+        self.closed = False
+
+    def push(self, rows: list[RowMapping]) -> None:
+        if self.lagged or self.closed:
+            return
+        if self.suffix is not None:
+            rows = [row for row in rows if row["suffix"] == self.suffix]
+            if not rows:
+                return
+        try:
+            self.queue.put_nowait(rows)
+        except asyncio.QueueFull:
+            self.lagged = True
+
+    def close(self) -> None:
+        """丢弃积压的批次并放入结束标记, 唤醒等待中的订阅者"""
+        self.closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class _TaskTail:
+    """单个任务的数据库轮询状态"""
+
+    def __init__(self, task_id: int) -> None:
+        self.task_id = task_id
+        # 已分发的最大 ID
+        self.cursor = 0
+        # 回看窗口内已分发的 ID, 插入顺序近似 ID 顺序, 从头部淘汰
+        self.seen: dict[int, None] = {}
+        self.subscribers: set[_Subscriber] = set()
+        self.wakeup = asyncio.Event()
+        self.ready = asyncio.Event()
+        self.task: asyncio.Task | None = None
+
+
+class TaskLogHub:
+    """
+    推演任务日志进程内分发中心
+
+    每个有订阅者的任务只运行一个数据库轮询, 新日志分发给该任务的所有订阅者; 最后一个订阅者离开后停止轮询。
+    本 worker 写库后会立即唤醒对应任务的轮询, 其他 worker 写入的日志按轮询间隔读取。
+    多 worker 写入时 ID 较小的日志可能较晚提交, 轮询回看 lookback 秒内的 ID 并按已分发集合去重, 此类日志可能略微乱序
+    """
+
+    def __init__(self, *, poll_interval: float, lookback: float, batch_size: int, queue_size: int) -> None:
+        """
+        初始化分发中心
+
+        :param poll_interval: 轮询间隔秒数
+        :param lookback: 回看秒数
+        :param batch_size: 单次查询的最大条数
+        :param queue_size: 单个订阅者最多积压的批次数
+        :return:
+        """
+        self.poll_interval = poll_interval
+        self.lookback = lookback
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self._tails: dict[int, _TaskTail] = {}
+
+    def notify(self, task_ids: Iterable[int]) -> None:
+        """
+        唤醒指定任务的轮询, 写库提交后调用
+
+        :param task_ids: 任务运行唯一ID
+        :return:
+        """
+        for task_id in task_ids:
+            tail = self._tails.get(task_id)
+            if tail is not None:
+                tail.wakeup.set()
+
+    def stats(self) -> dict[int, int]:
+        """各任务的订阅者数量"""
+        return {task_id: len(tail.subscribers) for task_id, tail in self._tails.items()}
+
+    async def stop(self) -> None:
+        """停止所有轮询, 并结束所有订阅"""
+        for tail in self._tails.values():
+            if tail.task is not None:
+                tail.task.cancel()
+            for subscriber in tail.subscribers:
+                subscriber.close()
+            # 首次轮询未完成时订阅者仍在等待 ready
+            tail.ready.set()
+        self._tails.clear()
+
+    def _prune_recent(self, recent: dict[int, None]) -> dict[int, None]:
+        """已发送 ID 超出上限时淘汰回看窗口之外的 ID, 窗口之外的日志不会再被轮询分发"""
+        if len(recent) <= self.batch_size * 4:
+            return recent
+        floor = _floor_id_before(self.lookback)
+        return {pk: None for pk in recent if pk >= floor}
+
+    async def subscribe(
+        self, task_id: int, *, suffix: int | None = None, last_id: int | None = None
+    ) -> AsyncIterator[list[RowMapping]]:
+        """
+        订阅任务日志, 按批次产出
+
+        :param task_id: 任务运行唯一ID
+        :param suffix: 合成ID后缀, 为空时订阅任务的全部日志
+        :param last_id: 客户端已收到的最后一条日志 ID, 为空时仅推送订阅之后的新日志, 0 表示从头开始
+        :return: 分发中心停止时结束
+        """
+        tail = self._tails.get(task_id)
+        if tail is None:
+            tail = self._tails[task_id] = _TaskTail(task_id)
+            tail.task = asyncio.create_task(self._run(tail))
+        subscriber = _Subscriber(suffix, self.queue_size)
+        tail.subscribers.add(subscriber)
+        try:
+            await tail.ready.wait()
+            sent = tail.cursor if last_id is None else last_id
+            recent: dict[int, None] = {}
+            catch_up = last_id is not None
+            while not subscriber.closed:
+                if subscriber.lagged:
+                    while not subscriber.queue.empty():
+                        subscriber.queue.get_nowait()
+                    subscriber.lagged = False
+                    catch_up = True
+                if catch_up:
+                    # 在同一次事件循环中读取 cursor, 此后的新日志都会进入队列
+                    until = tail.cursor
+                    catch_up = False
+                    while sent < until:
+                        async with async_db_session() as db:
+                            rows = await task_log_dao.get_after(
+                                db, task_id, sent, suffix=suffix, until_id=until, limit=self.batch_size
+                            )
+                        if not rows:
+                            break
+                        sent = rows[-1]["id"]
+                        recent.update(dict.fromkeys(row["id"] for row in rows))
+                        recent = self._prune_recent(recent)
+                        yield list(rows)
+                        if subscriber.lagged or subscriber.closed:
+                            break
+                    continue
+
+                batch = await subscriber.queue.get()
+                if batch is None:
+                    break
+                rows = [row for row in batch if row["id"] not in recent]
+                if not rows:
+                    continue
+                sent = max(sent, rows[-1]["id"])
+                recent.update(dict.fromkeys(row["id"] for row in rows))
+                recent = self._prune_recent(recent)
+                yield rows
+        finally:
+            tail.subscribers.discard(subscriber)
+            if not tail.subscribers and self._tails.get(task_id) is tail:
+                tail.task.cancel()
+                del self._tails[task_id]
+
+    async def _run(self, tail: _TaskTail) -> None:
+        while True:
+            tail.wakeup.clear()
+            try:
+                await self._poll(tail)
+            except Exception as e:
+                log.warning("推演任务日志轮询失败: task_id={}, {}", tail.task_id, e)
+            try:
+                await asyncio.wait_for(tail.wakeup.wait(), self.poll_interval)
+            except TimeoutError:
+                pass
+
+    async def _poll(self, tail: _TaskTail) -> None:
+        """先按 (task_id, id) 索引读取 ID, 只为未分发的 ID 查询整行"""
+        floor = _floor_id_before(self.lookback)
+        since = min(tail.cursor, floor) if tail.ready.is_set() else floor
+        while True:
+            async with async_db_session() as db:
+                ids = await task_log_dao.get_ids_after(db, tail.task_id, since, limit=self.batch_size)
+                new_ids = [pk for pk in ids if pk not in tail.seen]
+                rows = await task_log_dao.get_by_ids(db, new_ids) if new_ids and tail.ready.is_set() else []
+            tail.seen.update(dict.fromkeys(new_ids))
+            if ids:
+                tail.cursor = max(tail.cursor, ids[-1])
+            if rows:
+                self._fan_out(tail, list(rows))
+            if len(ids) < self.batch_size:
+                break
+            since = ids[-1]
+        # 首次轮询只记录回看窗口内已有的 ID, 不分发
+        tail.cursor = max(tail.cursor, floor)
+        tail.ready.set()
+        while tail.seen:
+            pk = next(iter(tail.seen))
+            if pk >= floor:
+                break
+            del tail.seen[pk]
+
+    @staticmethod
+    def _fan_out(tail: _TaskTail, rows: list[RowMapping]) -> None:
+        for subscriber in tail.subscribers:
+            subscriber.push(rows)
+
+
+task_log_hub: TaskLogHub = TaskLogHub(
+    poll_interval=settings.TASK_LOG_STREAM_POLL_INTERVAL,
+    lookback=settings.TASK_LOG_STREAM_LOOKBACK,
+    batch_size=settings.TASK_LOG_STREAM_BATCH,
+    queue_size=settings.TASK_LOG_STREAM_QUEUE_SIZE,
+)
@@ -0,0 +1,307 @@
+import asyncio
+import time
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+
+from backend.app.deduction.crud.crud_task_status import task_status_dao
+from backend.app.deduction.schema.task_status import UpdateTaskStatusParam
+from backend.common.enums import TaskStatus
+from backend.common.log import log
+from backend.core.conf import settings
+from backend.database.db import async_db_session
+from backend.utils.timezone import timezone
+
+# 任务已结束的状态, 用于等待任务结束
+_FINAL_STATUSES = (TaskStatus.TERMINAL, TaskStatus.ABNORMAL)
+
+
+@dataclass(frozen=True, slots=True)
+class TaskStatusEntry:
+    """单个任务的状态, 不可变, 快照可直接共享"""
+
+    deduce_id: int
+    task_id: int
+    suffix: int
+    status: TaskStatus
+    update_at: datetime
+
+
+@dataclass(frozen=True, slots=True)
+class TaskStatusView:
+    """推演方案下所有任务状态的快照"""
+
+    deduce_id: int
+    revision: int
+    items: tuple[TaskStatusEntry, ...]
+
+
+@dataclass(slots=True)
+class _Deduction:
+    entries: dict[tuple[int, int], TaskStatusEntry] = field(default_factory=dict)
+    revision: int = 0
+    # 上次从数据库合并的时间, 0 表示尚未加载
+    loaded_at: float = 0.0
+    accessed_at: float = field(default_factory=time.monotonic)
+
+
+class TaskStatusRegistry:
+    """
+    进程内推演任务状态注册表
+
+    状态更新同步写入内存, 与当前状态相同的更新直接合并; 发生变化的任务标记为待写库,
+    后台任务按间隔批量 upsert 每个任务的最新状态, 写库时按更新时间只保留较新的状态。
+    读取直接返回内存快照, 并按 refresh_interval 从数据库合并其他 worker 写入的状态
+    """
+
+    def __init__(self, *, flush_interval: float, flush_batch: int, refresh_interval: float, idle_ttl: int) -> None:
+        """
+        初始化注册表
+
+        :param flush_interval: 写库间隔秒数
+        :param flush_batch: 单次写库的最大条数
+        :param refresh_interval: 从数据库合并的最短间隔秒数
+        :param idle_ttl: 推演方案空闲多久后从内存移除
+        :return:
+        """
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self.refresh_interval = refresh_interval
+        self.idle_ttl = idle_ttl
+        # 区分不同进程的快照版本, 用于生成 ETag
+        self.token = uuid.uuid4().hex[:8]
+        self._deductions: dict[int, _Deduction] = {}
+        self._dirty: dict[tuple[int, int], TaskStatusEntry] = {}
+        # 全局递增的快照版本, 推演方案被移出内存后重新加载也不会复用旧版本号
+        self._revision = 0
+        self._waiters: dict[tuple[int, int, int], set[asyncio.Future[TaskStatus]]] = {}
+        self._task: asyncio.Task | None = None
+        self._stats = dict.fromkeys(("updates", "coalesced", "persisted", "flush_errors"), 0)
+
+    def update(self, deduce_id: int, task_id: int, suffix: int, status: TaskStatus) -> bool:
+        """
+        更新任务状态
+
+        :param deduce_id: 推演方案ID
+        :param task_id: 任务运行唯一ID
+        :param suffix: 合成ID后缀
+        :param status: 任务状态
+        :return: 状态是否发生变化
+        """
+        self._stats["updates"] += 1
+        deduction = self._deductions.get(deduce_id)
+        if deduction is None:
+            deduction = self._deductions[deduce_id] = _Deduction()
+        deduction.accessed_at = time.monotonic()
+        key = (task_id, suffix)
+        current = deduction.entries.get(key)
+        if current is not None and current.status == status:
+            self._stats["coalesced"] += 1
+            return False
+        entry = TaskStatusEntry(deduce_id, task_id, suffix, status, timezone.now())
+        deduction.entries[key] = entry
+        deduction.revision = self._next_revision()
+        self._dirty[key] = entry
+        self._wake(entry)
+        return True
+
+    def update_many(self, objs: list[UpdateTaskStatusParam]) -> int:
+        """
+        批量更新任务状态
+
+        :param objs: 任务状态
+        :return: 状态发生变化的条数
+        """
+        return sum(self.update(obj.deduce_id, obj.task_id, obj.suffix, TaskStatus(obj.status)) for obj in objs)
+
+    async def snapshot(self, deduce_id: int) -> TaskStatusView:
+        """
+        获取推演方案下所有任务状态的一致快照
+
+        快照在单次事件循环中构建, 不会包含一半新一半旧的状态; 内存与数据库中都没有状态的推演方案不会进入注册表
+
+        :param deduce_id: 推演方案ID
+        :return:
+        """
+        deduction = self._deductions.get(deduce_id)
+        if deduction is None or time.monotonic() - deduction.loaded_at >= self.refresh_interval:
+            deduction = await self._load(deduce_id)
+        if deduction is None:
+            return TaskStatusView(deduce_id=deduce_id, revision=0, items=())
+        deduction.accessed_at = time.monotonic()
+        items = tuple(sorted(deduction.entries.values(), key=lambda entry: (entry.task_id, entry.suffix)))
+        return TaskStatusView(deduce_id=deduce_id, revision=deduction.revision, items=items)
+
+    @contextmanager
+    def watch_final(self, deduce_id: int, task_id: int, suffix: int) -> Iterator[asyncio.Future[TaskStatus]]:
+        """
+        登记任务结束状态 (TERMINAL / ABNORMAL) 的等待, 进入之后的状态变化写入返回的 future
+
+        先触发任务再等待时 (如提交到推演引擎) 应在触发前进入, 避免上报早于等待而丢失
+
+        :param deduce_id: 推演方案ID
+        :param task_id: 任务运行唯一ID
+        :param suffix: 合成ID后缀
+        :return:
+        """
+        key = (deduce_id, task_id, suffix)
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(key, set()).add(future)
+        try:
+            yield future
+        finally:
+            waiters = self._waiters.get(key)
+            if waiters is not None:
+                waiters.discard(future)
+                if not waiters:
+                    del self._waiters[key]
+
+    async def wait_watched(self, deduce_id: int, future: asyncio.Future[TaskStatus]) -> TaskStatus:
+        """
+        等待 watch_final 登记的结束状态
+
+        本 worker 收到的上报立即唤醒; 其他 worker 收到的上报按 refresh_interval 从数据库合并
+
+        :param deduce_id: 推演方案ID
+        :param future: watch_final 返回的 future
+        :return:
+        """
+        while True:
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), self.refresh_interval)
+            except TimeoutError:
+                await self._load(deduce_id)
+
+    async def wait_final(self, deduce_id: int, task_id: int, suffix: int) -> TaskStatus:
+        """
+        等待任务状态变为结束状态 (TERMINAL / ABNORMAL), 只响应调用之后的状态变化
+
+        :param deduce_id: 推演方案ID
+        :param task_id: 任务运行唯一ID
+        :param suffix: 合成ID后缀
+        :return:
+        """
+        with self.watch_final(deduce_id, task_id, suffix) as future:
+            return await self.wait_watched(deduce_id, future)
+
+    def stats(self) -> dict[str, int]:
+        return {**self._stats, "deductions": len(self._deductions), "dirty": len(self._dirty)}
+
+    async def start(self) -> None:
+        """启动后台写库任务"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """停止后台写库任务并写出剩余状态"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        while self._dirty:
+            if not await self.flush():
+                log.error("推演任务状态写库失败, 丢弃 {} 条", len(self._dirty))
+                self._dirty.clear()
+
+    async def flush(self) -> bool:
+        """
+        写出至多 flush_batch 条待写库状态, 失败时重新标记为待写库
+
+        :return: 是否成功
+        """
+        batch = list(islice(self._dirty.values(), self.flush_batch))
+        if not batch:
+            return True
+        for entry in batch:
+            del self._dirty[(entry.task_id, entry.suffix)]
+        rows = [
+            {
+                "task_id": entry.task_id,
+                "suffix": entry.suffix,
+                "deduce_id": entry.deduce_id,
+                "status": entry.status,
+                "create_at": entry.update_at,
+                "update_at": entry.update_at,
+            }
+            for entry in batch
+        ]
+        try:
+            async with async_db_session.begin() as db:
+                await task_status_dao.bulk_upsert(db, rows)
+        except Exception as e:
+            # 写库期间又有更新的任务保留更新后的状态
+            for entry in batch:
+                self._dirty.setdefault((entry.task_id, entry.suffix), entry)
+            self._stats["flush_errors"] += 1
+            log.error("推演任务状态写库失败, {} 条待重试: {}", len(batch), e)
+            return False
+        self._stats["persisted"] += len(batch)
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            while self._dirty:
+                if not await self.flush() or len(self._dirty) < self.flush_batch:
+                    break
+            self._evict()
+
+    async def _load(self, deduce_id: int) -> _Deduction | None:
+        """从数据库合并状态, 只接受比内存更新的记录; 内存与数据库中都没有状态时返回 None"""
+        async with async_db_session() as db:
+            rows = await task_status_dao.get_by_deduction(db, deduce_id)
+        deduction = self._deductions.get(deduce_id)
+        if deduction is None:
+            if not rows:
+                return None
+            deduction = self._deductions[deduce_id] = _Deduction()
+        changed = False
+        for row in rows:
+            key = (row.task_id, row.suffix)
+            current = deduction.entries.get(key)
+            update_at = row.update_at or row.create_at
+            if current is not None and current.update_at >= update_at:
+                continue
+            entry = deduction.entries[key] = TaskStatusEntry(deduce_id, row.task_id, row.suffix, row.status, update_at)
+            self._wake(entry)
+            changed = True
+        if changed:
+            deduction.revision = self._next_revision()
+        deduction.loaded_at = time.monotonic()
+        return deduction
+
+    def _wake(self, entry: TaskStatusEntry) -> None:
+        if entry.status not in _FINAL_STATUSES:
+            return
+        for future in self._waiters.get((entry.deduce_id, entry.task_id, entry.suffix), ()):
+            if not future.done():
+                future.set_result(entry.status)
+
+    def _next_revision(self) -> int:
+        self._revision += 1
+        return self._revision
+
+    def _evict(self) -> None:
+        expire_before = time.monotonic() - self.idle_ttl
+        busy = {entry.deduce_id for entry in self._dirty.values()}
+        for deduce_id in [
+            deduce_id
+            for deduce_id, deduction in self._deductions.items()
+            if deduction.accessed_at < expire_before and deduce_id not in busy
+        ]:
+            del self._deductions[deduce_id]
+
+
+task_status_registry: TaskStatusRegistry = TaskStatusRegistry(
+    flush_interval=settings.TASK_STATUS_FLUSH_INTERVAL,
+    flush_batch=settings.TASK_STATUS_FLUSH_BATCH,
+    refresh_interval=settings.TASK_STATUS_REFRESH_INTERVAL,
+    idle_ttl=settings.TASK_STATUS_IDLE_TTL,
+)
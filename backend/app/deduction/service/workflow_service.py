@@ -0,0 +1,454 @@
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.deduction.crud.crud_deduction_plan import deduction_plan_dao
+from backend.app.deduction.service.task_status_service import task_status_registry
+from backend.common.enums import TaskStatus, WorkflowDependencyType, WorkflowNodeStatus
+from backend.common.exception import errors
+from backend.common.log import log
+from backend.common.response.response_code import StandardResponseCode
+from backend.common.template.task_scheme import (
+    AgentTaskSchemeTemplate,
+    ContainerTaskSchemeTemplate,
+    TaskSchemeTemplate,
+)
+from backend.core.conf import settings
+
+# 执行单个节点, 正常返回视为成功, 抛出异常视为失败
+NodeRunner = Callable[[TaskSchemeTemplate], Awaitable[None]]
+StatusCallback = Callable[[TaskSchemeTemplate, WorkflowNodeStatus], None]
+
+_FINAL_STATUSES = (
+    WorkflowNodeStatus.completed,
+    WorkflowNodeStatus.failed,
+    WorkflowNodeStatus.skipped,
+    WorkflowNodeStatus.stopped,
+)
+
+# 节点状态到任务状态注册表的映射, 只有执行成功的节点记为 TERMINAL; 跳过与停止的节点没有完成, 记为 ABNORMAL
+_TASK_STATUS = {
+    WorkflowNodeStatus.pending: TaskStatus.UNKNOWN,
+    WorkflowNodeStatus.waiting: TaskStatus.UNKNOWN,
+    WorkflowNodeStatus.ready: TaskStatus.UNKNOWN,
+    WorkflowNodeStatus.running: TaskStatus.NORMAL,
+    WorkflowNodeStatus.completed: TaskStatus.TERMINAL,
+    WorkflowNodeStatus.failed: TaskStatus.ABNORMAL,
+    WorkflowNodeStatus.skipped: TaskStatus.ABNORMAL,
+    WorkflowNodeStatus.stopped: TaskStatus.ABNORMAL,
+}
+
+
+def _parse_activation(activation: Any) -> list[tuple[str, WorkflowDependencyType]]:
+    """
+    解析 pin.activation 中的上游依赖
+
+    支持: 空值; 节点 ID; 节点 ID 列表; ``{"sourceNodeId": .., "type": "success" | "finish" | "any"}`` 或其列表
+
+    :param activation: pin.activation
+    :return: (上游节点 ID, 依赖类型)
+    """
+    if not activation:
+        return []
+    if isinstance(activation, (str, dict)):
+        activation = [activation]
+    dependencies = []
+    for item in activation:
+        if isinstance(item, str):
+            dependencies.append((item, WorkflowDependencyType.success))
+            continue
+        source = item.get("sourceNodeId") or item.get("source")
+        if not source:
+            raise errors.HTTPError(code=StandardResponseCode.HTTP_400, msg=f"无效的触发条件: {item}")
+        try:
+            dependency_type = WorkflowDependencyType(item.get("type") or "success")
+        except ValueError:
+            raise errors.HTTPError(code=StandardResponseCode.HTTP_400, msg=f"无效的依赖类型: {item.get('type')}")
+        dependencies.append((source, dependency_type))
+    return dependencies
+
+
+class WorkflowGraph:
+    """
+    推演工作流依赖图
+
+    构建时一次性为节点编号, 建立邻接表与入度; father 视为 success 依赖 (容器初始化成功后才执行子节点),
+    pin.activation 声明额外的上游依赖, pin.delay 为就绪后延迟执行的秒数
+    """
+
+    def __init__(self, nodes: Sequence[TaskSchemeTemplate]) -> None:
+        """
+        构建依赖图, 节点 ID 重复、引用不存在的节点或存在环时返回 400
+
+        :param nodes: 工作流节点
+        :return:
+        """
+        self.nodes = list(nodes)
+        self.index: dict[str, int] = {}
+        for i, node in enumerate(self.nodes):
+            if node.id in self.index:
+                raise errors.HTTPError(code=StandardResponseCode.HTTP_400, msg=f"工作流节点 ID 重复: {node.id}")
+            self.index[node.id] = i
+
+        self.edges: list[list[tuple[int, WorkflowDependencyType]]] = [[] for _ in self.nodes]
+        self.indegree = [0] * len(self.nodes)
+        self.delays = [0.0] * len(self.nodes)
+        for target, node in enumerate(self.nodes):
+            dependencies = _parse_activation(node.pin.get("activation"))
+            if node.father is not None:
+                dependencies.append((node.father, WorkflowDependencyType.success))
+            for source_id, dependency_type in dependencies:
+                source = self.index.get(source_id)
+                if source is None:
+                    raise errors.HTTPError(
+                        code=StandardResponseCode.HTTP_400, msg=f"工作流节点 {node.id} 依赖的节点不存在: {source_id}"
+                    )
+                self.edges[source].append((target, dependency_type))
+                self.indegree[target] += 1
+            self.delays[target] = float(node.pin.get("delay") or 0)
+        self._check_acyclic()
+
+    @classmethod
+    def from_config(cls, task_config: dict | list) -> "WorkflowGraph":
+        """
+        从推演方案的 task_config 构建依赖图
+
+        :param task_config: 节点列表, 或包含 nodes 节点列表的字典
+        :return:
+        """
+        raw_nodes = task_config.get("nodes", []) if isinstance(task_config, dict) else task_config
+        nodes = [
+            ContainerTaskSchemeTemplate(**raw) if raw.get("isBox", True) else AgentTaskSchemeTemplate(**raw)
+            for raw in raw_nodes
+        ]
+        return cls(nodes)
+
+    def _check_acyclic(self) -> None:
+        """Kahn 算法拓扑排序, 无法排序的节点构成环"""
+        indegree = list(self.indegree)
+        queue = deque(i for i, degree in enumerate(indegree) if degree == 0)
+        visited = 0
+        while queue:
+            source = queue.popleft()
+            visited += 1
+            for target, _ in self.edges[source]:
+                indegree[target] -= 1
+                if indegree[target] == 0:
+                    queue.append(target)
+        if visited < len(self.nodes):
+            cycle = [self.nodes[i].id for i, degree in enumerate(indegree) if degree > 0]
+            raise errors.HTTPError(
+                code=StandardResponseCode.HTTP_400, msg=f"工作流存在循环依赖: {', '.join(cycle[:10])}"
+            )
+
+
+@dataclass
+class WorkflowResult:
+    """工作流执行结果"""
+
+    status: dict[str, WorkflowNodeStatus] = field(default_factory=dict)
+    errors: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def succeeded(self) -> bool:
+        return all(status == WorkflowNodeStatus.completed for status in self.status.values())
+
+
+class WorkflowExecutor:
+    """
+    推演工作流执行器
+
+    每次运行复制入度数组, 节点开始或结束时只遍历其出边并递减下游入度, 入度归零的节点进入就绪队列;
+    互不依赖的分支在并发上限内同时执行, 主循环等待任一节点结束, 不轮询节点状态
+    """
+
+    def __init__(
+        self,
+        graph: WorkflowGraph,
+        runner: NodeRunner,
+        *,
+        concurrency: int,
+        on_status: StatusCallback | None = None,
+    ) -> None:
+        """
+        初始化执行器
+
+        :param graph: 依赖图
+        :param runner: 节点执行函数
+        :param concurrency: 同时执行的节点数上限
+        :param on_status: 节点状态变化回调
+        :return:
+        """
+        self.graph = graph
+        self.runner = runner
+        self.concurrency = max(concurrency, 1)
+        self.on_status = on_status
+        n = len(graph.nodes)
+        self.status = [WorkflowNodeStatus.pending] * n
+        self._indegree = list(graph.indegree)
+        self._ready: deque[int] = deque()
+        self._running: dict[asyncio.Task, int] = {}
+        self._timers: dict[asyncio.Task, int] = {}
+        self._errors: dict[str, str] = {}
+
+    async def run(self) -> WorkflowResult:
+        """执行工作流直到所有节点结束, 被取消时停止执行中的节点"""
+        for i, degree in enumerate(self._indegree):
+            if degree == 0:
+                self._make_ready(i)
+            else:
+                self._set_status(i, WorkflowNodeStatus.waiting)
+        try:
+            while True:
+                self._dispatch()
+                pending = self._running.keys() | self._timers.keys()
+                if not pending:
+                    break
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task in self._timers:
+                        i = self._timers.pop(task)
+                        self._ready.append(i)
+                        self._set_status(i, WorkflowNodeStatus.ready)
+                    else:
+                        self._complete(self._running.pop(task), task)
+        except asyncio.CancelledError:
+            await self._stop()
+            raise
+        # 正常情况下无环图的节点都会结束, 兜底标记为跳过
+        for i, status in enumerate(self.status):
+            if status not in _FINAL_STATUSES:
+                self._set_status(i, WorkflowNodeStatus.skipped)
+        return WorkflowResult(
+            status={node.id: self.status[i] for i, node in enumerate(self.graph.nodes)}, errors=self._errors
+        )
+
+    def _set_status(self, i: int, status: WorkflowNodeStatus) -> None:
+        self.status[i] = status
+        if self.on_status is not None:
+            try:
+                self.on_status(self.graph.nodes[i], status)
+            except Exception as e:
+                log.warning("工作流节点状态回调失败: {}", e)
+
+    def _make_ready(self, i: int) -> None:
+        delay = self.graph.delays[i]
+        if delay > 0:
+            self._set_status(i, WorkflowNodeStatus.waiting)
+            self._timers[asyncio.ensure_future(asyncio.sleep(delay))] = i
+            return
+        self._ready.append(i)
+        self._set_status(i, WorkflowNodeStatus.ready)
+
+    def _dispatch(self) -> None:
+        while self._ready and len(self._running) < self.concurrency:
+            i = self._ready.popleft()
+            self._set_status(i, WorkflowNodeStatus.running)
+            self._running[asyncio.ensure_future(self.runner(self.graph.nodes[i]))] = i
+            # 开始即触发的下游
+            self._propagate(i, started=True)
+
+    def _complete(self, i: int, task: asyncio.Task) -> None:
+        if task.cancelled():
+            self._set_status(i, WorkflowNodeStatus.stopped)
+            self._propagate(i, started=False)
+            return
+        error = task.exception()
+        if error is None:
+            self._set_status(i, WorkflowNodeStatus.completed)
+        else:
+            self._errors[self.graph.nodes[i].id] = str(error) or type(error).__name__
+            self._set_status(i, WorkflowNodeStatus.failed)
+            log.warning("工作流节点执行失败: {}, {}", self.graph.nodes[i].id, error)
+        self._propagate(i, started=False)
+
+    def _propagate(self, source: int, *, started: bool) -> None:
+        """
+        节点开始或结束后更新下游入度; 上游失败或被跳过时, success 依赖的下游被跳过并继续向下传播
+
+        :param source: 节点序号
+        :param started: 是否为开始事件
+        :return:
+        """
+        stack = [source]
+        while stack:
+            i = stack.pop()
+            status = self.status[i]
+            succeeded = status == WorkflowNodeStatus.completed
+            for target, dependency_type in self.graph.edges[i]:
+                if self.status[target] in _FINAL_STATUSES:
+                    continue
+                if started:
+                    if dependency_type == WorkflowDependencyType.any:
+                        self._satisfy(target)
+                    continue
+                if dependency_type == WorkflowDependencyType.success and not succeeded:
+                    if self.status[target] != WorkflowNodeStatus.running:
+                        self._set_status(target, WorkflowNodeStatus.skipped)
+                        stack.append(target)
+                elif dependency_type != WorkflowDependencyType.any or status == WorkflowNodeStatus.skipped:
+                    # any 依赖在上游开始时已满足, 上游未开始就被跳过时在此满足
+                    self._satisfy(target)
+
+    def _satisfy(self, target: int) -> None:
+        self._indegree[target] -= 1
+        if self._indegree[target] == 0 and self.status[target] == WorkflowNodeStatus.waiting:
+            self._make_ready(target)
+
+    async def _stop(self) -> None:
+        tasks = [*self._running, *self._timers]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for i, status in enumerate(self.status):
+            if status not in _FINAL_STATUSES:
+                self._set_status(i, WorkflowNodeStatus.stopped)
+        self._running.clear()
+        self._timers.clear()
+
+
+def _task_key(node_id: str) -> tuple[int, int] | None:
+    """节点 ID 形如 ``<task_id>&<suffix>``, 无法解析时不上报状态"""
+    task_id, _, suffix = node_id.partition("&")
+    if not task_id.isdigit() or not suffix.isdigit():
+        return None
+    return int(task_id), int(suffix)
+
+
+class EngineNodeRunner:
+    """
+    通过推演引擎执行节点
+
+    节点就绪后以 requestType=1 提交到推演引擎, 再等待引擎经任务状态接口上报该节点的结束状态:
+    TERMINAL 视为成功, ABNORMAL 视为失败
+    """
+
+    def __init__(self, deduce_id: int, client: httpx.AsyncClient) -> None:
+        """
+        :param deduce_id: 推演方案ID
+        :param client: 推演引擎 HTTP 客户端
+        """
+        self.deduce_id = deduce_id
+        self.client = client
+
+    async def __call__(self, node: TaskSchemeTemplate) -> None:
+        task_id, suffix = _task_key(node.id)
+        # 引擎可能在响应提交之前就上报结束状态, 先登记等待再提交
+        with task_status_registry.watch_final(self.deduce_id, task_id, suffix) as final:
+            response = await self.client.post(
+                settings.WORKFLOW_ENGINE_URL, json={"requestType": 1, "body": [node.model_dump(mode="json")]}
+            )
+            response.raise_for_status()
+            wait = task_status_registry.wait_watched(self.deduce_id, final)
+            timeout = settings.WORKFLOW_NODE_TIMEOUT
+            status = await (asyncio.wait_for(wait, timeout) if timeout > 0 else wait)
+        if status != TaskStatus.TERMINAL:
+            # 执行器记录 str(error) 作为节点错误信息
+            raise RuntimeError(f"引擎上报节点状态异常: {status.value}")
+
+
+class WorkflowService:
+    """推演工作流服务类"""
+
+    def __init__(self) -> None:
+        self._running: dict[int, asyncio.Task[WorkflowResult]] = {}
+        self._client: httpx.AsyncClient | None = None
+
+    @staticmethod
+    async def get_graph(*, db: AsyncSession, deduce_id: int) -> WorkflowGraph:
+        """
+        根据推演方案构建依赖图
+
+        :param db: 数据库会话
+        :param deduce_id: 推演方案ID
+        :return:
+        """
+        plan = await deduction_plan_dao.get(db, deduce_id)
+        if not plan:
+            raise errors.HTTPError(code=StandardResponseCode.HTTP_404, msg="推演方案不存在")
+        return WorkflowGraph.from_config(plan.task_config)
+
+    async def run(self, *, db: AsyncSession, deduce_id: int) -> WorkflowGraph:
+        """
+        通过推演引擎执行推演方案的工作流
+
+        :param db: 数据库会话
+        :param deduce_id: 推演方案ID
+        :return:
+        """
+        if not settings.WORKFLOW_ENGINE_URL:
+            raise errors.HTTPError(code=StandardResponseCode.HTTP_503, msg="未配置推演引擎地址")
+        graph = await self.get_graph(db=db, deduce_id=deduce_id)
+        # 引擎按 task_id 与 suffix 上报状态, 无法解析的节点永远等不到结束状态
+        invalid = [node.id for node in graph.nodes if _task_key(node.id) is None]
+        if invalid:
+            raise errors.HTTPError(
+                code=StandardResponseCode.HTTP_400,
+                msg=f"工作流节点 ID 应为 <task_id>&<suffix>: {', '.join(invalid[:10])}",
+            )
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=settings.WORKFLOW_ENGINE_TIMEOUT)
+        self.start(deduce_id=deduce_id, graph=graph, runner=EngineNodeRunner(deduce_id, self._client))
+        return graph
+
+    def start(
+        self, *, deduce_id: int, graph: WorkflowGraph, runner: NodeRunner
+    ) -> asyncio.Task[WorkflowResult]:
+        """
+        在后台执行推演工作流, 节点状态同步到任务状态注册表
+
+        :param deduce_id: 推演方案ID
+        :param graph: 依赖图
+        :param runner: 节点执行函数
+        :return:
+        """
+        current = self._running.get(deduce_id)
+        if current is not None and not current.done():
+            raise errors.HTTPError(code=StandardResponseCode.HTTP_409, msg="推演方案正在执行")
+
+        def report(node: TaskSchemeTemplate, status: WorkflowNodeStatus) -> None:
+            key = _task_key(node.id)
+            if key is not None:
+                task_status_registry.update(deduce_id, *key, _TASK_STATUS[status])
+
+        executor = WorkflowExecutor(
+            graph, runner, concurrency=settings.WORKFLOW_MAX_CONCURRENCY, on_status=report
+        )
+        task = asyncio.create_task(executor.run())
+        self._running[deduce_id] = task
+        task.add_done_callback(lambda _: self._discard(deduce_id, task))
+        return task
+
+    def _discard(self, deduce_id: int, task: asyncio.Task) -> None:
+        if self._running.get(deduce_id) is task:
+            del self._running[deduce_id]
+
+    async def cancel(self, *, deduce_id: int) -> bool:
+        """
+        停止推演工作流
+
+        :param deduce_id: 推演方案ID
+        :return: 是否存在执行中的工作流
+        """
+        task = self._running.get(deduce_id)
+        if task is None:
+            return False
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return True
+
+    async def stop(self) -> None:
+        """停止所有执行中的工作流并关闭推演引擎客户端"""
+        for deduce_id in list(self._running):
+            await self.cancel(deduce_id=deduce_id)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+workflow_service: WorkflowService = WorkflowService()
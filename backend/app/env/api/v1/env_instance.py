@@ -1,4 +1,6 @@
-from fastapi import APIRouter
+from typing import Annotated
+
+from fastapi import APIRouter, Body, Query, Request
 
 from backend.app.env.schema.env_instance import (
     CreateEnvInstanceParam,
@@ -6,36 +8,71 @@ from backend.app.env.schema.env_instance import (
     UpdateEnvInstanceParam,
 )
 from backend.app.env.service.env_instance_service import env_instance_service
+from backend.common.pagination import CursorPageData, DependsCursorParams
 from backend.common.response.response_schema import ResponseModel, ResponseSchemaModel, response_base
-from backend.database.db import CurrentSession, CurrentSessionTransaction
+from backend.common.schema import BatchCreateResult
+from backend.database.db import CurrentReadSession, CurrentSessionTransaction
+from backend.utils.etag import etag_matches, make_etag, not_modified, row_etag
 
 router = APIRouter()
 
 @router.get("/all", summary="获取所有环境配置实例")
-async def get_all_env_instances(db: CurrentSession) -> ResponseSchemaModel[list[GetEnvInstanceDetail]]:
+async def get_all_env_instances(
+    request: Request, db: CurrentReadSession
+) -> ResponseSchemaModel[list[GetEnvInstanceDetail]]:
     """获取所有环境配置实例"""
-    env_instances = await env_instance_service.get_all(db=db)
-    return response_base.success(data=env_instances)
+    etag = make_etag(await env_instance_service.get_version(db=db))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    items = await env_instance_service.get_all(db=db)
+    return response_base.fast_success(data=items, schema=list[GetEnvInstanceDetail], etag=etag)
+
+
+@router.get("/page", summary="游标分页获取环境配置实例")
+async def get_env_instance_page(
+    request: Request, db: CurrentReadSession, params: DependsCursorParams
+) -> ResponseSchemaModel[CursorPageData[GetEnvInstanceDetail]]:
+    """游标分页获取环境配置实例"""
+    etag = make_etag(await env_instance_service.get_version(db=db), params.cursor, params.size)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    page = await env_instance_service.get_page(db=db, params=params)
+    return response_base.fast_success(data=page, schema=CursorPageData[GetEnvInstanceDetail], etag=etag)
 
 @router.get("/{pk}", summary="根据ID获取环境配置实例")
-async def get_env_instance_by_id(db: CurrentSession, pk: int) -> ResponseSchemaModel[GetEnvInstanceDetail]:
+async def get_env_instance_by_id(
+    request: Request, db: CurrentReadSession, pk: int
+) -> ResponseSchemaModel[GetEnvInstanceDetail]:
     """根据ID获取环境配置实例"""
     env_instance = await env_instance_service.get(db=db, pk=pk)
-    return response_base.success(data=env_instance)
+    etag = row_etag(env_instance)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return response_base.fast_success(data=env_instance, schema=GetEnvInstanceDetail, etag=etag)
 
 
 @router.get("/by-name/{name}", summary="根据名称获取环境配置实例")
-async def get_env_instance_by_name(db: CurrentSession, name: str) -> ResponseSchemaModel[GetEnvInstanceDetail]:
+async def get_env_instance_by_name(
+    request: Request, db: CurrentReadSession, name: str
+) -> ResponseSchemaModel[GetEnvInstanceDetail]:
     """根据名称获取环境配置实例"""
     env_instance = await env_instance_service.get_by_name(db=db, name=name)
-    return response_base.success(data=env_instance)
+    etag = row_etag(env_instance)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return response_base.fast_success(data=env_instance, schema=GetEnvInstanceDetail, etag=etag)
 
 
 @router.get("/by-template-id/{template_id}", summary="根据模版ID获取环境配置实例")
-async def get_env_instance_by_template_id(db: CurrentSession, template_id: int) -> ResponseSchemaModel[list[GetEnvInstanceDetail]]:
+async def get_env_instance_by_template_id(
+    request: Request, db: CurrentReadSession, template_id: int
+) -> ResponseSchemaModel[list[GetEnvInstanceDetail]]:
     """根据模版ID获取环境配置实例"""
+    etag = make_etag(await env_instance_service.get_version(db=db, template_id=template_id))
+    if etag_matches(request, etag):
+        return not_modified(etag)
     env_instances = await env_instance_service.get_by_template_id(db=db, template_id=template_id)
-    return response_base.success(data=env_instances)
+    return response_base.fast_success(data=env_instances, schema=list[GetEnvInstanceDetail], etag=etag)
 
 
 @router.post("/create", summary="创建环境配置实例")
@@ -46,6 +83,17 @@ async def create_env_instance(
     await env_instance_service.create(db=db, obj=obj)
     return response_base.success()
 
+
+@router.post("/create/batch", summary="批量创建环境配置实例")
+async def create_env_instance_batch(
+    db: CurrentSessionTransaction,
+    objs: Annotated[list[CreateEnvInstanceParam], Body(min_length=1, max_length=1000)],
+) -> ResponseSchemaModel[BatchCreateResult]:
+    """批量创建环境配置实例, 名称冲突的项逐项返回失败原因"""
+    result = await env_instance_service.create_batch(db=db, objs=objs)
+    return response_base.success(data=result)
+
+
 @router.post("/update", summary="更新环境配置实例")
 async def update_env_instance(
     db: CurrentSessionTransaction, obj: UpdateEnvInstanceParam
@@ -55,6 +103,16 @@ async def update_env_instance(
     return response_base.success()
 
 
+@router.delete("/all", summary="删除所有环境配置实例")
+async def delete_all_env_instances(
+    db: CurrentSessionTransaction,
+    template_id: Annotated[int | None, Query(description="仅删除该模版下的实例")] = None,
+) -> ResponseModel:
+    """删除所有环境配置实例"""
+    count = await env_instance_service.delete_all(db=db, template_id=template_id)
+    return response_base.success(data={"count": count})
+
+
 @router.delete("/{pk}", summary="根据ID删除环境配置实例")
 async def delete_env_instance(db: CurrentSessionTransaction, pk: int) -> ResponseModel:
     """根据ID删除环境配置实例"""
@@ -62,12 +120,3 @@ async def delete_env_instance(db: CurrentSessionTransaction, pk: int) -> Respons
     if count > 0:
         return response_base.success()
     return response_base.fail()
-
-
-@router.delete("/all", summary="删除所有环境配置实例")
-async def delete_all_env_instances(db: CurrentSessionTransaction) -> ResponseModel:
-    """删除所有环境配置实例"""
-    count = await env_instance_service.delete_all(db=db)
-    if count >= 0:
-        return response_base.success()
-    return response_base.fail()
\ No newline at end of file
@@ -1,32 +1,64 @@
-from fastapi import APIRouter
+from typing import Annotated
+
+from fastapi import APIRouter, Body, Request
 
 from backend.app.env.schema.env_template import CreateEnvTemplateParam, GetEnvTemplateDetail
 from backend.app.env.service.env_template_service import env_template_service
+from backend.common.pagination import CursorPageData, DependsCursorParams
 from backend.common.response.response_schema import ResponseModel, ResponseSchemaModel, response_base
-from backend.database.db import CurrentSession, CurrentSessionTransaction
+from backend.common.schema import BatchCreateResult
+from backend.database.db import CurrentReadSession, CurrentSession, CurrentSessionTransaction
+from backend.utils.etag import etag_matches, make_etag, not_modified, row_etag
 
 router = APIRouter()
 
 
 @router.get("/all", summary="获取所有环境配置模版")
-async def get_all_env_templates(db: CurrentSession) -> ResponseSchemaModel[list[GetEnvTemplateDetail]]:
+async def get_all_env_templates(
+    request: Request, db: CurrentReadSession
+) -> ResponseSchemaModel[list[GetEnvTemplateDetail]]:
     """获取所有环境配置模版"""
-    env_templates = await env_template_service.get_all(db=db)
-    return response_base.success(data=env_templates)
+    etag = make_etag(await env_template_service.get_version(db=db))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    items = await env_template_service.get_all(db=db)
+    return response_base.fast_success(data=items, schema=list[GetEnvTemplateDetail], etag=etag)
+
+
+@router.get("/page", summary="游标分页获取环境配置模版")
+async def get_env_template_page(
+    request: Request, db: CurrentReadSession, params: DependsCursorParams
+) -> ResponseSchemaModel[CursorPageData[GetEnvTemplateDetail]]:
+    """游标分页获取环境配置模版"""
+    etag = make_etag(await env_template_service.get_version(db=db), params.cursor, params.size)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    page = await env_template_service.get_page(db=db, params=params)
+    return response_base.fast_success(data=page, schema=CursorPageData[GetEnvTemplateDetail], etag=etag)
 
 
 @router.get("/{pk}", summary="根据ID获取环境配置模版")
-async def get_env_template_by_id(db: CurrentSession, pk: int) -> ResponseSchemaModel[GetEnvTemplateDetail]:
-    """根据ID获取环境配置模版"""
+async def get_env_template_by_id(
+    request: Request, db: CurrentSession, pk: int
+) -> ResponseSchemaModel[GetEnvTemplateDetail]:
+    """根据ID获取环境配置模版, 未命中缓存时读取主库, 避免只读副本的延迟数据写入缓存"""
     env_template = await env_template_service.get(db=db, pk=pk)
-    return response_base.success(data=env_template)
+    etag = row_etag(env_template)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return response_base.fast_success(data=env_template, schema=GetEnvTemplateDetail, etag=etag)
 
 
 @router.get("/by-name/{name}", summary="根据名称获取环境配置模版")
-async def get_env_template_by_name(db: CurrentSession, name: str) -> ResponseSchemaModel[GetEnvTemplateDetail]:
-    """根据名称获取环境配置模版"""
+async def get_env_template_by_name(
+    request: Request, db: CurrentSession, name: str
+) -> ResponseSchemaModel[GetEnvTemplateDetail]:
+    """根据名称获取环境配置模版, 未命中缓存时读取主库, 避免只读副本的延迟数据写入缓存"""
     env_template = await env_template_service.get_by_name(db=db, name=name)
-    return response_base.success(data=env_template)
+    etag = row_etag(env_template)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return response_base.fast_success(data=env_template, schema=GetEnvTemplateDetail, etag=etag)
 
 
 @router.post("/create", summary="创建环境配置模版")
@@ -38,19 +70,27 @@ async def create_env_template(
     return response_base.success()
 
 
-@router.delete("/{pk}", summary="根据ID删除环境配置模版")
-async def delete_env_template(db: CurrentSessionTransaction, pk: int) -> ResponseModel:
-    """根据ID删除环境配置模版"""
-    count = await env_template_service.delete(db=db, pk=pk)
-    if count > 0:
-        return response_base.success()
-    return response_base.fail()
+@router.post("/create/batch", summary="批量创建环境配置模版")
+async def create_env_template_batch(
+    db: CurrentSessionTransaction,
+    objs: Annotated[list[CreateEnvTemplateParam], Body(min_length=1, max_length=1000)],
+) -> ResponseSchemaModel[BatchCreateResult]:
+    """批量创建环境配置模版, 名称冲突的项逐项返回失败原因"""
+    result = await env_template_service.create_batch(db=db, objs=objs)
+    return response_base.success(data=result)
 
 
 @router.delete("/all", summary="删除所有环境配置模版")
 async def delete_all_env_templates(db: CurrentSessionTransaction) -> ResponseModel:
     """删除所有环境配置模版"""
     count = await env_template_service.delete_all(db=db)
-    if count >= 0:
+    return response_base.success(data={"count": count})
+
+
+@router.delete("/{pk}", summary="根据ID删除环境配置模版")
+async def delete_env_template(db: CurrentSessionTransaction, pk: int) -> ResponseModel:
+    """根据ID删除环境配置模版"""
+    count = await env_template_service.delete(db=db, pk=pk)
+    if count > 0:
         return response_base.success()
-    return response_base.fail()
\ No newline at end of file
+    return response_base.fail()
@@ -1,4 +1,6 @@
 from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -6,6 +8,9 @@ from sqlalchemy_crud_plus import CRUDPlus
 
 from backend.app.env.model.env_instance import EnvInstance
 from backend.app.env.schema.env_instance import CreateEnvInstanceParam, UpdateEnvInstanceParam
+from backend.common.crud import bulk_delete, table_version
+from backend.common.pagination import CursorParams, paginate_by_cursor
+from backend.core.conf import settings
 
 
 class CRUDEnvInstance(CRUDPlus[EnvInstance]):
@@ -19,6 +24,17 @@ class CRUDEnvInstance(CRUDPlus[EnvInstance]):
         """获取所有环境配置实例"""
         return await self.select_models(db)
 
+    async def get_page(self, db: AsyncSession, params: CursorParams) -> dict[str, Any]:
+        """游标分页获取环境配置实例"""
+        return await paginate_by_cursor(db, select(EnvInstance), EnvInstance.id, params)
+
+    async def get_version(
+        self, db: AsyncSession, *, template_id: int | None = None
+    ) -> tuple[int, int | None, datetime | None]:
+        """查询环境配置实例数据版本, 可按模版 ID 过滤"""
+        whereclause = [EnvInstance.template_id == template_id] if template_id is not None else []
+        return await table_version(db, EnvInstance.id, *whereclause)
+
     async def get_by_name(self, db: AsyncSession, name: str) -> EnvInstance | None:
         """根据名称获取环境配置实例"""
         return await self.select_model_by_column(db, name=name)
@@ -45,4 +61,11 @@ class CRUDEnvInstance(CRUDPlus[EnvInstance]):
         await db.delete(env_instance)
         return 1
 
+    async def delete_all(self, db: AsyncSession, *, template_id: int | None = None) -> int:
+        """批量删除环境配置实例, 可按模版 ID 过滤"""
+        whereclause = [EnvInstance.template_id == template_id] if template_id is not None else []
+        return await bulk_delete(
+            db, EnvInstance.id, *whereclause, chunk_size=settings.DATABASE_BULK_DELETE_CHUNK_SIZE
+        )
+
 env_instance_dao: CRUDEnvInstance = CRUDEnvInstance(EnvInstance)
@@ -1,10 +1,16 @@
 from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
 
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy_crud_plus import CRUDPlus
 
 from backend.app.env.model.env_template import EnvTemplate
 from backend.app.env.schema.env_template import CreateEnvTemplateParam
+from backend.common.crud import bulk_delete, table_version
+from backend.common.pagination import CursorParams, paginate_by_cursor
+from backend.core.conf import settings
 
 
 class CRUDEnvTemplate(CRUDPlus[EnvTemplate]):
@@ -18,6 +24,14 @@ class CRUDEnvTemplate(CRUDPlus[EnvTemplate]):
         """获取所有环境配置模版"""
         return await self.select_models(db)
 
+    async def get_page(self, db: AsyncSession, params: CursorParams) -> dict[str, Any]:
+        """游标分页获取环境配置模版"""
+        return await paginate_by_cursor(db, select(EnvTemplate), EnvTemplate.id, params)
+
+    async def get_version(self, db: AsyncSession) -> tuple[int, int | None, datetime | None]:
+        """查询环境配置模版数据版本"""
+        return await table_version(db, EnvTemplate.id)
+
     async def get_by_name(self, db: AsyncSession, name: str) -> EnvTemplate | None:
         """根据名称获取环境配置模版"""
         return await self.select_model_by_column(db, name=name)
@@ -34,5 +48,9 @@ class CRUDEnvTemplate(CRUDPlus[EnvTemplate]):
         await db.delete(env_template)
         return 1
 
+    async def delete_all(self, db: AsyncSession) -> int:
+        """批量删除所有环境配置模版"""
+        return await bulk_delete(db, EnvTemplate.id, chunk_size=settings.DATABASE_BULK_DELETE_CHUNK_SIZE)
+
 
 env_template_dao: CRUDEnvTemplate = CRUDEnvTemplate(EnvTemplate)
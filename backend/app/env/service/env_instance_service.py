@@ -1,11 +1,16 @@
 from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.app.env.crud.crud_env_instance import env_instance_dao
 from backend.app.env.model.env_instance import EnvInstance
 from backend.app.env.schema.env_instance import CreateEnvInstanceParam, UpdateEnvInstanceParam
+from backend.common.crud import bulk_create_unique
 from backend.common.exception import errors
+from backend.common.pagination import CursorParams
+from backend.common.schema import BatchCreateResult
 
 
 class EnvInstanceService:
@@ -25,6 +30,18 @@ class EnvInstanceService:
         env_instances = await env_instance_dao.get_all(db)
         return env_instances
 
+    @staticmethod
+    async def get_page(*, db: AsyncSession, params: CursorParams) -> dict[str, Any]:
+        """游标分页获取环境配置实例"""
+        return await env_instance_dao.get_page(db, params)
+
+    @staticmethod
+    async def get_version(
+        *, db: AsyncSession, template_id: int | None = None
+    ) -> tuple[int, int | None, datetime | None]:
+        """获取环境配置实例数据版本, 用于生成集合 ETag"""
+        return await env_instance_dao.get_version(db, template_id=template_id)
+
     @staticmethod
     async def get_by_name(*, db: AsyncSession, name: str) -> EnvInstance | None:
         """根据名称获取环境配置实例"""
@@ -47,6 +64,15 @@ class EnvInstanceService:
             raise errors.ConflictError(msg="环境配置实例名称已存在")
         await env_instance_dao.create(db, obj)
 
+    @staticmethod
+    async def create_batch(*, db: AsyncSession, objs: list[CreateEnvInstanceParam]) -> BatchCreateResult:
+        """
+        批量创建环境配置实例
+
+        一次 IN 查询检查名称冲突(含请求内重复), 其余数据一次多行插入, 冲突项逐项返回失败原因
+        """
+        return await bulk_create_unique(db, EnvInstance.id, EnvInstance.name, objs, label="环境配置实例")
+
     @staticmethod
     async def update(*, db: AsyncSession, obj: UpdateEnvInstanceParam) -> None:
         """更新环境配置实例"""
@@ -65,14 +91,9 @@ class EnvInstanceService:
         return count
 
     @staticmethod
-    async def delete_all(*, db: AsyncSession) -> int:
-        """删除所有环境配置实例"""
-        env_instances = await env_instance_dao.get_all(db)
-        count = 0
-        for env_instance in env_instances:
-            await env_instance_dao.delete(db, env_instance.id)
-            count += 1
-        return count
+    async def delete_all(*, db: AsyncSession, template_id: int | None = None) -> int:
+        """删除所有环境配置实例, 指定模版 ID 时只删除该模版下的实例"""
+        return await env_instance_dao.delete_all(db, template_id=template_id)
 
 
 env_instance_service: EnvInstanceService = EnvInstanceService()
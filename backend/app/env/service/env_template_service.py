@@ -1,23 +1,86 @@
+import json
 from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.app.env.crud.crud_env_template import env_template_dao
 from backend.app.env.model.env_template import EnvTemplate
-from backend.app.env.schema.env_template import CreateEnvTemplateParam
+from backend.app.env.schema.env_template import CreateEnvTemplateParam, GetEnvTemplateDetail
+from backend.common.crud import bulk_create_unique
 from backend.common.exception import errors
+from backend.common.pagination import CursorParams
+from backend.common.schema import BatchCreateResult
+from backend.core.conf import settings
+from backend.database.notify import pg_notify, pg_notify_listener
+from backend.utils.cache import TTLCache, invalidate_on_commit
+
+# 按 ("id", pk) 与 ("name", name) 两种键缓存同一份详情
+env_template_cache: TTLCache[tuple[str, int | str], GetEnvTemplateDetail] = TTLCache(
+    "env_template",
+    maxsize=settings.ENV_TEMPLATE_CACHE_MAXSIZE,
+    ttl=settings.ENV_TEMPLATE_CACHE_TTL,
+)
+
+
+def _cache_put(env_template: EnvTemplate, generation: int) -> GetEnvTemplateDetail:
+    detail = GetEnvTemplateDetail.model_validate(env_template)
+    env_template_cache.set(("id", detail.id), detail, generation=generation)
+    env_template_cache.set(("name", detail.name), detail, generation=generation)
+    return detail
+
+
+def _cache_evict(payload: str) -> None:
+    """
+    按通知内容失效缓存
+
+    :param payload: ``{"id": .., "name": ..}`` 形式的 JSON, 为空时清空全部缓存
+    :return:
+    """
+    if not payload:
+        env_template_cache.clear()
+        return
+    key = json.loads(payload)
+    if key.get("id") is not None:
+        env_template_cache.pop(("id", key["id"]))
+    if key.get("name") is not None:
+        env_template_cache.pop(("name", key["name"]))
+
+
+async def _invalidate(db: AsyncSession, *, pk: int | None = None, name: str | None = None) -> None:
+    """
+    失效缓存, 不传 pk 与 name 时清空全部缓存
+
+    本进程立即失效并在提交后再失效一次, 配置了通知频道时随事务广播给其他 worker
+    """
+    payload = json.dumps({"id": pk, "name": name}) if pk is not None or name is not None else ""
+    invalidate_on_commit(db, lambda: _cache_evict(payload))
+    if settings.ENV_TEMPLATE_CACHE_NOTIFY_CHANNEL:
+        await pg_notify(db, settings.ENV_TEMPLATE_CACHE_NOTIFY_CHANNEL, payload)
+
+
+if settings.ENV_TEMPLATE_CACHE_NOTIFY_CHANNEL:
+    pg_notify_listener.register(settings.ENV_TEMPLATE_CACHE_NOTIFY_CHANNEL, _cache_evict)
 
 
 class EnvTemplateService:
     """环境配置模版服务类"""
 
     @staticmethod
-    async def get(*, db: AsyncSession, pk: int) -> EnvTemplate | None:
-        """获取环境配置模版"""
+    async def get(*, db: AsyncSession, pk: int) -> GetEnvTemplateDetail:
+        """
+        获取环境配置模版
+
+        未命中时从 db 读取并写入缓存, db 须为主库会话, 只读副本的延迟数据会在失效后重新写入缓存
+        """
+        if detail := env_template_cache.get(("id", pk)):
+            return detail
+        generation = env_template_cache.generation
         env_template = await env_template_dao.get(db, pk)
         if not env_template:
             raise errors.NotFoundError(msg="环境配置模版不存在")
-        return env_template
+        return _cache_put(env_template, generation)
 
     @staticmethod
     async def get_all(*, db: AsyncSession) -> Sequence[EnvTemplate]:
@@ -26,11 +89,25 @@ class EnvTemplateService:
         return env_templates
 
     @staticmethod
-    async def get_by_name(*, db: AsyncSession, name: str) -> EnvTemplate | None:
-        """根据名称获取环境配置模版"""
-        if await env_template_dao.get_by_name(db, name):
-            return await env_template_dao.get_by_name(db, name)
-        raise errors.NotFoundError(msg="环境配置模版不存在")
+    async def get_page(*, db: AsyncSession, params: CursorParams) -> dict[str, Any]:
+        """游标分页获取环境配置模版"""
+        return await env_template_dao.get_page(db, params)
+
+    @staticmethod
+    async def get_version(*, db: AsyncSession) -> tuple[int, int | None, datetime | None]:
+        """获取环境配置模版数据版本, 用于生成集合 ETag"""
+        return await env_template_dao.get_version(db)
+
+    @staticmethod
+    async def get_by_name(*, db: AsyncSession, name: str) -> GetEnvTemplateDetail:
+        """根据名称获取环境配置模版, db 须为主库会话"""
+        if detail := env_template_cache.get(("name", name)):
+            return detail
+        generation = env_template_cache.generation
+        env_template = await env_template_dao.get_by_name(db, name)
+        if not env_template:
+            raise errors.NotFoundError(msg="环境配置模版不存在")
+        return _cache_put(env_template, generation)
 
     @staticmethod
     async def create(*, db: AsyncSession, obj: CreateEnvTemplateParam) -> None:
@@ -39,6 +116,19 @@ class EnvTemplateService:
         if env_template:
             raise errors.ConflictError(msg="环境配置模版名称已存在")
         await env_template_dao.create(db, obj)
+        await _invalidate(db, name=obj.name)
+
+    @staticmethod
+    async def create_batch(*, db: AsyncSession, objs: list[CreateEnvTemplateParam]) -> BatchCreateResult:
+        """
+        批量创建环境配置模版
+
+        一次 IN 查询检查名称冲突(含请求内重复), 其余数据一次多行插入, 冲突项逐项返回失败原因
+        """
+        result = await bulk_create_unique(db, EnvTemplate.id, EnvTemplate.name, objs, label="环境配置模版")
+        if result.succeeded:
+            await _invalidate(db)
+        return result
 
     @staticmethod
     async def delete(*, db: AsyncSession, pk: int) -> int:
@@ -47,18 +137,14 @@ class EnvTemplateService:
         if not env_template:
             raise errors.NotFoundError(msg="环境配置模版不存在")
         count = await env_template_dao.delete(db, pk)
+        await _invalidate(db, pk=pk, name=env_template.name)
         return count
 
     @staticmethod
     async def delete_all(*, db: AsyncSession) -> int:
-        """删除所有环境配置模版
-        fixme: 优化一下，避免遍历删除
-        """
-        env_templates = await env_template_dao.get_all(db)
-        count = 0
-        for env_template in env_templates:
-            await env_template_dao.delete(db, env_template.id)
-            count += 1
+        """删除所有环境配置模版"""
+        count = await env_template_dao.delete_all(db)
+        await _invalidate(db)
         return count
 
 
@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+
+from backend.app.monitor.api.v1.cache import router as cache_router
+from backend.app.monitor.api.v1.database import router as database_router
+from backend.app.monitor.api.v1.metrics import router as metrics_router
+from backend.app.monitor.api.v1.snowflake import router as snowflake_router
+from backend.core.conf import settings
+
+v1 = APIRouter(prefix=f"{settings.FAST_API_V1_PATH}/monitor", tags=["系统监控"])
+
+v1.include_router(database_router, prefix="/database")
+v1.include_router(cache_router, prefix="/cache")
+v1.include_router(snowflake_router, prefix="/snowflake")
+v1.include_router(metrics_router, prefix="/metrics")
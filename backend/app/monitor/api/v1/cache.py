@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+
+from backend.common.response.response_schema import ResponseSchemaModel, response_base
+from backend.utils.cache import cache_registry
+
+router = APIRouter()
+
+
+@router.get("", summary="获取进程内缓存统计")
+async def get_cache_stats() -> ResponseSchemaModel[dict[str, dict]]:
+    """获取当前 worker 的进程内缓存命中统计"""
+    return response_base.success(data={name: cache.stats() for name, cache in cache_registry.items()})
@@ -0,0 +1,20 @@
+from fastapi import APIRouter
+
+from backend.common.response.response_schema import ResponseSchemaModel, response_base
+from backend.database.db import async_engine, replica_router
+from backend.database.pool import get_pool_status
+
+router = APIRouter()
+
+
+@router.get("/pool", summary="获取数据库连接池状态")
+async def get_database_pool_status() -> ResponseSchemaModel[list[dict]]:
+    """获取数据库连接池状态"""
+    engines = [async_engine, *replica_router.engines]
+    return response_base.success(data=[get_pool_status(engine) for engine in engines])
+
+
+@router.get("/replica", summary="获取只读副本健康状态")
+async def get_database_replica_status() -> ResponseSchemaModel[dict[str, bool]]:
+    """获取只读副本健康状态"""
+    return response_base.success(data=replica_router.status())
@@ -0,0 +1,24 @@
+from fastapi import APIRouter
+from starlette.responses import PlainTextResponse
+
+from backend.database.db import async_engine, replica_router
+from backend.database.pool import render_pool_metrics
+from backend.database.query_metrics import query_duration
+from backend.middleware.metrics_middleware import (
+    request_db_duration,
+    request_db_queries,
+    request_duration,
+    request_pool_wait,
+)
+
+router = APIRouter()
+
+
+@router.get("", summary="Prometheus 指标", response_class=PlainTextResponse)
+async def get_metrics() -> PlainTextResponse:
+    """以 Prometheus 文本格式导出当前 worker 的请求、数据库语句与连接池指标"""
+    lines = []
+    for histogram in (request_duration, request_db_duration, request_db_queries, request_pool_wait, query_duration):
+        lines.extend(histogram.render())
+    lines.extend(render_pool_metrics([async_engine, *replica_router.engines]))
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
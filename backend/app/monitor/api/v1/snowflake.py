@@ -0,0 +1,15 @@
+import dataclasses
+
+from fastapi import APIRouter
+
+from backend.common.response.response_schema import ResponseSchemaModel, response_base
+from backend.database.snowflake_lease import snowflake_lease_manager
+
+router = APIRouter()
+
+
+@router.get("", summary="获取当前进程的雪花 ID 节点")
+async def get_snowflake_node() -> ResponseSchemaModel[dict | None]:
+    """获取当前 worker 分配到的雪花 ID 集群与节点"""
+    info = snowflake_lease_manager.info
+    return response_base.success(data=dataclasses.asdict(info) if info else None)
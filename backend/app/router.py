@@ -1,9 +1,13 @@
 from fastapi import APIRouter
 
 # from backend.app.agent.api.router import v1 as agent_meta_v1
+from backend.app.deduction.api.router import v1 as deduction_v1
 from backend.app.env.api.router import v1 as env_v1
+from backend.app.monitor.api.router import v1 as monitor_v1
 
 route = APIRouter()
 
 # route.include_router(agent_meta_v1)
 route.include_router(env_v1)
+route.include_router(deduction_v1)
+route.include_router(monitor_v1)
@@ -1,33 +1,61 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 
 from backend.app.scheme.schema.scheme import CreateSchemeParam, GetSchemeDetail
 from backend.app.scheme.service.scheme_service import scheme_service
+from backend.common.pagination import CursorPageData, DependsCursorParams
 from backend.common.response.response_schema import ResponseModel, ResponseSchemaModel, response_base
-from backend.database.db import CurrentSession, CurrentSessionTransaction
+from backend.database.db import CurrentReadSession, CurrentSessionTransaction
+from backend.utils.etag import etag_matches, make_etag, not_modified, row_etag
 
 router = APIRouter()
 
 
 @router.get("/all", summary="获取所有方案配置")
-async def get_all_schemes(db: CurrentSession) -> ResponseSchemaModel[list[GetSchemeDetail]]:
+async def get_all_schemes(
+    request: Request, db: CurrentReadSession
+) -> ResponseSchemaModel[list[GetSchemeDetail]]:
     """获取所有方案配置"""
-    schemes = await scheme_service.get_all(db=db)
+    etag = make_etag(await scheme_service.get_version(db=db))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    items = await scheme_service.get_all(db=db)
+    return response_base.fast_success(data=items, schema=list[GetSchemeDetail], etag=etag)
 
-    return response_base.success(data=schemes)
+
+@router.get("/page", summary="游标分页获取方案配置")
+async def get_scheme_page(
+    request: Request, db: CurrentReadSession, params: DependsCursorParams
+) -> ResponseSchemaModel[CursorPageData[GetSchemeDetail]]:
+    """游标分页获取方案配置"""
+    etag = make_etag(await scheme_service.get_version(db=db), params.cursor, params.size)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    page = await scheme_service.get_page(db=db, params=params)
+    return response_base.fast_success(data=page, schema=CursorPageData[GetSchemeDetail], etag=etag)
 
 
 @router.get("/{pk}", summary="获取方案配置详情")
-async def get_scheme_by_id(db: CurrentSession, pk: int) -> ResponseSchemaModel[GetSchemeDetail]:
+async def get_scheme_by_id(
+    request: Request, db: CurrentReadSession, pk: int
+) -> ResponseSchemaModel[GetSchemeDetail]:
     """获取方案配置详情"""
     scheme = await scheme_service.get(db=db, pk=pk)
-    return response_base.success(data=scheme)
+    etag = row_etag(scheme)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return response_base.fast_success(data=scheme, schema=GetSchemeDetail, etag=etag)
 
 
 @router.get("/by-name/{name}", summary="根据名称获取方案配置详情")
-async def get_scheme_by_name(db: CurrentSession, name: str) -> ResponseSchemaModel[GetSchemeDetail]:
+async def get_scheme_by_name(
+    request: Request, db: CurrentReadSession, name: str
+) -> ResponseSchemaModel[GetSchemeDetail]:
     """根据名称获取方案配置详情"""
     scheme = await scheme_service.get_by_name(db=db, name=name)
-    return response_base.success(data=scheme)
+    etag = row_etag(scheme)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return response_base.fast_success(data=scheme, schema=GetSchemeDetail, etag=etag)
 
 
 @router.post("/create", summary="创建方案配置")
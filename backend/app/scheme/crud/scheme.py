@@ -1,10 +1,15 @@
 from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
 
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy_crud_plus import CRUDPlus
 
 from backend.app.scheme.model.scheme import Scheme
 from backend.app.scheme.schema.scheme import CreateSchemeInternal
+from backend.common.crud import table_version
+from backend.common.pagination import CursorParams, paginate_by_cursor
 
 
 class CRUDScheme(CRUDPlus[Scheme]):
@@ -18,6 +23,14 @@ class CRUDScheme(CRUDPlus[Scheme]):
         """获取所有方案配置"""
         return await self.select_models(db)
 
+    async def get_page(self, db: AsyncSession, params: CursorParams) -> dict[str, Any]:
+        """游标分页获取方案配置"""
+        return await paginate_by_cursor(db, select(Scheme), Scheme.id, params)
+
+    async def get_version(self, db: AsyncSession) -> tuple[int, int | None, datetime | None]:
+        """查询方案配置数据版本"""
+        return await table_version(db, Scheme.id)
+
     async def get_by_name(self, db: AsyncSession, name: str) -> Scheme | None:
         """根据名称获取方案配置"""
         return await self.select_model_by_column(db, name=name)
@@ -1,4 +1,6 @@
 from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -6,6 +8,7 @@ from backend.app.scheme.crud.scheme import scheme_dao
 from backend.app.scheme.model.scheme import Scheme
 from backend.app.scheme.schema.scheme import CreateSchemeInternal, CreateSchemeParam
 from backend.common.exception import errors
+from backend.common.pagination import CursorParams
 
 
 class SchemeService:
@@ -24,6 +27,16 @@ class SchemeService:
         """获取所有方案配置"""
         return await scheme_dao.get_all(db)
 
+    @staticmethod
+    async def get_page(*, db: AsyncSession, params: CursorParams) -> dict[str, Any]:
+        """游标分页获取方案配置"""
+        return await scheme_dao.get_page(db, params)
+
+    @staticmethod
+    async def get_version(*, db: AsyncSession) -> tuple[int, int | None, datetime | None]:
+        """获取方案配置数据版本, 用于生成集合 ETag"""
+        return await scheme_dao.get_version(db)
+
     @staticmethod
     async def get_by_name(*, db: AsyncSession, name: str) -> Scheme | None:
         """根据名称获取方案配置"""
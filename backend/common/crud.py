@@ -1 +1,205 @@
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
 
+from pydantic import BaseModel
+from sqlalchemy import ColumnElement, Table, case, delete, func, insert, or_, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from backend.common.schema import BatchCreateResult, BatchItemResult
+from backend.utils.timezone import timezone
+
+
+async def bulk_create_unique(
+    db: AsyncSession,
+    pk: InstrumentedAttribute[int],
+    name: InstrumentedAttribute[str],
+    objs: Sequence[BaseModel],
+    *,
+    label: str,
+) -> BatchCreateResult:
+    """
+    名称唯一的批量创建
+
+    一次 IN 查询检查名称冲突(含请求内重复), 其余数据一次多行插入, 冲突项逐项返回失败原因;
+    检查之后被并发请求插入的同名数据在插入时跳过, 同样按名称已存在返回
+
+    :param db: 数据库会话
+    :param pk: 主键列
+    :param name: 唯一名称列
+    :param objs: 创建参数, 与名称列同名的字段作为名称
+    :param label: 资源名称, 用于失败原因
+    :return:
+    """
+    names = [getattr(obj, name.key) for obj in objs]
+    existing = set((await db.execute(select(name).where(name.in_(set(names))))).scalars().all()) if names else set()
+    results, pending, seen = [], [], set()
+    for idx, (obj, obj_name) in enumerate(zip(objs, names, strict=True)):
+        if obj_name in existing:
+            results.append(BatchItemResult(index=idx, name=obj_name, success=False, msg=f"{label}名称已存在"))
+        elif obj_name in seen:
+            results.append(BatchItemResult(index=idx, name=obj_name, success=False, msg=f"{label}名称在请求中重复"))
+        else:
+            seen.add(obj_name)
+            pending.append((idx, obj_name, obj))
+
+    inserted = await _insert_skip_conflicts(db, pk, name, [obj.model_dump() for _, _, obj in pending])
+    for idx, obj_name, _ in pending:
+        if obj_name in inserted:
+            results.append(BatchItemResult(index=idx, name=obj_name, success=True, id=inserted[obj_name]))
+        else:
+            results.append(BatchItemResult(index=idx, name=obj_name, success=False, msg=f"{label}名称已存在"))
+    return BatchCreateResult.from_items(results)
+
+
+async def _insert_skip_conflicts(
+    db: AsyncSession,
+    pk: InstrumentedAttribute[int],
+    name: InstrumentedAttribute[str],
+    rows: Sequence[dict[str, Any]],
+) -> dict[str, int]:
+    """
+    多行插入并跳过唯一名称冲突的行
+
+    PostgreSQL / SQLite 使用 ``ON CONFLICT (name) DO NOTHING RETURNING``;
+    MySQL 冲突时回滚到保存点, 以锁定读取最新提交的名称, 去掉冲突行后重试
+
+    :param db: 数据库会话
+    :param pk: 主键列
+    :param name: 唯一名称列
+    :param rows: 待插入的数据, 名称互不相同
+    :return: 成功插入的名称与主键
+    """
+    if not rows:
+        return {}
+    now = timezone.now()
+    params = [{"create_at": now, **row} for row in rows]
+    model = pk.class_
+    dialect = db.bind.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert_ = postgresql_insert if dialect == "postgresql" else sqlite_insert
+        stmt = insert_(model).on_conflict_do_nothing(index_elements=[name.key]).returning(pk, name)
+        result = await db.execute(stmt, params)
+        return {row_name: row_id for row_id, row_name in result.all()}
+
+    while params:
+        try:
+            async with db.begin_nested():
+                await db.execute(insert(model), params)
+            break
+        except IntegrityError:
+            names = [row[name.key] for row in params]
+            taken = set((await db.execute(select(name).where(name.in_(names)).with_for_update())).scalars().all())
+            if not taken:
+                raise
+            params = [row for row in params if row[name.key] not in taken]
+    if not params:
+        return {}
+    stmt = select(pk, name).where(name.in_([row[name.key] for row in params]))
+    return {row_name: row_id for row_id, row_name in (await db.execute(stmt)).all()}
+
+
+async def bulk_delete(
+    db: AsyncSession,
+    pk: InstrumentedAttribute[int],
+    *whereclause: ColumnElement[bool],
+    chunk_size: int = 0,
+) -> int:
+    """
+    批量删除, 不加载 ORM 对象
+
+    chunk_size 为 0 时发出单条 ``DELETE ... RETURNING id`` (不支持 RETURNING 的数据库使用 rowcount);
+    否则按主键顺序每次删除 chunk_size 行, 直到没有匹配的数据
+
+    :param db: 数据库会话
+    :param pk: 主键列
+    :param whereclause: 过滤条件
+    :param chunk_size: 分块大小
+    :return: 删除的行数
+    """
+    table = pk.table
+    if chunk_size <= 0:
+        stmt = delete(table).where(*whereclause)
+        if db.bind.dialect.delete_returning:
+            result = await db.execute(stmt.returning(table.c[pk.key]))
+            return len(result.all())
+        result = await db.execute(stmt)
+        return result.rowcount
+
+    count = 0
+    while True:
+        # 包一层子查询, 兼容不支持在 IN 子查询中使用 LIMIT 的数据库
+        ids = (
+            select(table.c[pk.key]).where(*whereclause).order_by(table.c[pk.key]).limit(chunk_size).subquery()
+        )
+        result = await db.execute(delete(table).where(table.c[pk.key].in_(select(ids.c[pk.key]))))
+        count += result.rowcount
+        if result.rowcount < chunk_size:
+            return count
+
+
+async def table_version(
+    db: AsyncSession, pk: InstrumentedAttribute[int], *whereclause: ColumnElement[bool]
+) -> tuple[int, int | None, datetime | None]:
+    """
+    查询数据集版本, 用于生成集合接口的 ETag
+
+    新增会改变行数与最大主键, 删除会改变行数, 更新会改变最大更新时间
+
+    :param db: 数据库会话
+    :param pk: 主键列
+    :param whereclause: 过滤条件
+    :return: (行数, 最大主键, 最大更新时间)
+    """
+    model = pk.class_
+    stmt = select(func.count(pk), func.max(pk), func.max(model.update_at)).where(*whereclause)
+    count, max_id, max_update_at = (await db.execute(stmt)).one()
+    return count, max_id, max_update_at
+
+
+async def bulk_upsert(
+    db: AsyncSession,
+    table: Table,
+    rows: Sequence[dict[str, Any]],
+    *,
+    keys: Sequence[str],
+    newer: str,
+) -> None:
+    """
+    按唯一键批量插入或更新, 仅当新数据的 newer 列大于已有数据时才覆盖
+
+    多个写入方并发提交时, 较旧的状态不会覆盖较新的状态
+
+    :param db: 数据库会话
+    :param table: 表
+    :param rows: 待写入的数据, 每行须包含表中所有非空列
+    :param keys: 唯一键列名
+    :param newer: 用于比较新旧的列名, 通常为 update_at
+    :return:
+    """
+    if not rows:
+        return
+    columns = [name for name in rows[0] if name not in keys and name != "create_at"]
+    dialect = db.bind.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert_ = postgresql_insert if dialect == "postgresql" else sqlite_insert
+        stmt = insert_(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c[key] for key in keys],
+            set_={name: stmt.excluded[name] for name in columns},
+            where=or_(table.c[newer].is_(None), table.c[newer] < stmt.excluded[newer]),
+        )
+    else:
+        stmt = mysql_insert(table)
+        is_newer = or_(table.c[newer].is_(None), table.c[newer] < stmt.inserted[newer])
+        # MySQL 按顺序赋值, 比较列必须最后更新
+        ordered = [name for name in columns if name != newer] + [newer]
+        stmt = stmt.on_duplicate_key_update(
+            [(name, case((is_newer, stmt.inserted[name]), else_=table.c[name])) for name in ordered]
+        )
+    await db.execute(stmt, list(rows))
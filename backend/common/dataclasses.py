@@ -6,6 +6,31 @@ class UploadUrl:
     url: str
 
 
+@dataclasses.dataclass
+class SpooledFile:
+    path: str
+    size: int
+    sha256: str
+
+
+@dataclasses.dataclass
+class ZipMemberError:
+    name: str
+    reason: str
+
+
+@dataclasses.dataclass
+class ZipVerifyReport:
+    member_count: int
+    total_size: int
+    parallel: bool
+    corrupt_members: list[ZipMemberError] = dataclasses.field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.corrupt_members
+
+
 @dataclasses.dataclass
 class SnowflakeInfo:
     timestamp: int
@@ -58,3 +58,25 @@ class TaskLogLevel(StrEnum):
     warning = "warning"
     error = "error"
     critical = "critical"
+
+
+class WorkflowNodeStatus(StrEnum):
+    """工作流节点执行状态枚举"""
+    pending = "pending"
+    waiting = "waiting"
+    ready = "ready"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+    skipped = "skipped"
+    stopped = "stopped"
+
+
+class WorkflowDependencyType(StrEnum):
+    """工作流节点依赖类型枚举"""
+    # 上游成功后触发, 上游失败或被跳过时下游被跳过
+    success = "success"
+    # 上游结束 (成功、失败或跳过) 后触发
+    finish = "finish"
+    # 上游开始执行或被跳过后即触发
+    any = "any"
@@ -1,39 +1,151 @@
-import inspect
 import logging
 import os
+import random
 import sys
 
 from loguru import logger
 
+from backend.common.log_sink import JsonLinesSink
 from backend.core.conf import settings
 from backend.core.path_conf import LOG_DIR
 
 
+class _RateLimiter:
+    """按秒计数的限流器, 进入新的一秒时返回上一秒被丢弃的条数"""
+
+    def __init__(self, name: str, limit: int) -> None:
+        self.name = name
+        self.limit = limit
+        self.window = 0
+        self.count = 0
+        self.dropped = 0
+
+    def acquire(self, now: int) -> tuple[bool, int]:
+        dropped = 0
+        if now != self.window:
+            dropped, self.window, self.count, self.dropped = self.dropped, now, 0, 0
+        if self.count < self.limit:
+            self.count += 1
+            return True, dropped
+        self.dropped += 1
+        return False, dropped
+
+
 class InterceptHandler(logging.Handler):
     """
     日志拦截处理器，用于将标准库的日志重定向到 loguru
 
+    - 日志级别解析结果按级别名缓存
+    - 仅在日志格式需要调用位置时才回溯栈帧
+    - 可按日志器名称前缀对低于 WARNING 的日志采样或限流
+
     参考：https://loguru.readthedocs.io/en/stable/overview.html#entirely-compatible-with-standard-logging
     """
 
+    def __init__(
+        self,
+        *,
+        caller_location: bool = True,
+        sample_rates: dict[str, float] | None = None,
+        rate_limits: dict[str, int] | None = None,
+    ) -> None:
+        """
+        初始化日志拦截处理器
+
+        :param caller_location: 是否回溯栈帧获取调用位置
+        :param sample_rates: 日志器名称前缀: 采样率 (0-1)
+        :param rate_limits: 日志器名称前缀: 每秒最多条数
+        :return:
+        """
+        super().__init__()
+        self.caller_location = caller_location
+        self.sample_rates = sample_rates or {}
+        self.rate_limits = rate_limits or {}
+        self._levels: dict[str, str | int] = {}
+        self._policies: dict[str, tuple[float | None, _RateLimiter | None]] = {}
+        self._limiters = {prefix: _RateLimiter(prefix, limit) for prefix, limit in self.rate_limits.items()}
+
+    def _level(self, record: logging.LogRecord) -> str | int:
+        level = self._levels.get(record.levelname)
+        if level is None:
+            try:
+                level = logger.level(record.levelname).name
+            except ValueError:
+                level = record.levelno
+            self._levels[record.levelname] = level
+        return level
+
+    @staticmethod
+    def _match(name: str, prefixes: dict) -> str | None:
+        """最长前缀匹配, 前缀按日志器层级匹配"""
+        best = None
+        for prefix in prefixes:
+            if (name == prefix or name.startswith(prefix + ".")) and (best is None or len(prefix) > len(best)):
+                best = prefix
+        return best
+
+    def _policy(self, name: str) -> tuple[float | None, _RateLimiter | None]:
+        policy = self._policies.get(name)
+        if policy is None:
+            sample_prefix = self._match(name, self.sample_rates)
+            limit_prefix = self._match(name, self.rate_limits)
+            policy = (
+                self.sample_rates[sample_prefix] if sample_prefix else None,
+                self._limiters[limit_prefix] if limit_prefix else None,
+            )
+            self._policies[name] = policy
+        return policy
+
     def emit(self, record: logging.LogRecord):
-        try:
-            level = logger.level(record.levelname).name
-        except ValueError:
-            level = record.levelno
+        if record.levelno < logging.WARNING and (self.sample_rates or self.rate_limits):
+            sample_rate, limiter = self._policy(record.name)
+            if sample_rate is not None and random.random() >= sample_rate:
+                return
+            if limiter is not None:
+                allowed, dropped = limiter.acquire(int(record.created))
+                if dropped:
+                    logger.log("WARNING", f"{limiter.name} 日志超过限流, 上一秒丢弃 {dropped} 条")
+                if not allowed:
+                    return
+
+        depth = 0
+        if self.caller_location:
+            frame, depth = sys._getframe(), 0
+            while frame and (depth == 0 or frame.f_code.co_filename == logging.__file__):
+                frame = frame.f_back
+                depth += 1
+
+        logger.opt(depth=depth, exception=record.exc_info).log(self._level(record), record.getMessage())
 
-        frame, depth = inspect.currentframe(), 0
-        while frame and (depth == 0 or frame.f_code.co_filename == logging.__file__):
-            frame = frame.f_back
-            depth += 1
 
-        logger.opt(depth=depth, exception=record.exc_info).log(level, record.getMessage())
+# 需要回溯栈帧才能得到的日志格式字段
+_CALLER_FIELDS = ("{name", "{module", "{function", "{file", "{line")
+
+
+def _needs_caller_location() -> bool:
+    """
+    判断标准库日志转发时是否需要回溯栈帧
+
+    JSON 日志文件会写入 name/function/line, 始终需要调用位置; 文本格式仅在包含调用位置字段时需要.
+    默认格式只有 time/level/message, 不回溯栈帧, 开销见 local/bench/bench_log_intercept.py
+
+    :return:
+    """
+    if settings.LOG_FILE_TYPE == "json":
+        return True
+    return any(field in fmt for fmt in (settings.LOG_STD_FORMAT, settings.LOG_FILE_FORMAT) for field in _CALLER_FIELDS)
 
 
 def setup_logging() -> None:
     """配置日志处理器"""
     # 设置根日志处理器和等级
-    logging.root.handlers = [InterceptHandler()]
+    logging.root.handlers = [
+        InterceptHandler(
+            caller_location=_needs_caller_location(),
+            sample_rates=settings.LOG_SAMPLE_RATES,
+            rate_limits=settings.LOG_RATE_LIMITS,
+        )
+    ]
     logging.root.setLevel(settings.LOG_STD_LEVEL)
 
     # 配置日志传播规则
@@ -63,6 +175,22 @@ def set_custom_logfile():
     if not os.path.exists(log_path):
         os.makedirs(log_path)
 
+    if settings.LOG_FILE_TYPE == "json":
+        sink = JsonLinesSink(
+            os.path.join(log_path, settings.LOG_JSON_FILENAME),
+            rotation_size=settings.LOG_JSON_ROTATION_SIZE,
+            rotation_interval=settings.LOG_JSON_ROTATION_INTERVAL,
+            retention=settings.LOG_JSON_RETENTION,
+            batch_size=settings.LOG_JSON_BATCH_SIZE,
+            flush_interval=settings.LOG_JSON_FLUSH_INTERVAL,
+            compress=settings.LOG_JSON_COMPRESS,
+            queue_size=settings.LOG_JSON_QUEUE_SIZE,
+            socket_address=settings.LOG_JSON_SOCKET,
+        )
+        # sink 自行序列化 record, 不需要渲染格式字符串
+        logger.add(sink, level=settings.LOG_ACCESS_FILE_LEVEL, format="{message}", backtrace=False, diagnose=False)
+        return
+
     # 日志文件
     log_access_file = os.path.join(log_path, settings.LOG_ACCESS_FILENAME)
     log_error_file = os.path.join(log_path, settings.LOG_ERROR_FILENAME)
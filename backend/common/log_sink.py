@@ -0,0 +1,266 @@
+import gzip
+import os
+import queue
+import shutil
+import socket
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any
+
+import msgspec
+
+# 写线程退出标记
+_STOP = object()
+
+
+def _enc_hook(obj: Any) -> Any:
+    return str(obj)
+
+
+_encoder = msgspec.json.Encoder(enc_hook=_enc_hook)
+
+
+def _report(message: str) -> None:
+    """sink 自身出错时直接写 stderr, 避免递归写入 loguru"""
+    try:
+        sys.stderr.write(f"[log-json] {message}\n{traceback.format_exc()}")
+        sys.stderr.flush()
+    except Exception:
+        pass
+
+
+def serialize_record(record: dict[str, Any]) -> bytes:
+    """
+    将 loguru 日志记录序列化为一行 JSON
+
+    :param record: loguru 日志记录
+    :return:
+    """
+    data = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "message": record["message"],
+        "name": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        "process": record["process"].id,
+        "thread": record["thread"].id,
+    }
+    if record["extra"]:
+        data["extra"] = record["extra"]
+    exception = record["exception"]
+    if exception is not None:
+        data["exception"] = {
+            "type": exception.type.__name__ if exception.type else None,
+            "value": str(exception.value),
+            "traceback": "".join(traceback.format_exception(exception.type, exception.value, exception.traceback)),
+        }
+    return _encoder.encode(data) + b"\n"
+
+
+class _SocketTarget:
+    """TCP / Unix socket 目标, 断开后按退避间隔重连, 重连前的日志直接丢弃"""
+
+    def __init__(self, address: str, retry_interval: float = 5) -> None:
+        """
+        :param address: tcp://host:port 或 unix:///path/to/socket
+        :param retry_interval: 重连间隔秒数
+        """
+        self.address = address
+        self.retry_interval = retry_interval
+        self._sock: socket.socket | None = None
+        self._retry_at = 0.0
+
+    def _connect(self) -> socket.socket:
+        if self.address.startswith("unix://"):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(self.address.removeprefix("unix://"))
+        else:
+            host, _, port = self.address.removeprefix("tcp://").rpartition(":")
+            sock = socket.create_connection((host, int(port)), timeout=self.retry_interval)
+        return sock
+
+    def send(self, data: bytes) -> None:
+        if self._sock is None:
+            if time.monotonic() < self._retry_at:
+                return
+            try:
+                self._sock = self._connect()
+            except OSError:
+                self._retry_at = time.monotonic() + self.retry_interval
+                return
+        try:
+            self._sock.sendall(data)
+        except OSError:
+            self.close()
+            self._retry_at = time.monotonic() + self.retry_interval
+
+    def close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            finally:
+                self._sock = None
+
+
+class JsonLinesSink:
+    """
+    结构化 JSON Lines 日志 sink
+
+    调用线程只做序列化并入队; 后台写线程按批写入文件与可选的 socket 目标,
+    按大小或时间轮转, 轮转后的文件交给压缩线程压缩, 写线程不会被压缩阻塞.
+    队列有上限, 满时丢弃新日志; 写入失败只报告到 stderr, 写线程继续消费队列
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        rotation_size: int,
+        rotation_interval: int,
+        retention: int,
+        batch_size: int,
+        flush_interval: float,
+        compress: bool,
+        socket_address: str | None = None,
+        queue_size: int = 100_000,
+    ) -> None:
+        """
+        初始化 JSON Lines sink
+
+        :param path: 日志文件路径
+        :param rotation_size: 按大小轮转的字节数, 0 表示不按大小轮转
+        :param rotation_interval: 按时间轮转的秒数, 0 表示不按时间轮转
+        :param retention: 保留的历史文件数
+        :param batch_size: 每批最多写入的日志条数
+        :param flush_interval: 最长刷新间隔秒数
+        :param compress: 是否 gzip 压缩轮转后的文件
+        :param socket_address: 可选的 socket 目标, tcp://host:port 或 unix:///path
+        :param queue_size: 待写入队列上限, 超出后丢弃新日志
+        :return:
+        """
+        self.path = path
+        self.rotation_size = rotation_size
+        self.rotation_interval = rotation_interval
+        self.retention = retention
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.compress = compress
+        self._socket = _SocketTarget(socket_address) if socket_address else None
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._dropped = 0
+        self._dropped_lock = threading.Lock()
+        self._compressor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="log-compress")
+        self._file = None
+        self._size = 0
+        self._rotate_at = 0.0
+        self._open()
+        self._thread = threading.Thread(target=self._run, name="log-json-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, message) -> None:
+        """loguru 调用的写入方法"""
+        try:
+            self._queue.put_nowait(serialize_record(message.record))
+        except queue.Full:
+            with self._dropped_lock:
+                self._dropped += 1
+
+    def stop(self) -> None:
+        """写出剩余日志并关闭, loguru 移除 sink 时调用"""
+        if not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._compressor.shutdown(wait=True)
+
+    def _open(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._file = open(self.path, "ab")
+        self._size = self._file.tell()
+        if self.rotation_interval:
+            self._rotate_at = time.time() + self.rotation_interval
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch: list[bytes] = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=max(timeout, 0)) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._report_dropped()
+            try:
+                if batch:
+                    self._write(b"".join(batch))
+                elif self.rotation_interval and time.time() >= self._rotate_at:
+                    self._rotate()
+            except Exception:
+                _report(f"写入 {self.path} 失败, 丢弃 {len(batch)} 条日志")
+        if self._file is not None:
+            self._file.close()
+        if self._socket is not None:
+            self._socket.close()
+
+    def _report_dropped(self) -> None:
+        if not self._dropped:
+            return
+        with self._dropped_lock:
+            dropped, self._dropped = self._dropped, 0
+        sys.stderr.write(f"[log-json] 日志队列已满, 丢弃 {dropped} 条日志\n")
+
+    def _write(self, data: bytes) -> None:
+        if self._file is None:
+            # 上次轮转后重新打开失败, 先恢复文件再写入
+            self._open()
+        if (self.rotation_size and self._size + len(data) > self.rotation_size and self._size) or (
+            self.rotation_interval and time.time() >= self._rotate_at
+        ):
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+        self._size += len(data)
+        if self._socket is not None:
+            self._socket.send(data)
+
+    def _rotate(self) -> None:
+        file, self._file = self._file, None
+        file.close()
+        if self._size:
+            rotated = f"{self.path}.{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+            os.replace(self.path, rotated)
+            self._compressor.submit(self._finish_rotated, rotated)
+        self._open()
+
+    def _finish_rotated(self, rotated: str) -> None:
+        """压缩轮转后的文件并清理超出保留数量的历史文件, 在压缩线程中执行"""
+        try:
+            self._compress_and_prune(rotated)
+        except Exception:
+            _report(f"处理轮转文件 {rotated} 失败")
+
+    def _compress_and_prune(self, rotated: str) -> None:
+        if self.compress:
+            with open(rotated, "rb") as src, gzip.open(f"{rotated}.gz", "wb") as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            os.remove(rotated)
+        directory, base = os.path.split(self.path)
+        history = sorted(
+            name for name in os.listdir(directory or ".") if name.startswith(f"{base}.") and name != base
+        )
+        for name in history[: max(len(history) - self.retention, 0)]:
+            try:
+                os.remove(os.path.join(directory, name))
+            except FileNotFoundError:
+                pass
@@ -71,7 +71,8 @@ class TimeZone(TypeDecorator[datetime]):
         return datetime
 
     def process_bind_param(self, value: datetime | None, dialect) -> datetime | None:
-        if value is not None and value.utcoffset() != timezone.now().utcoffset():
+        # ZoneInfo 按名称缓存实例, 已是目标时区的值直接比较身份即可跳过转换
+        if value is not None and value.tzinfo is not timezone.tz_info:
             value = timezone.f_datetime(value)
         return value
 
@@ -82,12 +83,17 @@ class TimeZone(TypeDecorator[datetime]):
 
 
 class DateTimeMixin(MappedAsDataclass):
-    """日期时间 mixin数据类"""
+    """
+    日期时间 mixin数据类
+
+    create_at / update_at 为列级默认值, 核心语句未提供时同样生效;
+    批量写入 (bulk_create_unique / bulk_upsert / 任务日志批量写入) 每条语句显式传入一次时间, 不逐行生成
+    """
 
     create_at: Mapped[datetime] = mapped_column(
         TimeZone,
         init=False,
-        default_factory=timezone.now,
+        insert_default=timezone.now,
         sort_order=999,
         comment="创建时间"
     )
@@ -0,0 +1,91 @@
+import base64
+import binascii
+import dataclasses
+from typing import Annotated, Any, Generic, TypeVar
+
+import msgspec
+from fastapi import Depends, Query
+from pydantic import BaseModel, Field
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from backend.common.exception import errors
+from backend.common.response.response_code import StandardResponseCode
+
+SchemaT = TypeVar("SchemaT")
+
+# 游标版本号, 游标格式变化时递增使旧游标失效
+_CURSOR_VERSION = 1
+
+
+@dataclasses.dataclass
+class CursorParams:
+    """游标分页参数"""
+
+    cursor: str | None = Query(None, description="分页游标, 首页不传")
+    size: int = Query(20, ge=1, le=500, description="每页数量")
+
+
+class CursorPageData(BaseModel, Generic[SchemaT]):
+    """游标分页数据"""
+
+    items: list[SchemaT] = Field(description="当前页数据")
+    next_cursor: str | None = Field(None, description="下一页游标, 无下一页时为空")
+    has_more: bool = Field(description="是否存在下一页")
+
+
+def encode_cursor(last_id: int) -> str:
+    """
+    编码分页游标
+
+    :param last_id: 当前页最后一条记录的主键
+    :return:
+    """
+    raw = msgspec.json.encode([_CURSOR_VERSION, last_id])
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    解码分页游标
+
+    :param cursor: 分页游标
+    :return:
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        version, last_id = msgspec.json.decode(raw, type=tuple[int, int])
+    except (binascii.Error, ValueError, msgspec.DecodeError):
+        raise errors.HTTPError(code=StandardResponseCode.HTTP_400, msg="分页游标无效")
+    if version != _CURSOR_VERSION:
+        raise errors.HTTPError(code=StandardResponseCode.HTTP_400, msg="分页游标已过期")
+    return last_id
+
+
+async def paginate_by_cursor(
+    db: AsyncSession, stmt: Select, column: InstrumentedAttribute[int], params: CursorParams
+) -> dict[str, Any]:
+    """
+    基于主键的 keyset 分页
+
+    主键为自增或雪花 ID, 与创建时间同序, 直接按主键排序即可走主键索引, 不需要 OFFSET 扫描
+
+    :param db: 数据库会话
+    :param stmt: 查询语句
+    :param column: 主键列
+    :param params: 分页参数
+    :return:
+    """
+    if params.cursor:
+        stmt = stmt.where(column > decode_cursor(params.cursor))
+    stmt = stmt.order_by(column).limit(params.size + 1)
+    rows = (await db.execute(stmt)).scalars().all()
+
+    has_more = len(rows) > params.size
+    items = rows[: params.size]
+    next_cursor = encode_cursor(getattr(items[-1], column.key)) if has_more else None
+    return {"items": items, "next_cursor": next_cursor, "has_more": has_more}
+
+
+DependsCursorParams = Annotated[CursorParams, Depends(CursorParams)]
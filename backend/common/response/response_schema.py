@@ -1,6 +1,8 @@
+from functools import lru_cache
 from typing import Any, Generic, TypeVar
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
+from starlette.responses import Response
 
 from backend.common.response.response_code import CustomResponse, CustomResponseCode
 
@@ -28,6 +30,12 @@ class ResponseSchemaModel(ResponseModel, Generic[SchemaT]):
     data: SchemaT
 
 
+@lru_cache(maxsize=256)
+def _response_adapter(schema: Any) -> TypeAdapter[ResponseSchemaModel]:
+    """按数据 schema 缓存响应模型的 TypeAdapter, 避免每次请求重新构建校验器"""
+    return TypeAdapter(ResponseSchemaModel[schema])
+
+
 class ResponseBase:
     """统一返回方法"""
 
@@ -47,6 +55,32 @@ class ResponseBase:
         """成功响应"""
         return self.__response(res=res, data=data)
 
+    @staticmethod
+    def fast_success(
+        *,
+        res: CustomResponseCode | CustomResponse = CustomResponseCode.HTTP_200,
+        data: Any,
+        schema: Any,
+        etag: str | None = None,
+    ) -> Response:
+        """
+        成功响应的快速路径
+
+        按 schema 从 ORM 对象属性校验一次后直接序列化为 JSON 字节; 返回的是 Response,
+        FastAPI 不会再按返回注解校验一遍, 接口的返回注解仍用于生成 OpenAPI 文档
+
+        :param res: 响应状态码
+        :param data: 返回数据, 可以是 ORM 对象或包含 ORM 对象的结构
+        :param schema: 返回数据的 schema, 应与接口返回注解中的 ResponseSchemaModel 参数一致
+        :param etag: 资源 ETag, 传入时附带 ETag 与 Cache-Control: no-cache 响应头
+        :return:
+        """
+        adapter = _response_adapter(schema)
+        content = {"code": res.code, "msg": res.msg, "data": data}
+        model = adapter.validate_python(content, from_attributes=True)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"} if etag else None
+        return Response(content=adapter.dump_json(model), media_type="application/json", headers=headers)
+
     def fail(
         self,
         *,
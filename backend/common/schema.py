@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class SchemaBase(BaseModel):
@@ -7,3 +7,29 @@ class SchemaBase(BaseModel):
     model_config = ConfigDict(
         use_enum_values=True,
     )
+
+
+class BatchItemResult(SchemaBase):
+    """批量操作单项结果"""
+
+    index: int = Field(description="在请求列表中的位置")
+    name: str = Field(description="名称")
+    success: bool = Field(description="是否成功")
+    id: int | None = Field(None, description="创建成功后的 ID")
+    msg: str | None = Field(None, description="失败原因")
+
+
+class BatchCreateResult(SchemaBase):
+    """批量创建结果"""
+
+    total: int = Field(description="请求总数")
+    succeeded: int = Field(description="成功数")
+    failed: int = Field(description="失败数")
+    items: list[BatchItemResult] = Field(description="逐项结果, 与请求顺序一致")
+
+    @classmethod
+    def from_items(cls, items: list[BatchItemResult]) -> "BatchCreateResult":
+        """根据逐项结果汇总"""
+        items = sorted(items, key=lambda item: item.index)
+        succeeded = sum(item.success for item in items)
+        return cls(total=len(items), succeeded=succeeded, failed=len(items) - succeeded, items=items)
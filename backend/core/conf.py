@@ -1,3 +1,5 @@
+import os
+import tempfile
 from functools import lru_cache
 from typing import Literal
 
@@ -48,11 +50,117 @@ class Settings(BaseSettings):
     DATABASE_SCHEMA: str = "scheme_backend"
     DATABASE_CHARSET: str = "utf8mb4"
 
+    # 数据库连接池
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_POOL_MAX_OVERFLOW: int = 20
+    DATABASE_POOL_TIMEOUT: int = 30
+    DATABASE_POOL_RECYCLE: int = 3600
+    # 每次检出前 ping 一次, 可感知断连但每次检出多一次往返
+    DATABASE_POOL_PRE_PING: bool = True
+    # LIFO 复用最近归还的连接, 低负载时空闲连接可被 recycle 回收; FIFO 则使连接轮流使用
+    DATABASE_POOL_USE_LIFO: bool = False
+
+    # 数据库只读副本, 格式为 host:port, 用户名、密码与库名与主库一致
+    DATABASE_REPLICA_HOSTS: list[str] = []
+    DATABASE_REPLICA_RETRY_INTERVAL: int = 30
+    # 写事务后该时间窗口内, 同一客户端的读请求走主库
+    DATABASE_READ_YOUR_WRITES_SECONDS: int = 5
+    DATABASE_READ_YOUR_WRITES_COOKIE: str = "db_last_write"
+
+    # 批量删除分块大小, 0 表示单条语句删除
+    DATABASE_BULK_DELETE_CHUNK_SIZE: int = 0
+
+    # 环境配置模版缓存
+    ENV_TEMPLATE_CACHE_MAXSIZE: int = 1024
+    ENV_TEMPLATE_CACHE_TTL: int = 60
+    # 跨 worker 失效的 PostgreSQL NOTIFY 频道, 为空时仅进程内失效
+    ENV_TEMPLATE_CACHE_NOTIFY_CHANNEL: str | None = None
+
     # minio 用户配置
     MINIO_ENDPOINT: str
     MINIO_ROOT_USER: str
     MINIO_ROOT_PASSWORD: str
     AGENT_BUCKET: str = "agent"
+    MINIO_SECURE: bool = False
+    MINIO_MAX_WORKERS: int = 8
+    MINIO_UPLOAD_CONCURRENCY: int = 4
+    MINIO_UPLOAD_PART_SIZE: int = 16 * 1024 * 1024
+    MINIO_UPLOAD_PARALLEL_PARTS: int = 3
+
+    # 智能体上传
+    AGENT_UPLOAD_CHUNK_SIZE: int = 1024 * 1024
+    AGENT_ZIP_PARALLEL_THRESHOLD: int = 64 * 1024 * 1024
+    AGENT_ZIP_VERIFY_WORKERS: int = 4
+
+    # 雪花 ID, 多 worker 部署时每个进程的 (集群 ID, 节点 ID) 必须唯一
+    SNOWFLAKE_CLUSTER_ID: int = 1
+    SNOWFLAKE_NODE_ID: int = 0
+    # 节点分配方式: static 使用上面的固定配置; file 按本机锁文件分配节点 ID (集群 ID 固定);
+    # database 按数据库租约分配 (集群 ID, 节点 ID), 适用于多主机部署
+    SNOWFLAKE_LEASE_BACKEND: Literal["static", "file", "database"] = "database"
+    SNOWFLAKE_LEASE_TTL: int = 60
+    # 距租约到期不足该秒数且仍未续期成功时停止生成 ID, 避免过期节点被接管后生成重复 ID
+    SNOWFLAKE_LEASE_SAFETY_MARGIN: float = 5
+    SNOWFLAKE_LEASE_DIR: str = os.path.join(tempfile.gettempdir(), "scheme_backend_snowflake")
+
+    # 请求与数据库耗时统计
+    METRICS_ENABLED: bool = True
+    METRICS_SERVER_TIMING: bool = True
+
+    # 响应压缩, 编码按优先级排列, 未安装 zstandard / brotli 时对应编码不参与协商
+    COMPRESS_ENABLED: bool = True
+    COMPRESS_ENCODINGS: list[str] = ["zstd", "br", "gzip"]
+    COMPRESS_MIN_SIZE: int = 1024
+    # 超过该大小的响应体在线程池中压缩
+    COMPRESS_OFFLOAD_SIZE: int = 1024 * 1024
+    COMPRESS_GZIP_LEVEL: int = 6
+    COMPRESS_BROTLI_QUALITY: int = 4
+    COMPRESS_ZSTD_LEVEL: int = 3
+    # 压缩请求体解压后的最大大小
+    COMPRESS_MAX_REQUEST_SIZE: int = 256 * 1024 * 1024
+
+    # 推演任务日志批量写入
+    # 内存缓冲区最多容纳的日志条数, 写满后拒绝新的批次 (429), 由生产者退避重试
+    TASK_LOG_BUFFER_SIZE: int = 200_000
+    # 缓冲条数达到 FLUSH_ROWS 或距上次写入超过 FLUSH_INTERVAL 秒时写库, 每次最多写入 FLUSH_ROWS 条
+    TASK_LOG_FLUSH_ROWS: int = 5000
+    TASK_LOG_FLUSH_INTERVAL: float = 0.5
+    # 单次请求最多包含的日志条数
+    TASK_LOG_MAX_BATCH: int = 20_000
+    # PostgreSQL (asyncpg) 下使用 COPY 写入, 否则使用多行 INSERT
+    TASK_LOG_USE_COPY: bool = True
+
+    # 推演任务日志分区 (仅 PostgreSQL), task_log 按雪花 ID 中的时间做范围分区, 每天一个分区
+    TASK_LOG_PARTITION_PREMAKE_DAYS: int = 3
+    # 分区保留天数, 0 表示不清理; drop 直接删除过期分区, detach 仅从 task_log 分离, 留待归档
+    TASK_LOG_PARTITION_RETENTION_DAYS: int = 30
+    TASK_LOG_PARTITION_RETENTION_MODE: Literal["drop", "detach"] = "drop"
+    TASK_LOG_PARTITION_CHECK_INTERVAL: int = 3600
+
+    # 推演任务日志实时推送, 每个任务只有一个数据库轮询, 由所有订阅者共享
+    TASK_LOG_STREAM_POLL_INTERVAL: float = 1.0
+    # 多 worker 写入时 ID 较小的日志可能较晚提交, 轮询时回看该秒数内的 ID, 按已推送集合去重
+    TASK_LOG_STREAM_LOOKBACK: float = 5.0
+    TASK_LOG_STREAM_BATCH: int = 1000
+    # 单个订阅者最多积压的批次数, 超过后该订阅者改为从数据库追赶
+    TASK_LOG_STREAM_QUEUE_SIZE: int = 256
+    TASK_LOG_STREAM_HEARTBEAT: int = 15
+
+    # 推演任务状态, 状态更新先写入进程内注册表, 按间隔批量写库
+    TASK_STATUS_FLUSH_INTERVAL: float = 1.0
+    TASK_STATUS_FLUSH_BATCH: int = 1000
+    # 读取快照时从数据库合并其他 worker 写入的状态的最短间隔
+    TASK_STATUS_REFRESH_INTERVAL: float = 5.0
+    # 超过该秒数未被读写且无待写库状态的推演方案从内存移除
+    TASK_STATUS_IDLE_TTL: int = 3600
+
+    # 推演工作流, 单个推演方案同时执行的节点数上限
+    WORKFLOW_MAX_CONCURRENCY: int = 32
+    # 推演引擎任务提交地址, 节点就绪后提交到引擎, 由引擎通过任务状态接口上报结束状态; 为空时不能执行工作流
+    WORKFLOW_ENGINE_URL: str | None = None
+    WORKFLOW_ENGINE_TIMEOUT: float = 10.0
+    # 单个节点等待结束状态的最长秒数, 0 表示不限
+    WORKFLOW_NODE_TIMEOUT: float = 0
 
     # log
     LOG_STD_LEVEL: str = "INFO"
@@ -66,6 +174,23 @@ class Settings(BaseSettings):
     )
     LOG_ACCESS_FILENAME: str = "scheme_backend_access.log"
     LOG_ERROR_FILENAME: str = "scheme_backend_error.log"
+    # 日志文件格式: text 为按级别拆分的文本文件; json 为单个结构化 JSON Lines 文件, 批量写入, 后台压缩
+    LOG_FILE_TYPE: Literal["text", "json"] = "text"
+    LOG_JSON_FILENAME: str = "scheme_backend.jsonl"
+    LOG_JSON_ROTATION_SIZE: int = 100 * 1024 * 1024
+    LOG_JSON_ROTATION_INTERVAL: int = 24 * 60 * 60
+    LOG_JSON_RETENTION: int = 14
+    LOG_JSON_BATCH_SIZE: int = 512
+    LOG_JSON_FLUSH_INTERVAL: float = 0.5
+    LOG_JSON_COMPRESS: bool = True
+    # 待写入日志队列上限, 写线程跟不上时新日志直接丢弃并计数
+    LOG_JSON_QUEUE_SIZE: int = 100_000
+    # 可选的日志转发目标, tcp://host:port 或 unix:///path/to/socket
+    LOG_JSON_SOCKET: str | None = None
+    # 标准库日志采样与限流, 键为日志器名称前缀, 仅作用于低于 WARNING 的日志
+    # 例如 {"sqlalchemy.engine": 0.1} 只保留 10% 的 SQL 日志, {"uvicorn.access": 100} 每秒最多 100 条
+    LOG_SAMPLE_RATES: dict[str, float] = {}
+    LOG_RATE_LIMITS: dict[str, int] = {}
 
     # # matrix rabbitmq 配置
     # MATRIX_RABBITMQ_HOST: str = "localhost"
@@ -3,12 +3,23 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi_pagination import add_pagination
 
+from backend.app.deduction.service.task_log_service import task_log_partitioner, task_log_service
+from backend.app.deduction.service.task_log_stream_service import task_log_hub
+from backend.app.deduction.service.task_status_service import task_status_registry
+from backend.app.deduction.service.workflow_service import workflow_service
 from backend.app.router import route
 from backend.common.log import set_custom_logfile, setup_logging
 from backend.core.conf import settings
 from backend.database.db import create_tables
+from backend.database.notify import pg_notify_listener
+from backend.database.snowflake_lease import snowflake_lease_manager
+from backend.middleware.compress_middleware import CompressMiddleware
+from backend.middleware.metrics_middleware import MetricsMiddleware
+from backend.utils.file_ops import shutdown_verify_executor
 from backend.utils.health_check import ensure_unique_route_names
 from backend.utils.openapi import simplify_operation_ids
+from backend.utils.serializers import MsgSpecJsonResponse
+from backend.utils.upload import minio_uploader
 
 
 @asynccontextmanager
@@ -19,8 +30,35 @@ async def register_init(app: FastAPI):
 
     # 创建数据库 & 连接db
     await create_tables()
+
+    # 预建推演任务日志分区并清理过期分区
+    await task_log_partitioner.start()
+
+    # 分配雪花 ID 节点
+    await snowflake_lease_manager.start()
+
+    # 监听跨 worker 缓存失效通知
+    await pg_notify_listener.start()
+
+    # 推演任务日志与状态后台写库
+    await task_log_service.buffer.start()
+    await task_status_registry.start()
+
     yield
 
+    # 先停止执行中的工作流, 写出缓冲区中的日志与状态, 再释放雪花 ID 节点
+    await workflow_service.stop()
+    await task_log_service.buffer.stop()
+    await task_status_registry.stop()
+    await task_log_hub.stop()
+    await task_log_partitioner.stop()
+    await pg_notify_listener.stop()
+    await snowflake_lease_manager.stop()
+
+    # 关闭对象存储线程池与 zip 校验进程池
+    minio_uploader.shutdown()
+    shutdown_verify_executor()
+
 
 def register_app() -> FastAPI:
     """注册FastAPI应用"""
@@ -34,10 +72,12 @@ def register_app() -> FastAPI:
         openapi_url=settings.FASTAPI_OPENAPI_URL,
         static_files=settings.FASTAPI_STATIC_FILES,
         lifespan=register_init,
+        default_response_class=MsgSpecJsonResponse,
     )
 
     # 注册组件
     register_logger()
+    register_middleware(app)
     register_router(app)
     register_page(app)
 
@@ -52,6 +92,27 @@ def register_logger() -> None:
     set_custom_logfile()
 
 
+def register_middleware(app: FastAPI) -> None:
+    """
+    注册中间件, 后注册的在外层
+    """
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware, server_timing=settings.METRICS_SERVER_TIMING)
+    if settings.COMPRESS_ENABLED:
+        app.add_middleware(
+            CompressMiddleware,
+            encodings=settings.COMPRESS_ENCODINGS,
+            min_size=settings.COMPRESS_MIN_SIZE,
+            offload_size=settings.COMPRESS_OFFLOAD_SIZE,
+            levels={
+                "gzip": settings.COMPRESS_GZIP_LEVEL,
+                "br": settings.COMPRESS_BROTLI_QUALITY,
+                "zstd": settings.COMPRESS_ZSTD_LEVEL,
+            },
+            max_request_size=settings.COMPRESS_MAX_REQUEST_SIZE,
+        )
+
+
 def register_router(app: FastAPI):
     """
     注册路由
@@ -3,8 +3,9 @@ from collections.abc import AsyncGenerator
 from typing import Annotated
 from uuid import uuid4
 
-from fastapi import Depends
+from fastapi import Depends, Request, Response
 from sqlalchemy import URL
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -15,19 +16,27 @@ from sqlalchemy.ext.asyncio import (
 from backend.common.log import log
 from backend.common.model import MappedBase
 from backend.core.conf import settings
+from backend.database.pool import instrumented_pool_class
+from backend.database.query_metrics import instrument_engine
+from backend.database.replica import ReplicaRouter
 
 
-def create_database_url(*, unittest: bool = False) -> URL:
+def create_database_url(*, unittest: bool = False, host: str | None = None, port: int | None = None) -> URL:
     """
     创建数据库链接
+
+    :param unittest: 是否为单元测试库
+    :param host: 数据库地址, 默认使用主库地址
+    :param port: 数据库端口, 默认使用主库端口
+    :return:
     """
 
     url = URL.create(
         drivername="mysql+asyncmy" if settings.DATABASE_TYPE == "mysql" else "postgresql+asyncpg",
         username=settings.DATABASE_USER,
         password=settings.DATABASE_PASSWORD,
-        host=settings.DATABASE_HOST,
-        port=settings.DATABASE_PORT,
+        host=host or settings.DATABASE_HOST,
+        port=port or settings.DATABASE_PORT,
         database=settings.DATABASE_SCHEMA if not unittest else f"{settings.DATABASE_SCHEMA}_test",
     )
     if settings.DATABASE_TYPE == "mysql":
@@ -35,9 +44,15 @@ def create_database_url(*, unittest: bool = False) -> URL:
     return url
 
 
-def create_async_engine_and_session(url: str | URL) -> tuple[AsyncEngine, async_sessionmaker[AsyncSession]]:
+def create_async_engine_and_session(
+    url: str | URL, *, name: str = "primary"
+) -> tuple[AsyncEngine, async_sessionmaker[AsyncSession]]:
     """
     创建数据库引擎和session
+
+    :param url: 数据库链接
+    :param name: 引擎名称, 用于区分连接池统计
+    :return:
     """
     try:
         engine = create_async_engine(
@@ -45,17 +60,19 @@ def create_async_engine_and_session(url: str | URL) -> tuple[AsyncEngine, async_
             echo=settings.DATABASE_ECHO,
             echo_pool=settings.DATABASE_POOL_ECHO,
             future=True,
-            pool_size=10,
-            max_overflow=20,
-            pool_timeout=30,
-            pool_recycle=3600,
-            pool_pre_ping=True,
-            pool_use_lifo=False,
+            poolclass=instrumented_pool_class(name),
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_POOL_MAX_OVERFLOW,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+            pool_recycle=settings.DATABASE_POOL_RECYCLE,
+            pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+            pool_use_lifo=settings.DATABASE_POOL_USE_LIFO,
         )
     except Exception as e:
         log.error("数据库链接失败 {}", e)
         sys.exit()
     else:
+        instrument_engine(engine, name)
         db_session = async_sessionmaker(
             bind=engine,
             class_=AsyncSession,
@@ -73,14 +90,46 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
-async def get_db_transaction() -> AsyncGenerator[AsyncSession, None]:
+async def get_db_transaction(response: Response) -> AsyncGenerator[AsyncSession, None]:
     """
     获取带有事务的数据库会话
     """
+    if replica_router.replicas:
+        # 标记该客户端近期有写入, 窗口期内的读请求走主库
+        response.set_cookie(
+            settings.DATABASE_READ_YOUR_WRITES_COOKIE,
+            "1",
+            max_age=settings.DATABASE_READ_YOUR_WRITES_SECONDS,
+            httponly=True,
+        )
     async with async_db_session.begin() as session:
         yield session
 
 
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    获取只读数据库会话
+
+    轮询健康的只读副本, 副本连接失败时标记为不可用并尝试下一个; 近期有写入的客户端或无可用副本时使用主库
+    """
+    if settings.DATABASE_READ_YOUR_WRITES_COOKIE not in request.cookies:
+        for name, session_maker in replica_router.candidates():
+            session = session_maker()
+            try:
+                await session.connection()
+            except (DBAPIError, OSError) as e:
+                await session.close()
+                replica_router.mark_unhealthy(name)
+                log.warning("只读副本 {} 不可用, 已临时移出路由: {}", name, e)
+                continue
+            async with session:
+                yield session
+            return
+
+    async with async_db_session() as session:
+        yield session
+
+
 async def create_tables() -> None:
     """
     创建数据库表
@@ -102,6 +151,25 @@ SQLALCHEMY_DATABASE_URL = create_database_url()
 # SALA 异步引擎和会话
 async_engine, async_db_session = create_async_engine_and_session(SQLALCHEMY_DATABASE_URL)
 
+
+def create_replica_router() -> ReplicaRouter:
+    """
+    创建只读副本路由
+    """
+    replicas = []
+    for idx, replica in enumerate(settings.DATABASE_REPLICA_HOSTS):
+        host, _, port = replica.partition(":")
+        url = create_database_url(host=host, port=int(port) if port else None)
+        name = f"replica-{idx}"
+        engine, session_maker = create_async_engine_and_session(url, name=name)
+        replicas.append((name, engine, session_maker))
+    return ReplicaRouter(replicas, retry_interval=settings.DATABASE_REPLICA_RETRY_INTERVAL)
+
+
+# 只读副本路由
+replica_router = create_replica_router()
+
 # Session Annotated
 CurrentSession = Annotated[AsyncSession, Depends(get_db)]
 CurrentSessionTransaction = Annotated[AsyncSession, Depends(get_db_transaction)]
+CurrentReadSession = Annotated[AsyncSession, Depends(get_read_db)]
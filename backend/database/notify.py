@@ -0,0 +1,114 @@
+import asyncio
+from collections import defaultdict
+from collections.abc import Callable
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.common.log import log
+from backend.core.conf import settings
+
+
+class PgNotifyListener:
+    """
+    PostgreSQL LISTEN/NOTIFY 监听器, 用于跨 worker 广播缓存失效等消息
+
+    使用独立的 asyncpg 连接, 不占用连接池; 连接断开后自动重连
+    """
+
+    def __init__(self, reconnect_interval: float = 5) -> None:
+        self.reconnect_interval = reconnect_interval
+        self._handlers: dict[str, list[Callable[[str], None]]] = defaultdict(list)
+        self._conn = None
+        self._reconnect_task: asyncio.Task | None = None
+        self._closing = False
+
+    @property
+    def enabled(self) -> bool:
+        return settings.DATABASE_TYPE == "postgresql" and bool(self._handlers)
+
+    def register(self, channel: str, handler: Callable[[str], None]) -> None:
+        """
+        注册频道处理函数
+
+        :param channel: 频道名称
+        :param handler: 处理函数, 参数为消息内容
+        :return:
+        """
+        self._handlers[channel].append(handler)
+
+    def _dispatch(self, _conn, _pid: int, channel: str, payload: str) -> None:
+        for handler in self._handlers.get(channel, []):
+            try:
+                handler(payload)
+            except Exception as e:
+                log.error("处理数据库通知失败 {}: {}", channel, e)
+
+    def _on_terminate(self, _conn) -> None:
+        self._conn = None
+        if not self._closing:
+            log.warning("数据库通知监听连接断开, {} 秒后重连", self.reconnect_interval)
+            self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        while not self._closing and self._conn is None:
+            await asyncio.sleep(self.reconnect_interval)
+            try:
+                await self._connect()
+            except Exception as e:
+                log.warning("数据库通知监听重连失败: {}", e)
+
+    async def _connect(self) -> None:
+        import asyncpg
+
+        conn = await asyncpg.connect(
+            host=settings.DATABASE_HOST,
+            port=settings.DATABASE_PORT,
+            user=settings.DATABASE_USER,
+            password=settings.DATABASE_PASSWORD,
+            database=settings.DATABASE_SCHEMA,
+        )
+        for channel in self._handlers:
+            await conn.add_listener(channel, self._dispatch)
+        conn.add_termination_listener(self._on_terminate)
+        self._conn = conn
+        # 断连期间可能错过通知, 重新连上后由各处理函数自行全量失效
+        for channel, handlers in self._handlers.items():
+            for handler in handlers:
+                handler("")
+            log.info("已监听数据库通知频道 {}", channel)
+
+    async def start(self) -> None:
+        """启动监听"""
+        if not self.enabled:
+            return
+        self._closing = False
+        try:
+            await self._connect()
+        except Exception as e:
+            log.warning("数据库通知监听启动失败, 仅使用进程内失效: {}", e)
+
+    async def stop(self) -> None:
+        """停止监听"""
+        self._closing = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+
+async def pg_notify(db: AsyncSession, channel: str, payload: str) -> None:
+    """
+    在当前事务中发送通知, 事务提交后才会投递
+
+    :param db: 数据库会话
+    :param channel: 频道名称
+    :param payload: 消息内容
+    :return:
+    """
+    if settings.DATABASE_TYPE == "postgresql":
+        await db.execute(select(func.pg_notify(channel, payload)))
+
+
+pg_notify_listener: PgNotifyListener = PgNotifyListener()
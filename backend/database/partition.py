@@ -0,0 +1,170 @@
+import asyncio
+from datetime import date, datetime, timedelta
+from typing import Literal
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from backend.common.log import log
+from backend.utils.snowflake import Snowflake
+from backend.utils.timezone import timezone
+
+
+class SnowflakeRangePartitioner:
+    """
+    按天维护以雪花 ID 做范围分区 (PARTITION BY RANGE (id)) 的 PostgreSQL 表
+
+    雪花 ID 高位为毫秒时间戳, 每天的分区边界为当天零点对应的最小 ID; 主键无需包含时间列,
+    按 ID 游标读取时也能裁剪分区。维护任务提前创建未来若干天的分区, 并按保留天数删除或分离过期分区;
+    超出已建分区范围的数据写入 DEFAULT 分区。多 worker 同时维护时以 advisory lock 串行
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        table: str,
+        *,
+        premake_days: int,
+        retention_days: int,
+        retention_mode: Literal["drop", "detach"],
+        check_interval: int,
+    ) -> None:
+        """
+        初始化分区维护
+
+        :param engine: 数据库引擎
+        :param table: 分区表名
+        :param premake_days: 提前创建的天数
+        :param retention_days: 保留天数, 0 表示不清理
+        :param retention_mode: 过期分区的处理方式
+        :param check_interval: 维护间隔秒数
+        :return:
+        """
+        self.engine = engine
+        self.table = table
+        self.premake_days = premake_days
+        self.retention_days = retention_days
+        self.retention_mode = retention_mode
+        self.check_interval = check_interval
+        self._task: asyncio.Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.engine.dialect.name == "postgresql"
+
+    def partition_name(self, day: date) -> str:
+        return f"{self.table}_p{day:%Y%m%d}"
+
+    @staticmethod
+    def day_bound(day: date) -> int:
+        """当天零点 (配置时区) 对应的最小雪花 ID"""
+        start = datetime(day.year, day.month, day.day, tzinfo=timezone.tz_info)
+        return Snowflake.floor_id(int(start.timestamp() * 1000))
+
+    async def start(self) -> None:
+        """立即维护一次, 之后按间隔定期维护"""
+        if not self.enabled:
+            return
+        await self._maintain_safely()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            await self._maintain_safely()
+
+    async def _maintain_safely(self) -> None:
+        try:
+            created, expired = await self.maintain()
+        except Exception as e:
+            log.warning("{} 分区维护失败: {}", self.table, e)
+            return
+        if created or expired:
+            log.info("{} 分区维护完成: 新建 {}, 过期处理 {}", self.table, created, expired)
+
+    async def maintain(self) -> tuple[list[str], list[str]]:
+        """
+        创建缺失的分区并处理过期分区
+
+        :return: 新建的分区, 删除或分离的分区
+        """
+        async with self.engine.begin() as conn:
+            partitioned = await conn.scalar(
+                text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"),
+                {"table": self.table},
+            )
+            if not partitioned:
+                log.warning("{} 不是分区表, 跳过分区维护; 已有的普通表需要迁移后才能分区", self.table)
+                return [], []
+            await conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:table))"), {"table": self.table})
+            existing = await self._existing(conn)
+            created = await self._create(conn, existing)
+            expired = await self._expire(conn, existing)
+        return created, expired
+
+    async def _existing(self, conn: AsyncConnection) -> set[str]:
+        result = await conn.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = to_regclass(:table)"
+            ),
+            {"table": self.table},
+        )
+        return set(result.scalars().all())
+
+    async def _create(self, conn: AsyncConnection, existing: set[str]) -> list[str]:
+        quote = conn.dialect.identifier_preparer.quote
+        created = []
+        default = f"{self.table}_default"
+        if default not in existing:
+            await conn.execute(text(f"CREATE TABLE {quote(default)} PARTITION OF {quote(self.table)} DEFAULT"))
+            created.append(default)
+        today = timezone.now().date()
+        for offset in range(self.premake_days + 1):
+            day = today + timedelta(days=offset)
+            name = self.partition_name(day)
+            if name in existing:
+                continue
+            try:
+                # DEFAULT 分区中已有落在该范围的数据时会建表失败, 用保存点隔离, 不影响其余分区
+                async with conn.begin_nested():
+                    await conn.execute(
+                        text(
+                            f"CREATE TABLE {quote(name)} PARTITION OF {quote(self.table)} "
+                            f"FOR VALUES FROM ({self.day_bound(day)}) TO ({self.day_bound(day + timedelta(days=1))})"
+                        )
+                    )
+            except DBAPIError as e:
+                log.warning("创建分区 {} 失败: {}", name, e)
+                continue
+            created.append(name)
+        return created
+
+    async def _expire(self, conn: AsyncConnection, existing: set[str]) -> list[str]:
+        if self.retention_days <= 0:
+            return []
+        quote = conn.dialect.identifier_preparer.quote
+        cutoff = timezone.now().date() - timedelta(days=self.retention_days)
+        prefix = f"{self.table}_p"
+        expired = []
+        for name in sorted(existing):
+            if not name.startswith(prefix):
+                continue
+            try:
+                day = datetime.strptime(name.removeprefix(prefix), "%Y%m%d").date()
+            except ValueError:
+                continue
+            if day >= cutoff:
+                continue
+            if self.retention_mode == "detach":
+                await conn.execute(text(f"ALTER TABLE {quote(self.table)} DETACH PARTITION {quote(name)}"))
+            else:
+                await conn.execute(text(f"DROP TABLE {quote(name)}"))
+            expired.append(name)
+        return expired
@@ -0,0 +1,102 @@
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
+
+from backend.utils.metrics import Histogram, render_histogram, request_timings
+
+# 连接获取耗时分桶(秒)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+
+
+class PoolStats:
+    """连接池统计"""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.wait_time = Histogram(POOL_WAIT_BUCKETS)
+        self.timeouts = 0
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    记录连接获取耗时与超时次数的异步连接池
+
+    统计对象挂在类属性上, 连接池被 recreate(如 dispose 后)时依然沿用同一份统计
+    """
+
+    stats: PoolStats
+
+    def connect(self) -> PoolProxiedConnection:
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stats.wait_time.observe(elapsed)
+            timings = request_timings.get()
+            if timings is not None:
+                timings.pool_wait += elapsed
+
+
+def instrumented_pool_class(name: str) -> type[InstrumentedAsyncQueuePool]:
+    """
+    为指定引擎创建带独立统计的连接池类
+
+    :param name: 引擎名称
+    :return:
+    """
+    return type(f"InstrumentedAsyncQueuePool[{name}]", (InstrumentedAsyncQueuePool,), {"stats": PoolStats(name)})
+
+
+def get_pool_status(engine: AsyncEngine) -> dict:
+    """
+    获取引擎连接池状态
+
+    :param engine: 异步引擎
+    :return:
+    """
+    pool = engine.sync_engine.pool
+    status = {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": pool._max_overflow,
+        "timeout": pool.timeout(),
+    }
+    if isinstance(pool, InstrumentedAsyncQueuePool):
+        status["name"] = pool.stats.name
+        status["timeouts"] = pool.stats.timeouts
+        status["wait_time"] = pool.stats.wait_time.snapshot()
+    return status
+
+
+def render_pool_metrics(engines: list[AsyncEngine]) -> list[str]:
+    """
+    将连接池状态渲染为 Prometheus 文本格式
+
+    :param engines: 异步引擎列表
+    :return:
+    """
+    gauges = {
+        "db_pool_size": ("连接池大小", "size"),
+        "db_pool_checked_out": ("已检出连接数", "checked_out"),
+        "db_pool_overflow": ("溢出连接数", "overflow"),
+    }
+    statuses = [get_pool_status(engine) for engine in engines]
+    lines = []
+    for metric, (documentation, key) in gauges.items():
+        lines += [f"# HELP {metric} {documentation}", f"# TYPE {metric} gauge"]
+        lines += [f'{metric}{{engine="{status.get("name", "")}"}} {status[key]}' for status in statuses]
+    instrumented = [status for status in statuses if "wait_time" in status]
+    lines += ["# HELP db_pool_timeouts_total 获取连接超时次数", "# TYPE db_pool_timeouts_total counter"]
+    lines += [f'db_pool_timeouts_total{{engine="{status["name"]}"}} {status["timeouts"]}' for status in instrumented]
+    lines += ["# HELP db_pool_wait_seconds 获取连接耗时", "# TYPE db_pool_wait_seconds histogram"]
+    for status in instrumented:
+        lines += render_histogram("db_pool_wait_seconds", {"engine": status["name"]}, status["wait_time"])
+    return lines
@@ -0,0 +1,45 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from backend.utils.metrics import DEFAULT_LATENCY_BUCKETS, LabeledHistogram, request_timings
+
+query_duration = LabeledHistogram(
+    "db_query_duration_seconds", "数据库语句执行耗时", ("engine",), DEFAULT_LATENCY_BUCKETS
+)
+
+
+def _record(name: str, elapsed: float) -> None:
+    query_duration.labels(name).observe(elapsed)
+    timings = request_timings.get()
+    if timings is not None:
+        timings.queries += 1
+        timings.db_time += elapsed
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """
+    为引擎注册语句耗时统计事件
+
+    耗时计入全局直方图, 请求内执行时同时累加到当前请求的查询次数与数据库耗时
+
+    :param engine: 异步引擎
+    :param name: 引擎名称
+    :return:
+    """
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        _record(name, time.perf_counter() - conn.info["query_start"].pop())
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _handle_error(context):
+        stack = context.connection.info.get("query_start") if context.connection is not None else None
+        if stack:
+            _record(name, time.perf_counter() - stack.pop())
@@ -0,0 +1,51 @@
+import itertools
+import time
+from collections.abc import Iterator
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+
+class ReplicaRouter:
+    """只读副本路由, 轮询健康的副本, 连接失败的副本在冷却时间内不再参与路由"""
+
+    def __init__(
+        self,
+        replicas: list[tuple[str, AsyncEngine, async_sessionmaker[AsyncSession]]],
+        *,
+        retry_interval: float,
+    ) -> None:
+        """
+        初始化副本路由
+
+        :param replicas: (名称, 引擎, 会话工厂) 列表
+        :param retry_interval: 副本被标记为不可用后的冷却秒数
+        :return:
+        """
+        self.replicas = replicas
+        self.retry_interval = retry_interval
+        self._counter = itertools.count()
+        self._unhealthy_until: dict[str, float] = {}
+
+    @property
+    def engines(self) -> list[AsyncEngine]:
+        return [engine for _, engine, _ in self.replicas]
+
+    def candidates(self) -> Iterator[tuple[str, async_sessionmaker[AsyncSession]]]:
+        """按轮询顺序产出当前健康的副本"""
+        if not self.replicas:
+            return
+        now = time.monotonic()
+        start = next(self._counter) % len(self.replicas)
+        for offset in range(len(self.replicas)):
+            name, _, session_maker = self.replicas[(start + offset) % len(self.replicas)]
+            if self._unhealthy_until.get(name, 0) <= now:
+                yield name, session_maker
+
+    def mark_unhealthy(self, name: str) -> None:
+        """标记副本不可用"""
+        self._unhealthy_until[name] = time.monotonic() + self.retry_interval
+
+    def status(self) -> dict[str, bool]:
+        """各副本健康状态"""
+        now = time.monotonic()
+        return {name: self._unhealthy_until.get(name, 0) <= now for name, _, _ in self.replicas}
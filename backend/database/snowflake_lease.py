@@ -0,0 +1,282 @@
+import asyncio
+import os
+import socket
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+import sqlalchemy as sa
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql.expression import FunctionElement
+
+from backend.common.exception import errors
+from backend.common.log import log
+from backend.common.model import Base, TimeZone
+from backend.core.conf import settings
+from backend.database.db import async_db_session
+from backend.utils.snowflake import Snowflake, SnowflakeConfig, snowflake
+
+
+class SnowflakeWorkerLease(Base):
+    """雪花 ID 节点租约"""
+
+    __tablename__ = "snowflake_worker_lease"
+
+    cluster_id: Mapped[int] = mapped_column(sa.Integer, primary_key=True, autoincrement=False, comment="集群 ID")
+    node_id: Mapped[int] = mapped_column(sa.Integer, primary_key=True, autoincrement=False, comment="节点 ID")
+    owner: Mapped[str] = mapped_column(sa.String(128), comment="租约持有者")
+    expire_at: Mapped[datetime] = mapped_column(TimeZone, comment="租约过期时间")
+
+
+class _DbNow(FunctionElement):
+    """
+    数据库当前时间加上若干秒
+
+    租约到期时间的计算与比较都使用数据库时钟, 不受各主机时钟偏差影响; 秒数直接渲染进 SQL, 不参与语句缓存
+    """
+
+    type = sa.DateTime(timezone=True)
+    inherit_cache = False
+
+    def __init__(self, seconds: float = 0) -> None:
+        self.seconds = float(seconds)
+        super().__init__()
+
+
+@compiles(_DbNow, "postgresql")
+def _db_now_postgresql(element: _DbNow, compiler, **kw) -> str:
+    return f"(CURRENT_TIMESTAMP + INTERVAL '{element.seconds:f} seconds')"
+
+
+@compiles(_DbNow, "mysql")
+def _db_now_mysql(element: _DbNow, compiler, **kw) -> str:
+    return f"DATE_ADD(CURRENT_TIMESTAMP(6), INTERVAL {int(element.seconds * 1_000_000)} MICROSECOND)"
+
+
+@compiles(_DbNow, "sqlite")
+def _db_now_sqlite(element: _DbNow, compiler, **kw) -> str:
+    return f"strftime('%Y-%m-%d %H:%M:%f', 'now', '{element.seconds:+f} seconds')"
+
+
+@dataclass
+class LeaseInfo:
+    """当前进程持有的节点租约"""
+
+    backend: str
+    cluster_id: int
+    node_id: int
+    owner: str
+    expire_at: datetime | None = None
+
+
+class SnowflakeLeaseManager:
+    """
+    雪花 ID 节点分配
+
+    - static: 使用配置中的 SNOWFLAKE_CLUSTER_ID / SNOWFLAKE_NODE_ID
+    - file: 对本机目录下的节点锁文件加 flock, 进程退出时由操作系统释放, 仅保证单机唯一
+    - database: 在 snowflake_worker_lease 表中抢占 (集群 ID, 节点 ID), 按心跳续期, 过期的租约可被其他进程接管;
+      到期时间按数据库时钟写入与比较, 主机之间的时钟偏差不会导致提前接管;
+      本地按发起请求的时间记录租约有效期, 数据库不可用导致续期失败时, 生成器在到期前 SNOWFLAKE_LEASE_SAFETY_MARGIN
+      秒停止生成 ID, 直到续期成功
+    """
+
+    def __init__(self, generator: Snowflake) -> None:
+        self.generator = generator
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.info: LeaseInfo | None = None
+        self._lock_fd: int | None = None
+        self._heartbeat_task: asyncio.Task | None = None
+        # 最近一次成功抢占或续期对应的本地到期时间 (time.monotonic)
+        self._local_expire_at = 0.0
+
+    @property
+    def ttl(self) -> timedelta:
+        return timedelta(seconds=settings.SNOWFLAKE_LEASE_TTL)
+
+    async def start(self) -> None:
+        """分配节点并配置雪花 ID 生成器"""
+        backend = settings.SNOWFLAKE_LEASE_BACKEND
+        if backend == "file":
+            cluster_id, node_id = self._acquire_file_lock()
+        elif backend == "database":
+            cluster_id, node_id = await self._acquire_db_lease()
+            self._heartbeat_task = asyncio.create_task(self._heartbeat())
+        else:
+            cluster_id, node_id = settings.SNOWFLAKE_CLUSTER_ID, settings.SNOWFLAKE_NODE_ID
+            self.info = LeaseInfo(backend=backend, cluster_id=cluster_id, node_id=node_id, owner=self.owner)
+        self.generator.reconfigure(cluster_id, node_id)
+        if backend == "database":
+            self._apply_lease_deadline()
+        log.info("雪花 ID 节点已分配: cluster_id={}, node_id={}, owner={}", cluster_id, node_id, self.owner)
+
+    async def stop(self) -> None:
+        """停止续期并释放节点"""
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+        if self.info is not None and self.info.backend == "database":
+            # 释放后节点可被其他进程接管, 本进程不再生成 ID
+            self.generator.set_lease_deadline(0.0)
+            await self._release_db_lease()
+
+    def _acquire_file_lock(self) -> tuple[int, int]:
+        import fcntl
+
+        os.makedirs(settings.SNOWFLAKE_LEASE_DIR, exist_ok=True)
+        cluster_id = settings.SNOWFLAKE_CLUSTER_ID
+        for node_id in range(SnowflakeConfig.MAX_WORKER_ID + 1):
+            path = os.path.join(settings.SNOWFLAKE_LEASE_DIR, f"{cluster_id}-{node_id}.lock")
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                continue
+            os.ftruncate(fd, 0)
+            os.write(fd, self.owner.encode())
+            self._lock_fd = fd
+            self.info = LeaseInfo(backend="file", cluster_id=cluster_id, node_id=node_id, owner=self.owner)
+            return cluster_id, node_id
+        raise errors.ServerError(msg="本机雪花 ID 节点已全部被占用")
+
+    async def _acquire_db_lease(self) -> tuple[int, int]:
+        """先尝试接管已过期的租约, 再尝试插入未使用的节点; 并发冲突时重试"""
+        ttl = self.ttl.total_seconds()
+        for _ in range(10):
+            started = time.monotonic()
+            async with async_db_session.begin() as db:
+                expired = await db.execute(
+                    select(SnowflakeWorkerLease.cluster_id, SnowflakeWorkerLease.node_id)
+                    .where(SnowflakeWorkerLease.expire_at < _DbNow())
+                    .order_by(SnowflakeWorkerLease.cluster_id, SnowflakeWorkerLease.node_id)
+                    .limit(8)
+                )
+                for cluster_id, node_id in expired.all():
+                    # 比较并交换, 只有租约仍处于过期状态时才能接管
+                    result = await db.execute(
+                        update(SnowflakeWorkerLease)
+                        .where(
+                            SnowflakeWorkerLease.cluster_id == cluster_id,
+                            SnowflakeWorkerLease.node_id == node_id,
+                            SnowflakeWorkerLease.expire_at < _DbNow(),
+                        )
+                        .values(owner=self.owner, expire_at=_DbNow(ttl))
+                    )
+                    if result.rowcount == 1:
+                        expire_at = await self._get_expire_at(db, cluster_id, node_id)
+                        return self._set_db_info(cluster_id, node_id, expire_at, started)
+
+                used = set((await db.execute(select(SnowflakeWorkerLease.cluster_id, SnowflakeWorkerLease.node_id))).all())
+            slot = self._first_free_slot(used)
+            if slot is None:
+                raise errors.ServerError(msg="雪花 ID 节点已全部被占用")
+            try:
+                async with async_db_session.begin() as db:
+                    await db.execute(
+                        insert(SnowflakeWorkerLease).values(
+                            cluster_id=slot[0],
+                            node_id=slot[1],
+                            owner=self.owner,
+                            expire_at=_DbNow(ttl),
+                            create_at=_DbNow(),
+                        )
+                    )
+                    expire_at = await self._get_expire_at(db, *slot)
+            except IntegrityError:
+                continue
+            return self._set_db_info(*slot, expire_at, started)
+        raise errors.ServerError(msg="分配雪花 ID 节点失败, 请重试")
+
+    @staticmethod
+    async def _get_expire_at(db, cluster_id: int, node_id: int) -> datetime:
+        """读取数据库按自身时钟写入的到期时间, 仅用于展示"""
+        return await db.scalar(
+            select(SnowflakeWorkerLease.expire_at).where(
+                SnowflakeWorkerLease.cluster_id == cluster_id, SnowflakeWorkerLease.node_id == node_id
+            )
+        )
+
+    @staticmethod
+    def _first_free_slot(used: set[tuple[int, int]]) -> tuple[int, int] | None:
+        for cluster_id in range(SnowflakeConfig.MAX_DATACENTER_ID + 1):
+            for node_id in range(SnowflakeConfig.MAX_WORKER_ID + 1):
+                if (cluster_id, node_id) not in used:
+                    return cluster_id, node_id
+        return None
+
+    def _set_db_info(self, cluster_id: int, node_id: int, expire_at: datetime, started: float) -> tuple[int, int]:
+        self.info = LeaseInfo(
+            backend="database", cluster_id=cluster_id, node_id=node_id, owner=self.owner, expire_at=expire_at
+        )
+        self._local_expire_at = started + self.ttl.total_seconds()
+        return cluster_id, node_id
+
+    def _apply_lease_deadline(self) -> None:
+        """按本地到期时间减去安全余量限制生成器"""
+        self.generator.set_lease_deadline(self._local_expire_at - settings.SNOWFLAKE_LEASE_SAFETY_MARGIN)
+
+    async def _renew(self) -> bool:
+        # 以发起续期的时间计算本地到期时间, 不会晚于数据库中记录的到期时间
+        started = time.monotonic()
+        async with async_db_session.begin() as db:
+            result = await db.execute(
+                update(SnowflakeWorkerLease)
+                .where(
+                    SnowflakeWorkerLease.cluster_id == self.info.cluster_id,
+                    SnowflakeWorkerLease.node_id == self.info.node_id,
+                    SnowflakeWorkerLease.owner == self.owner,
+                )
+                .values(expire_at=_DbNow(self.ttl.total_seconds()))
+            )
+            if result.rowcount == 1:
+                expire_at = await self._get_expire_at(db, self.info.cluster_id, self.info.node_id)
+        if result.rowcount == 1:
+            self.info.expire_at = expire_at
+            self._local_expire_at = started + self.ttl.total_seconds()
+            self._apply_lease_deadline()
+            return True
+        return False
+
+    async def _heartbeat(self) -> None:
+        """每 1/3 租期续期一次; 租约丢失时重新分配节点, 避免与接管者生成重复 ID"""
+        interval = settings.SNOWFLAKE_LEASE_TTL / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if await self._renew():
+                    continue
+                log.error("雪花 ID 节点租约已丢失, 重新分配: owner={}", self.owner)
+                # 节点已被接管, 重新分配完成前不再用旧节点生成 ID
+                self.generator.set_lease_deadline(0.0)
+                cluster_id, node_id = await self._acquire_db_lease()
+                self.generator.reconfigure(cluster_id, node_id)
+                self._apply_lease_deadline()
+                log.info("雪花 ID 节点已重新分配: cluster_id={}, node_id={}", cluster_id, node_id)
+            except Exception as e:
+                log.warning("雪花 ID 节点租约续期失败: {}", e)
+
+    async def _release_db_lease(self) -> None:
+        try:
+            async with async_db_session.begin() as db:
+                await db.execute(
+                    update(SnowflakeWorkerLease)
+                    .where(
+                        SnowflakeWorkerLease.cluster_id == self.info.cluster_id,
+                        SnowflakeWorkerLease.node_id == self.info.node_id,
+                        SnowflakeWorkerLease.owner == self.owner,
+                    )
+                    .values(expire_at=_DbNow())
+                )
+        except Exception as e:
+            log.warning("释放雪花 ID 节点租约失败: {}", e)
+
+
+snowflake_lease_manager: SnowflakeLeaseManager = SnowflakeLeaseManager(snowflake)
@@ -0,0 +1,355 @@
+import zlib
+from typing import Any, Protocol
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.exceptions import HTTPException
+from starlette.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+class _StreamCompressor(Protocol):
+    def compress(self, data: bytes) -> bytes: ...
+
+    def flush(self) -> bytes: ...
+
+
+class _StreamDecompressor(Protocol):
+    def decompress(self, data: bytes, max_length: int) -> bytes: ...
+
+
+class _DecompressLimitError(Exception):
+    """解压输出超过上限"""
+
+
+class _GzipCompressor:
+    def __init__(self, level: int) -> None:
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        # 同步刷新, 流式响应的每个分块都能被客户端及时解出
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+
+class _GzipDecompressor:
+    def __init__(self) -> None:
+        self._obj = zlib.decompressobj(47)
+
+    def decompress(self, data: bytes, max_length: int) -> bytes:
+        out = self._obj.decompress(data, max_length + 1)
+        if len(out) > max_length or self._obj.unconsumed_tail:
+            raise _DecompressLimitError
+        return out
+
+
+class _BrotliCompressor:
+    def __init__(self, quality: int) -> None:
+        self._obj = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data) + self._obj.flush()
+
+    def flush(self) -> bytes:
+        return self._obj.finish()
+
+
+class _BrotliDecompressor:
+    def __init__(self) -> None:
+        self._obj = brotli.Decompressor()
+
+    def decompress(self, data: bytes, max_length: int) -> bytes:
+        # 达到输出上限后剩余输入留在解压器内部, 单次输出最多超出上限一个内部缓冲区
+        out = self._obj.process(data, output_buffer_limit=max_length + 1)
+        if len(out) > max_length:
+            raise _DecompressLimitError
+        return out
+
+
+class _ZstdCompressor:
+    def __init__(self, level: int) -> None:
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data) + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+
+class _BoundedSink:
+    """收集解压输出, 累计超过上限时中断解压"""
+
+    def __init__(self) -> None:
+        self.chunks: list[bytes] = []
+        self.size = 0
+        self.limit = 0
+
+    def write(self, data: bytes) -> int:
+        self.size += len(data)
+        if self.size > self.limit:
+            raise _DecompressLimitError
+        self.chunks.append(bytes(data))
+        return len(data)
+
+
+class _ZstdDecompressor:
+    # 解压输出按该大小分块写出, 超过上限时最多多解出一个分块
+    write_size = 65536
+
+    def __init__(self) -> None:
+        self._sink = _BoundedSink()
+        self._obj = zstandard.ZstdDecompressor().stream_writer(self._sink, write_size=self.write_size)
+
+    def decompress(self, data: bytes, max_length: int) -> bytes:
+        # decompressobj 没有输出上限, 改用 stream_writer 按块写出并在写出时检查上限
+        self._sink.size = 0
+        self._sink.limit = max_length
+        self._obj.write(data)
+        out = b"".join(self._sink.chunks)
+        self._sink.chunks.clear()
+        return out
+
+
+def _compress_gzip(data: bytes, level: int) -> bytes:
+    return zlib.compress(data, level, wbits=31)
+
+
+def _compress_brotli(data: bytes, level: int) -> bytes:
+    return brotli.compress(data, quality=level)
+
+
+def _compress_zstd(data: bytes, level: int) -> bytes:
+    return zstandard.ZstdCompressor(level=level).compress(data)
+
+
+# 编码名: (一次性压缩, 流式压缩器, 流式解压器), 未安装对应库的编码不参与协商;
+# 流式解压器为空表示无法限制解压输出, 不接受该编码的请求体
+_CODECS: dict[str, tuple[Any, Any, Any]] = {"gzip": (_compress_gzip, _GzipCompressor, _GzipDecompressor)}
+if zstandard is not None:
+    _CODECS["zstd"] = (_compress_zstd, _ZstdCompressor, _ZstdDecompressor)
+if brotli is not None:
+    # brotli 1.2.0 起 Decompressor.process 支持 output_buffer_limit, 更早的版本只用于响应压缩
+    _CODECS["br"] = (
+        _compress_brotli,
+        _BrotliCompressor,
+        _BrotliDecompressor if hasattr(brotli.Decompressor, "can_accept_more_data") else None,
+    )
+
+_COMPRESSIBLE_TYPES = ("application/json", "application/javascript", "application/xml", "text/")
+# 事件流需要逐条即时送达, 不压缩
+_EXCLUDED_TYPES = ("text/event-stream",)
+
+
+def _parse_accept_encoding(header: str) -> dict[str, float]:
+    """解析 Accept-Encoding, 返回 编码: q 值"""
+    accepted = {}
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name] = q
+    return accepted
+
+
+def _is_compressible(content_type: str) -> bool:
+    content_type = content_type.lower()
+    if content_type.startswith(_EXCLUDED_TYPES):
+        return False
+    return content_type.startswith(_COMPRESSIBLE_TYPES) or "+json" in content_type
+
+
+class CompressMiddleware:
+    """
+    响应压缩与请求体解压中间件
+
+    按 Accept-Encoding 与服务端优先级协商 zstd / br / gzip, 小于 min_size 的响应不压缩;
+    大于 offload_size 的响应体在线程池中压缩, 避免阻塞事件循环; 流式响应逐块压缩并同步刷新。
+    请求头带 Content-Encoding 的请求体在读取时流式解压, 各编码的解压输出都有上限, 解压后超过 max_request_size 返回 413
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        encodings: list[str],
+        min_size: int,
+        offload_size: int,
+        levels: dict[str, int],
+        max_request_size: int,
+    ) -> None:
+        """
+        初始化压缩中间件
+
+        :param app: ASGI 应用
+        :param encodings: 按优先级排列的响应编码, 未安装依赖的编码会被忽略
+        :param min_size: 压缩的最小响应体字节数
+        :param offload_size: 在线程池中压缩的最小响应体字节数
+        :param levels: 各编码的压缩级别
+        :param max_request_size: 请求体解压后的最大字节数
+        :return:
+        """
+        self.app = app
+        self.encodings = [encoding for encoding in encodings if encoding in _CODECS]
+        self.min_size = min_size
+        self.offload_size = offload_size
+        self.levels = levels
+        self.max_request_size = max_request_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        content_encoding = headers.get("content-encoding", "").strip().lower()
+        if content_encoding and content_encoding != "identity":
+            if content_encoding not in _CODECS or _CODECS[content_encoding][2] is None:
+                response = PlainTextResponse(f"Unsupported Content-Encoding: {content_encoding}", 415)
+                await response(scope, receive, send)
+                return
+            scope, receive = self._wrap_request(scope, receive, content_encoding)
+
+        encoding = self._negotiate(headers.get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressResponder(self, encoding, send).run(scope, receive)
+
+    def _negotiate(self, header: str) -> str | None:
+        """选择客户端接受且服务端优先级最高的编码"""
+        if not header:
+            return None
+        accepted = _parse_accept_encoding(header)
+        wildcard = accepted.get("*", 0.0)
+        for encoding in self.encodings:
+            if accepted.get(encoding, wildcard) > 0:
+                return encoding
+        return None
+
+    def _wrap_request(self, scope: Scope, receive: Receive, encoding: str) -> tuple[Scope, Receive]:
+        """去掉请求的 Content-Encoding 与 Content-Length, 读取请求体时流式解压"""
+        raw_headers = [
+            (key, value) for key, value in scope["headers"] if key not in (b"content-encoding", b"content-length")
+        ]
+        scope = {**scope, "headers": raw_headers}
+        decompressor: _StreamDecompressor = _CODECS[encoding][2]()
+        total = 0
+
+        async def receive_decompressed() -> Message:
+            nonlocal total
+            message = await receive()
+            if message["type"] != "http.request":
+                return message
+            try:
+                body = decompressor.decompress(message.get("body", b""), self.max_request_size - total)
+            except _DecompressLimitError:
+                raise HTTPException(status_code=413, detail="请求体解压后过大")
+            except Exception:
+                raise HTTPException(status_code=400, detail="请求体解压失败")
+            total += len(body)
+            return {**message, "body": body}
+
+        return scope, receive_decompressed
+
+
+class _CompressResponder:
+    """单个请求的响应压缩状态"""
+
+    def __init__(self, middleware: CompressMiddleware, encoding: str, send: Send) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.level = middleware.levels.get(encoding, -1)
+        self.start_message: Message | None = None
+        self.compressor: _StreamCompressor | None = None
+        self.passthrough = False
+
+    async def run(self, scope: Scope, receive: Receive) -> None:
+        await self.middleware.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # 延迟到收到第一段响应体时才能决定是否压缩
+            self.start_message = message
+            return
+        if message_type != "http.response.body":
+            await self.send(message)
+            return
+
+        if self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is not None:
+            data = self.compressor.compress(body) if body else b""
+            if not more_body:
+                data += self.compressor.flush()
+            await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+            return
+
+        start = self.start_message
+        headers = MutableHeaders(raw=start["headers"])
+        if not self._should_compress(start["status"], headers) or (not more_body and len(body) < self.middleware.min_size):
+            self.passthrough = True
+            await self.send(start)
+            await self.send(message)
+            return
+
+        self._set_encoding_headers(headers)
+        if not more_body:
+            compress = _CODECS[self.encoding][0]
+            if len(body) >= self.middleware.offload_size:
+                data = await anyio.to_thread.run_sync(compress, body, self.level)
+            else:
+                data = compress(body, self.level)
+            headers["Content-Length"] = str(len(data))
+            await self.send(start)
+            await self.send({"type": "http.response.body", "body": data})
+            return
+
+        # 流式响应, 长度未知
+        del headers["Content-Length"]
+        self.compressor = _CODECS[self.encoding][1](self.level)
+        await self.send(start)
+        await self.send({"type": "http.response.body", "body": self.compressor.compress(body), "more_body": True})
+
+    @staticmethod
+    def _should_compress(status: int, headers: MutableHeaders) -> bool:
+        if status < 200 or status in (204, 304):
+            return False
+        if "content-encoding" in headers:
+            return False
+        return _is_compressible(headers.get("content-type", ""))
+
+    def _set_encoding_headers(self, headers: MutableHeaders) -> None:
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        # 压缩后的表示与原表示字节不同, 强 ETag 降级为弱 ETag
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
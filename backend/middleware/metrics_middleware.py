@@ -0,0 +1,80 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.utils.metrics import DEFAULT_LATENCY_BUCKETS, LabeledHistogram, RequestTimings, request_timings
+
+# 单请求查询次数分桶
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+
+request_duration = LabeledHistogram(
+    "http_request_duration_seconds", "请求处理耗时", ("method", "route", "status"), DEFAULT_LATENCY_BUCKETS
+)
+request_db_duration = LabeledHistogram(
+    "http_request_db_duration_seconds", "单请求数据库语句总耗时", ("method", "route"), DEFAULT_LATENCY_BUCKETS
+)
+request_db_queries = LabeledHistogram(
+    "http_request_db_queries", "单请求数据库语句数", ("method", "route"), QUERY_COUNT_BUCKETS
+)
+request_pool_wait = LabeledHistogram(
+    "http_request_pool_wait_seconds", "单请求获取数据库连接总耗时", ("method", "route"), DEFAULT_LATENCY_BUCKETS
+)
+
+
+class MetricsMiddleware:
+    """
+    请求耗时与数据库耗时统计中间件
+
+    按路由模板记录请求耗时、语句数、数据库耗时与连接等待耗时直方图,
+    并可在响应头中附带 Server-Timing
+    """
+
+    def __init__(self, app: ASGIApp, *, server_timing: bool = True) -> None:
+        """
+        初始化统计中间件
+
+        :param app: ASGI 应用
+        :param server_timing: 是否添加 Server-Timing 响应头
+        :return:
+        """
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = request_timings.set(timings)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    elapsed = time.perf_counter() - start
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        "Server-Timing",
+                        f"app;dur={elapsed * 1000:.2f}, "
+                        f'db;dur={timings.db_time * 1000:.2f};desc="{timings.queries} queries", '
+                        f"pool;dur={timings.pool_wait * 1000:.2f}",
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_timings.reset(token)
+            route = scope.get("route")
+            # 未匹配的路径不作为标签, 避免标签基数膨胀
+            path = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            request_duration.labels(method, path, str(status)).observe(time.perf_counter() - start)
+            request_db_duration.labels(method, path).observe(timings.db_time)
+            request_db_queries.labels(method, path).observe(timings.queries)
+            request_pool_wait.labels(method, path).observe(timings.pool_wait)
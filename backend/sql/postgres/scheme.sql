@@ -7,6 +7,7 @@ CREATE TABLE "agent_meta" (
   "side" varchar(50) NOT NULL,
   "param_schema" json NOT NULL,
   "supported_env_templates" varchar(500),
+  "sha256" varchar(64),
   "created_at" timestamp DEFAULT (now()),
   "updated_at" timestamp DEFAULT (now())
 );
@@ -81,6 +82,8 @@ CREATE INDEX "idx_agent_name" ON "agent_meta" ("agent_name");
 
 CREATE INDEX "idx_agent_side" ON "agent_meta" ("side");
 
+CREATE INDEX "ix_agent_meta_sha256" ON "agent_meta" ("sha256");
+
 CREATE INDEX "idx_env_template" ON "environment" ("template_id");
 
 CREATE INDEX "idx_env_status" ON "environment" ("status");
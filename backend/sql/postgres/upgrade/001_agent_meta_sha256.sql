@@ -0,0 +1,7 @@
+-- 智能体文件按 SHA-256 内容寻址存储
+-- 已有智能体的摘要为空, 不参与去重; 重新上传后新记录会写入摘要
+ALTER TABLE "agent_meta" ADD COLUMN IF NOT EXISTS "sha256" varchar(64);
+
+COMMENT ON COLUMN "agent_meta"."sha256" IS '智能体文件 SHA-256 摘要';
+
+CREATE INDEX IF NOT EXISTS "ix_agent_meta_sha256" ON "agent_meta" ("sha256");
@@ -0,0 +1,85 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from pydantic import BaseModel
+from sqlalchemy import DateTime, String, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from backend.common.crud import bulk_create_unique
+
+
+class _Base(DeclarativeBase):
+    pass
+
+
+class _Item(_Base):
+    """SQLite 不会为 BIGINT 主键自增, 测试使用独立的表"""
+
+    __tablename__ = "batch_item"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(64), unique=True)
+    create_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+
+
+class _CreateItemParam(BaseModel):
+    name: str
+
+
+class _RacingSession:
+    """名称检查之后, 模拟并发请求先插入同名数据"""
+
+    def __init__(self, db: AsyncSession, name: str, dialect: str) -> None:
+        self._db = db
+        self._name = name
+        self._checked = False
+        # 以 MySQL 方言名称走保存点重试分支
+        self.bind = SimpleNamespace(dialect=SimpleNamespace(name=dialect))
+
+    def __getattr__(self, item):
+        return getattr(self._db, item)
+
+    async def execute(self, statement, *args, **kwargs):
+        result = await self._db.execute(statement, *args, **kwargs)
+        if not self._checked:
+            self._checked = True
+            await self._db.execute(insert(_Item).values(name=self._name, create_at=datetime.now()))
+        return result
+
+
+@pytest.mark.parametrize("dialect", ["sqlite", "mysql"])
+def test_concurrent_name_is_reported_per_item(tmp_path, dialect: str) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'crud.db'}")
+    maker = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def run() -> None:
+        async with engine.begin() as conn:
+            await conn.run_sync(_Base.metadata.create_all)
+        async with maker.begin() as db:
+            await db.execute(insert(_Item).values(name="existing", create_at=datetime.now()))
+        objs = [_CreateItemParam(name=name) for name in ("a", "existing", "racing", "b", "a")]
+        async with maker.begin() as db:
+            session = _RacingSession(db, "racing", dialect)
+            result = await bulk_create_unique(session, _Item.id, _Item.name, objs, label="环境配置模版")
+        assert [(item.name, item.success) for item in result.items] == [
+            ("a", True),
+            ("existing", False),
+            ("racing", False),
+            ("b", True),
+            ("a", False),
+        ]
+        assert result.items[2].msg == "环境配置模版名称已存在"
+        async with maker() as db:
+            rows = dict((await db.execute(select(_Item.name, _Item.id))).all())
+        assert {item.name: item.id for item in result.items if item.success} == {"a": rows["a"], "b": rows["b"]}
+
+    async def main() -> None:
+        try:
+            await run()
+        finally:
+            await engine.dispose()
+
+    asyncio.run(main())
@@ -0,0 +1,75 @@
+import gzip
+
+import pytest
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from backend.middleware.compress_middleware import _CODECS, CompressMiddleware, _DecompressLimitError
+
+MAX_REQUEST_SIZE = 1024 * 1024
+
+
+async def echo_length(request: Request) -> PlainTextResponse:
+    return PlainTextResponse(str(len(await request.body())))
+
+
+def make_client() -> TestClient:
+    app = Starlette(routes=[Route("/echo", echo_length, methods=["POST"])])
+    app.add_middleware(
+        CompressMiddleware,
+        encodings=["gzip"],
+        min_size=500,
+        offload_size=1024 * 1024,
+        levels={},
+        max_request_size=MAX_REQUEST_SIZE,
+    )
+    return TestClient(app)
+
+
+def _compress(encoding: str, data: bytes) -> bytes:
+    if encoding == "gzip":
+        return gzip.compress(data)
+    if encoding == "br":
+        return pytest.importorskip("brotli").compress(data)
+    return pytest.importorskip("zstandard").ZstdCompressor().compress(data)
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br", "zstd"])
+def test_decompress_request_body(encoding: str) -> None:
+    body = b'{"a": 1}' * 1000
+    response = make_client().post(
+        "/echo", content=_compress(encoding, body), headers={"Content-Encoding": encoding}
+    )
+    assert response.status_code == 200
+    assert response.text == str(len(body))
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br", "zstd"])
+def test_decompression_bomb_rejected(encoding: str) -> None:
+    # 几十 KB 的压缩数据解压后远超上限, 应在解压过程中中断并返回 413
+    bomb = _compress(encoding, b"\0" * (MAX_REQUEST_SIZE * 64))
+    assert len(bomb) < MAX_REQUEST_SIZE
+    response = make_client().post("/echo", content=bomb, headers={"Content-Encoding": encoding})
+    assert response.status_code == 413
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br", "zstd"])
+def test_decompressor_output_bounded(encoding: str) -> None:
+    # 单个分块也不能一次解出全部数据, 超过上限即中断
+    bomb = _compress(encoding, b"\0" * (MAX_REQUEST_SIZE * 64))
+    decompressor = _CODECS[encoding][2]()
+    with pytest.raises(_DecompressLimitError):
+        decompressor.decompress(bomb, MAX_REQUEST_SIZE)
+
+
+def test_corrupt_body_rejected() -> None:
+    response = make_client().post("/echo", content=b"not gzip", headers={"Content-Encoding": "gzip"})
+    assert response.status_code == 400
+
+
+def test_unknown_encoding_rejected() -> None:
+    response = make_client().post("/echo", content=b"x", headers={"Content-Encoding": "compress"})
+    assert response.status_code == 415
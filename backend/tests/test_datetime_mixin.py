@@ -0,0 +1,48 @@
+import asyncio
+
+from sqlalchemy import Integer, String, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.common.model import Base
+from backend.utils.timezone import timezone
+
+
+class _Stamped(Base):
+    """SQLite 不会为 BIGINT 主键自增, 测试使用独立的表"""
+
+    __tablename__ = "stamped_item"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, init=False)
+    name: Mapped[str] = mapped_column(String(64))
+
+
+def test_core_insert_uses_column_default_and_explicit_value(tmp_path) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'model.db'}")
+    maker = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def run() -> None:
+        async with engine.begin() as conn:
+            await conn.run_sync(_Stamped.metadata.create_all, tables=[_Stamped.__table__])
+        now = timezone.now()
+        async with maker.begin() as db:
+            # 未提供 create_at 的核心插入由列级默认值补齐
+            await db.execute(insert(_Stamped), [{"name": "a"}, {"name": "b"}])
+            # 批量写入显式传入同一时间
+            await db.execute(insert(_Stamped), [{"name": "c", "create_at": now}, {"name": "d", "create_at": now}])
+            obj = _Stamped(name="e")
+            db.add(obj)
+            await db.flush()
+            assert obj.create_at is not None
+        async with maker() as db:
+            rows = dict((await db.execute(select(_Stamped.name, _Stamped.create_at))).all())
+        assert all(rows.values())
+        assert rows["c"] == rows["d"] == now
+
+    async def main() -> None:
+        try:
+            await run()
+        finally:
+            await engine.dispose()
+
+    asyncio.run(main())
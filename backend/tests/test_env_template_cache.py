@@ -0,0 +1,52 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from backend.app.env.service import env_template_service as service_module
+from backend.app.env.service.env_template_service import (
+    _cache_evict,
+    env_template_cache,
+    env_template_service,
+)
+
+
+def _row(name: str) -> SimpleNamespace:
+    return SimpleNamespace(id=1, name=name, param_schema={}, create_at=datetime.now(), update_at=None)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    env_template_cache.clear()
+    yield
+    env_template_cache.clear()
+
+
+def test_fill_started_before_invalidation_is_dropped(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def run() -> None:
+        reading = asyncio.Event()
+        done = asyncio.Event()
+
+        async def slow_get(db, pk):
+            # 读库期间其他请求修改并失效了缓存
+            reading.set()
+            await done.wait()
+            return _row("old")
+
+        monkeypatch.setattr(service_module.env_template_dao, "get", slow_get)
+        pending = asyncio.ensure_future(env_template_service.get(db=None, pk=1))
+        await reading.wait()
+        _cache_evict('{"id": 1, "name": "old"}')
+        done.set()
+        assert (await pending).name == "old"
+        assert env_template_cache.get(("id", 1)) is None
+
+        async def get(db, pk):
+            return _row("new")
+
+        monkeypatch.setattr(service_module.env_template_dao, "get", get)
+        assert (await env_template_service.get(db=None, pk=1)).name == "new"
+        assert env_template_cache.get(("id", 1)).name == "new"
+
+    asyncio.run(run())
@@ -0,0 +1,73 @@
+import time
+
+import pytest
+
+from backend.common import log_sink
+from backend.common.log_sink import JsonLinesSink
+
+
+class _Message:
+    def __init__(self, text: str) -> None:
+        self.record = {"message": text}
+
+
+def _make_sink(tmp_path, **kwargs) -> JsonLinesSink:
+    options = {
+        "rotation_size": 0,
+        "rotation_interval": 0,
+        "retention": 1,
+        "batch_size": 16,
+        "flush_interval": 0.01,
+        "compress": False,
+    }
+    options.update(kwargs)
+    return JsonLinesSink(str(tmp_path / "app.jsonl"), **options)
+
+
+def test_writer_survives_write_error(monkeypatch: pytest.MonkeyPatch, tmp_path, capsys) -> None:
+    monkeypatch.setattr(log_sink, "serialize_record", lambda record: f"{record['message']}\n".encode())
+    sink = _make_sink(tmp_path)
+    real_write = sink._write
+    failures = []
+
+    def flaky_write(data: bytes) -> None:
+        if not failures:
+            failures.append(data)
+            raise OSError(28, "No space left on device")
+        real_write(data)
+
+    sink._write = flaky_write
+    sink.write(_Message("lost"))
+    time.sleep(0.2)
+    sink.write(_Message("kept"))
+    sink.stop()
+
+    assert failures
+    assert (tmp_path / "app.jsonl").read_bytes() == b"kept\n"
+    assert "No space left on device" in capsys.readouterr().err
+
+
+def test_full_queue_drops_new_records(monkeypatch: pytest.MonkeyPatch, tmp_path, capsys) -> None:
+    monkeypatch.setattr(log_sink, "serialize_record", lambda record: f"{record['message']}\n".encode())
+    sink = _make_sink(tmp_path, queue_size=2)
+    # 写线程卡住时队列不会无限增长
+    blocked = log_sink.threading.Event()
+    real_write = sink._write
+
+    def slow_write(data: bytes) -> None:
+        blocked.wait()
+        real_write(data)
+
+    sink._write = slow_write
+    sink.write(_Message("0"))
+    time.sleep(0.1)
+    for i in range(1, 10):
+        sink.write(_Message(str(i)))
+    assert sink._queue.qsize() == 2
+    blocked.set()
+    time.sleep(0.1)
+    sink.write(_Message("last"))
+    sink.stop()
+
+    assert (tmp_path / "app.jsonl").read_bytes().splitlines() == [b"0", b"1", b"2", b"last"]
+    assert "丢弃 7 条日志" in capsys.readouterr().err
@@ -0,0 +1,87 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from backend.common.exception import errors
+from backend.core.conf import settings
+from backend.database import snowflake_lease
+from backend.database.snowflake_lease import SnowflakeLeaseManager, SnowflakeWorkerLease
+from backend.utils.snowflake import Snowflake
+from backend.utils.timezone import timezone
+
+
+class _DatabaseDown:
+    def begin(self):
+        raise ConnectionError("database down")
+
+
+def test_generate_stops_when_renew_fails_past_ttl(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'lease.db'}")
+    maker = async_sessionmaker(engine, expire_on_commit=False)
+    monkeypatch.setattr(snowflake_lease, "async_db_session", maker)
+    monkeypatch.setattr(settings, "SNOWFLAKE_LEASE_BACKEND", "database")
+    monkeypatch.setattr(settings, "SNOWFLAKE_LEASE_TTL", 1)
+    monkeypatch.setattr(settings, "SNOWFLAKE_LEASE_SAFETY_MARGIN", 0.2)
+    generator = Snowflake()
+    manager = SnowflakeLeaseManager(generator)
+
+    async def run() -> None:
+        async with engine.begin() as conn:
+            await conn.run_sync(SnowflakeWorkerLease.__table__.create)
+        await manager.start()
+        try:
+            generator.generate()
+
+            # 数据库不可用, 心跳续期持续失败, 超过租期后不能再用该节点生成 ID
+            monkeypatch.setattr(snowflake_lease, "async_db_session", _DatabaseDown())
+            await asyncio.sleep(1.2)
+            with pytest.raises(errors.ServerError):
+                generator.generate()
+            with pytest.raises(errors.ServerError):
+                generator.generate_batch(10)
+
+            # 数据库恢复, 下一次心跳续期成功后恢复生成
+            monkeypatch.setattr(snowflake_lease, "async_db_session", maker)
+            await asyncio.sleep(0.5)
+            assert len(generator.generate_batch(10)) == 10
+        finally:
+            await manager.stop()
+            await engine.dispose()
+
+    asyncio.run(run())
+
+
+def test_generator_without_lease_is_unbounded() -> None:
+    generator = Snowflake()
+    assert generator.lease_deadline is None
+    assert generator.generate() < generator.generate()
+
+
+def test_skewed_host_clock_cannot_take_over_live_lease(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'lease.db'}")
+    maker = async_sessionmaker(engine, expire_on_commit=False)
+    monkeypatch.setattr(snowflake_lease, "async_db_session", maker)
+    monkeypatch.setattr(settings, "SNOWFLAKE_LEASE_BACKEND", "database")
+    monkeypatch.setattr(settings, "SNOWFLAKE_LEASE_TTL", 30)
+    first = SnowflakeLeaseManager(Snowflake())
+    second = SnowflakeLeaseManager(Snowflake())
+
+    async def run() -> None:
+        async with engine.begin() as conn:
+            await conn.run_sync(SnowflakeWorkerLease.__table__.create)
+        await first.start()
+        try:
+            # 第二台主机的时钟快一小时, 租约仍按数据库时钟判断未过期
+            skewed = timezone.now() + timedelta(hours=1)
+            monkeypatch.setattr(timezone, "now", lambda: skewed)
+            await second.start()
+            assert (second.info.cluster_id, second.info.node_id) != (first.info.cluster_id, first.info.node_id)
+            assert await first._renew()
+        finally:
+            await second.stop()
+            await first.stop()
+            await engine.dispose()
+
+    asyncio.run(run())
@@ -0,0 +1,37 @@
+import msgspec
+import pytest
+
+from backend.app.deduction.service.task_log_service import decode_records
+from backend.common.exception import errors
+
+_RECORD = {"task_id": 1, "suffix": 1, "type": "log", "level": "info", "content": "ok"}
+
+
+def test_decode_valid_batches() -> None:
+    line = msgspec.json.encode(_RECORD)
+    assert len(decode_records("application/x-ndjson", line + b"\n\n" + line)) == 2
+    assert len(decode_records("application/json; charset=utf-8", msgspec.json.encode([_RECORD]))) == 1
+    assert len(decode_records("application/msgpack", msgspec.msgpack.encode([_RECORD]))) == 1
+
+
+@pytest.mark.parametrize(
+    ("content_type", "body"),
+    [
+        ("application/x-ndjson", msgspec.json.encode(_RECORD) + b"\n{not json"),
+        ("application/x-ndjson", msgspec.json.encode({**_RECORD, "level": "verbose"})),
+        ("application/json", b"[{"),
+        ("application/json", msgspec.json.encode([{**_RECORD, "task_id": "x"}])),
+        ("application/msgpack", b"\xc1"),
+        ("application/msgpack", msgspec.msgpack.encode({"not": "a list"})),
+    ],
+)
+def test_decode_malformed_body_returns_400(content_type: str, body: bytes) -> None:
+    with pytest.raises(errors.HTTPError) as exc_info:
+        decode_records(content_type, body)
+    assert exc_info.value.status_code == 400
+
+
+def test_decode_unsupported_content_type_returns_415() -> None:
+    with pytest.raises(errors.HTTPError) as exc_info:
+        decode_records("text/plain", b"")
+    assert exc_info.value.status_code == 415
@@ -0,0 +1,61 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from backend.app.deduction.service import task_log_stream_service
+from backend.app.deduction.service.task_log_stream_service import TaskLogHub
+
+# 远早于回看窗口的历史日志
+_HISTORY = [{"id": pk, "suffix": 1} for pk in range(1, 1001)]
+
+
+class _FakeDao:
+    async def get_ids_after(self, db, task_id, after_id, *, limit):
+        return []
+
+    async def get_by_ids(self, db, ids):
+        return []
+
+    async def get_after(self, db, task_id, after_id, *, suffix=None, until_id=None, limit):
+        return [row for row in _HISTORY if after_id < row["id"] <= until_id][:limit]
+
+
+@asynccontextmanager
+async def _fake_session():
+    yield None
+
+
+@pytest.fixture
+def hub(monkeypatch: pytest.MonkeyPatch) -> TaskLogHub:
+    monkeypatch.setattr(task_log_stream_service, "task_log_dao", _FakeDao())
+    monkeypatch.setattr(task_log_stream_service, "async_db_session", _fake_session)
+    return TaskLogHub(poll_interval=10, lookback=5, batch_size=10, queue_size=4)
+
+
+def test_catch_up_prunes_replayed_ids(hub: TaskLogHub) -> None:
+    async def run() -> None:
+        stream = hub.subscribe(1, last_id=0)
+        replayed = 0
+        while replayed < len(_HISTORY):
+            rows = await anext(stream)
+            replayed += len(rows)
+            # 追赶过程中已发送集合不随回放条数增长
+            assert len(stream.ag_frame.f_locals["recent"]) <= hub.batch_size * 4
+        await stream.aclose()
+
+    asyncio.run(run())
+
+
+def test_stop_ends_subscribers(hub: TaskLogHub) -> None:
+    async def run() -> None:
+        stream = hub.subscribe(1)
+        pending = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0.05)
+        assert not pending.done()
+        await hub.stop()
+        with pytest.raises(StopAsyncIteration):
+            await asyncio.wait_for(pending, 1)
+        assert hub.stats() == {}
+
+    asyncio.run(run())
@@ -0,0 +1,55 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from backend.app.deduction.service import task_status_service
+from backend.app.deduction.service.task_status_service import TaskStatusRegistry
+from backend.common.enums import TaskStatus
+from backend.utils.timezone import timezone
+
+_ROWS: dict[int, list[SimpleNamespace]] = {}
+
+
+class _FakeDao:
+    async def get_by_deduction(self, db, deduce_id):
+        return _ROWS.get(deduce_id, [])
+
+
+@asynccontextmanager
+async def _fake_session():
+    yield None
+
+
+@pytest.fixture
+def registry(monkeypatch: pytest.MonkeyPatch) -> TaskStatusRegistry:
+    monkeypatch.setattr(task_status_service, "task_status_dao", _FakeDao())
+    monkeypatch.setattr(task_status_service, "async_db_session", _fake_session)
+    _ROWS.clear()
+    return TaskStatusRegistry(flush_interval=1, flush_batch=10, refresh_interval=60, idle_ttl=60)
+
+
+def test_snapshot_of_unknown_deduction_is_not_cached(registry: TaskStatusRegistry) -> None:
+    async def run() -> None:
+        for deduce_id in range(100):
+            view = await registry.snapshot(deduce_id)
+            assert view.revision == 0
+            assert view.items == ()
+        assert registry.stats()["deductions"] == 0
+
+    asyncio.run(run())
+
+
+def test_snapshot_loads_rows_written_elsewhere(registry: TaskStatusRegistry) -> None:
+    async def run() -> None:
+        assert (await registry.snapshot(1)).items == ()
+        # 其他 worker 写入状态后, 下一次读取从数据库加载
+        now = timezone.now()
+        _ROWS[1] = [SimpleNamespace(task_id=7, suffix=1, status=TaskStatus.NORMAL, update_at=now, create_at=now)]
+        view = await registry.snapshot(1)
+        assert view.revision > 0
+        assert [(item.task_id, item.suffix) for item in view.items] == [(7, 1)]
+        assert registry.stats()["deductions"] == 1
+
+    asyncio.run(run())
@@ -0,0 +1,153 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from backend.app.deduction.service import task_status_service, workflow_service as workflow_module
+from backend.app.deduction.service.task_status_service import task_status_registry
+from backend.app.deduction.service.workflow_service import EngineNodeRunner, WorkflowGraph, WorkflowService
+from backend.common.enums import TaskStatus, WorkflowNodeStatus
+from backend.common.exception import errors
+from backend.core.conf import settings
+
+_PIN = {"activation": None, "end": None, "delay": None, "cancel": None}
+
+
+def _config(*nodes: tuple[str, str | None]) -> list[dict]:
+    return [
+        {"id": node_id, "isBox": True, "envConfig": {"envType": "lt"}, "bizValue": {}, "pin": _PIN, "father": father}
+        for node_id, father in nodes
+    ]
+
+
+def _engine(deduce_id: int, results: dict[str, TaskStatus], submitted: list[str]) -> httpx.AsyncClient:
+    """模拟推演引擎: 收到节点后稍后通过状态上报结束"""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        node = json.loads(request.content)["body"][0]
+        submitted.append(node["id"])
+        task_id, _, suffix = node["id"].partition("&")
+        asyncio.get_running_loop().call_later(
+            0.01, task_status_registry.update, deduce_id, int(task_id), int(suffix), results[node["id"]]
+        )
+        return httpx.Response(200, json={"code": 200})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+@pytest.fixture(autouse=True)
+def engine_url(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "WORKFLOW_ENGINE_URL", "http://engine.test/task")
+
+
+class _EmptyDao:
+    async def get_by_deduction(self, db, deduce_id):
+        return []
+
+
+@asynccontextmanager
+async def _fake_session():
+    yield None
+
+
+@pytest.fixture(autouse=True)
+def no_database(monkeypatch: pytest.MonkeyPatch) -> None:
+    # 快照只读取本 worker 内存中的状态
+    monkeypatch.setattr(task_status_service, "task_status_dao", _EmptyDao())
+    monkeypatch.setattr(task_status_service, "async_db_session", _fake_session)
+
+
+def test_engine_runner_follows_reported_status() -> None:
+    graph = WorkflowGraph.from_config(_config(("1&1", None), ("1&2", "1&1"), ("2&1", None), ("2&2", "2&1")))
+    results = {"1&1": TaskStatus.TERMINAL, "1&2": TaskStatus.TERMINAL, "2&1": TaskStatus.ABNORMAL}
+    submitted: list[str] = []
+
+    async def run() -> None:
+        client = _engine(100, results, submitted)
+        service = WorkflowService()
+        result = await service.start(deduce_id=100, graph=graph, runner=EngineNodeRunner(100, client))
+        await client.aclose()
+        assert result.status == {
+            "1&1": WorkflowNodeStatus.completed,
+            "1&2": WorkflowNodeStatus.completed,
+            "2&1": WorkflowNodeStatus.failed,
+            "2&2": WorkflowNodeStatus.skipped,
+        }
+        assert "abnormal" in result.errors["2&1"]
+        # 被跳过的节点没有完成, 不能与成功的节点同为 TERMINAL
+        statuses = {(item.task_id, item.suffix): item.status for item in (await task_status_registry.snapshot(100)).items}
+        assert statuses[(1, 2)] == TaskStatus.TERMINAL
+        assert statuses[(2, 2)] == TaskStatus.ABNORMAL
+
+    asyncio.run(run())
+    assert sorted(submitted) == ["1&1", "1&2", "2&1"]
+
+
+def test_engine_reporting_before_response_is_not_missed() -> None:
+    graph = WorkflowGraph.from_config(_config(("4&1", None)))
+
+    async def report_first(request: httpx.Request) -> httpx.Response:
+        # 引擎在响应提交之前就上报结束状态
+        task_status_registry.update(400, 4, 1, TaskStatus.TERMINAL)
+        return httpx.Response(200, json={"code": 200})
+
+    async def run() -> None:
+        client = httpx.AsyncClient(transport=httpx.MockTransport(report_first))
+        service = WorkflowService()
+        task = service.start(deduce_id=400, graph=graph, runner=EngineNodeRunner(400, client))
+        try:
+            result = await asyncio.wait_for(asyncio.shield(task), 2)
+        finally:
+            await service.cancel(deduce_id=400)
+            await client.aclose()
+        assert result.status == {"4&1": WorkflowNodeStatus.completed}
+
+    asyncio.run(run())
+
+
+def test_run_validates_plan(monkeypatch: pytest.MonkeyPatch) -> None:
+    plan = SimpleNamespace(task_config=_config(("root", None)))
+
+    async def get(db, pk):
+        return plan if pk == 1 else None
+
+    monkeypatch.setattr(workflow_module.deduction_plan_dao, "get", get)
+    service = WorkflowService()
+
+    async def run() -> None:
+        with pytest.raises(errors.HTTPError) as exc_info:
+            await service.run(db=None, deduce_id=2)
+        assert exc_info.value.status_code == 404
+        # 节点 ID 无法对应任务状态时拒绝执行
+        with pytest.raises(errors.HTTPError) as exc_info:
+            await service.run(db=None, deduce_id=1)
+        assert exc_info.value.status_code == 400
+        monkeypatch.setattr(settings, "WORKFLOW_ENGINE_URL", None)
+        with pytest.raises(errors.HTTPError) as exc_info:
+            await service.run(db=None, deduce_id=1)
+        assert exc_info.value.status_code == 503
+
+    asyncio.run(run())
+
+
+def test_cancel_stops_waiting_nodes() -> None:
+    graph = WorkflowGraph.from_config(_config(("3&1", None)))
+
+    async def never_report(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200)
+
+    async def run() -> None:
+        client = httpx.AsyncClient(transport=httpx.MockTransport(never_report))
+        service = WorkflowService()
+        task = service.start(deduce_id=300, graph=graph, runner=EngineNodeRunner(300, client))
+        await asyncio.sleep(0.05)
+        assert await service.cancel(deduce_id=300)
+        assert task.cancelled()
+        assert [item.status for item in (await task_status_registry.snapshot(300)).items] == [TaskStatus.ABNORMAL]
+        assert not await service.cancel(deduce_id=300)
+        await client.aclose()
+
+    asyncio.run(run())
@@ -0,0 +1,110 @@
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any, Generic, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# 已创建的缓存, 供监控接口汇总
+cache_registry: dict[str, "TTLCache[Any, Any]"] = {}
+
+
+class TTLCache(Generic[K, V]):
+    """
+    进程内有界 LRU + TTL 缓存
+
+    仅在事件循环线程内使用, 不加锁. 每次删除或清空都会递增 generation, 读库前记录 generation 并在写入时传入,
+    读库期间发生过失效的结果不会写入缓存
+    """
+
+    def __init__(self, name: str, *, maxsize: int, ttl: float) -> None:
+        """
+        初始化缓存
+
+        :param name: 缓存名称
+        :param maxsize: 最大条目数, 超出后淘汰最久未使用的条目
+        :param ttl: 条目存活秒数
+        :return:
+        """
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.generation = 0
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        cache_registry[name] = self
+
+    def get(self, key: K) -> V | None:
+        """获取缓存, 未命中或已过期返回 None"""
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        expire_at, value = item
+        if expire_at < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V, *, generation: int | None = None) -> None:
+        """
+        写入缓存
+
+        :param key: 键
+        :param value: 值
+        :param generation: 读取 value 之前的 generation, 此后发生过失效时丢弃本次写入
+        :return:
+        """
+        if generation is not None and generation != self.generation:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: K) -> None:
+        """删除缓存"""
+        self.generation += 1
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self.generation += 1
+        self._data.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """缓存统计"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+
+def invalidate_on_commit(db: AsyncSession, invalidate: Callable[[], None]) -> None:
+    """
+    立即执行一次缓存失效, 并在事务提交后再执行一次
+
+    避免提交前其他请求读到旧数据并重新写入缓存
+
+    :param db: 数据库会话
+    :param invalidate: 失效函数
+    :return:
+    """
+    invalidate()
+    event.listen(db.sync_session, "after_commit", lambda _session: invalidate(), once=True)
@@ -0,0 +1,52 @@
+import hashlib
+from typing import Any
+
+from msgspec import json
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    根据版本信息生成强 ETag
+
+    :param parts: 可被 msgspec 序列化的版本信息, 如主键、更新时间、分页参数
+    :return:
+    """
+    digest = hashlib.blake2b(json.encode(parts), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def row_etag(obj: Any) -> str:
+    """
+    根据单条记录的主键与更新时间生成 ETag
+
+    :param obj: ORM 对象或包含 id、create_at、update_at 的 schema
+    :return:
+    """
+    return make_etag(obj.id, obj.create_at, obj.update_at)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    判断请求的 If-None-Match 是否命中
+
+    按 RFC 9110 对 If-None-Match 使用弱比较, 忽略 W/ 前缀
+
+    :param request: 请求
+    :param etag: 当前资源的 ETag
+    :return:
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    """304 响应, 不包含响应体"""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
@@ -0,0 +1,144 @@
+import hashlib
+import multiprocessing
+import os
+import tempfile
+import threading
+import zipfile
+from collections.abc import AsyncIterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from backend.common.dataclasses import SpooledFile, ZipMemberError, ZipVerifyReport
+from backend.common.exception import errors
+from backend.core.conf import settings
+
+_ZIP_READ_CHUNK_SIZE = 1024 * 1024
+
+_verify_executor: ProcessPoolExecutor | None = None
+_verify_executor_lock = threading.Lock()
+
+
+@asynccontextmanager
+async def spool_upload_file(
+    file: UploadFile, *, suffix: str = "", chunk_size: int = settings.AGENT_UPLOAD_CHUNK_SIZE
+) -> AsyncIterator[SpooledFile]:
+    """
+    将上传文件按固定大小分块写入临时文件并同时计算 SHA-256, 退出上下文时删除
+
+    峰值内存只与 chunk_size 有关, 落盘后的文件可以被多个读取方(校验、上传)同时打开
+
+    :param file: 上传文件
+    :param suffix: 临时文件后缀
+    :param chunk_size: 分块大小
+    :return:
+    """
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    digest = hashlib.sha256()
+    size = 0
+
+    def write_chunk(f, chunk: bytes) -> None:
+        digest.update(chunk)
+        f.write(chunk)
+
+    try:
+        with os.fdopen(fd, "wb") as f:
+            while chunk := await file.read(chunk_size):
+                await run_in_threadpool(write_chunk, f, chunk)
+                size += len(chunk)
+        yield SpooledFile(path=path, size=size, sha256=digest.hexdigest())
+    finally:
+        await run_in_threadpool(os.unlink, path)
+
+
+def _check_zip_members(path: str, names: list[str]) -> list[tuple[str, str]]:
+    """
+    逐个解压成员并校验 CRC, 返回损坏成员及原因(进程池任务, 需为模块级函数)
+
+    :param path: zip 文件路径
+    :param names: 需要校验的成员名称
+    :return:
+    """
+    corrupt = []
+    with zipfile.ZipFile(path) as zf:
+        for name in names:
+            try:
+                with zf.open(name) as f:
+                    while f.read(_ZIP_READ_CHUNK_SIZE):
+                        pass
+            except Exception as e:
+                corrupt.append((name, str(e) or e.__class__.__name__))
+    return corrupt
+
+
+def _split_members(members: list[zipfile.ZipInfo], parts: int) -> list[list[str]]:
+    """按解压后大小将成员均衡分配到若干组"""
+    groups: list[list[str]] = [[] for _ in range(parts)]
+    loads = [0] * parts
+    for info in sorted(members, key=lambda m: m.file_size, reverse=True):
+        idx = loads.index(min(loads))
+        groups[idx].append(info.filename)
+        loads[idx] += info.file_size
+    return [group for group in groups if group]
+
+
+def _get_verify_executor() -> ProcessPoolExecutor:
+    """懒加载 zip 校验进程池"""
+    global _verify_executor
+    with _verify_executor_lock:
+        if _verify_executor is None:
+            _verify_executor = ProcessPoolExecutor(
+                max_workers=settings.AGENT_ZIP_VERIFY_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _verify_executor
+
+
+def shutdown_verify_executor() -> None:
+    """关闭 zip 校验进程池"""
+    global _verify_executor
+    with _verify_executor_lock:
+        if _verify_executor is not None:
+            _verify_executor.shutdown(wait=True, cancel_futures=True)
+            _verify_executor = None
+
+
+def verify_zip_file(path: str) -> ZipVerifyReport:
+    """
+    校验 zip 文件的中央目录和各成员 CRC, 按块解压不会整体读入内存
+
+    解压后总大小超过 ``AGENT_ZIP_PARALLEL_THRESHOLD`` 时, 成员按大小均衡分组后交给进程池并行校验,
+    否则在当前线程内逐个校验
+
+    :param path: zip 文件路径
+    :return:
+    """
+    try:
+        with zipfile.ZipFile(path) as zf:
+            members = [info for info in zf.infolist() if not info.is_dir()]
+    except (zipfile.BadZipFile, zipfile.LargeZipFile, EOFError, OSError):
+        raise errors.ZipError(msg="智能体文件压缩包损坏")
+
+    total_size = sum(info.file_size for info in members)
+    workers = settings.AGENT_ZIP_VERIFY_WORKERS
+    parallel = workers > 1 and len(members) > 1 and total_size >= settings.AGENT_ZIP_PARALLEL_THRESHOLD
+
+    if parallel:
+        executor = _get_verify_executor()
+        futures = [
+            executor.submit(_check_zip_members, path, names) for names in _split_members(members, workers)
+        ]
+        corrupt = [item for future in futures for item in future.result()]
+    else:
+        corrupt = _check_zip_members(path, [info.filename for info in members])
+
+    report = ZipVerifyReport(
+        member_count=len(members),
+        total_size=total_size,
+        parallel=parallel,
+        corrupt_members=[ZipMemberError(name=name, reason=reason) for name, reason in corrupt],
+    )
+    if not report.ok:
+        raise errors.ZipError(msg=f"智能体文件压缩包损坏, 共 {len(corrupt)} 个文件校验失败", data=report)
+    return report
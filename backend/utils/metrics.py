@@ -0,0 +1,124 @@
+import bisect
+import dataclasses
+import threading
+from collections.abc import Sequence
+from contextvars import ContextVar
+
+# 默认耗时分桶(秒)
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """累积分桶直方图(与 Prometheus histogram 语义一致)"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> None:
+        """
+        初始化直方图
+
+        :param buckets: 分桶上界, 自动追加 +Inf
+        :return:
+        """
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """记录一次观测值"""
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[idx] += 1
+            self._sum += value
+
+    def snapshot(self) -> dict:
+        """
+        获取当前统计快照
+
+        :return: 累积分桶计数、总数和总和
+        """
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        cumulative, acc = {}, 0
+        for bound, count in zip((*self.buckets, float("inf")), counts, strict=True):
+            acc += count
+            cumulative["+Inf" if bound == float("inf") else str(bound)] = acc
+        return {"buckets": cumulative, "count": acc, "sum": total}
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{_escape_label(value)}"' for key, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def render_histogram(name: str, labels: dict[str, str], snapshot: dict) -> list[str]:
+    """
+    将直方图快照渲染为 Prometheus 文本格式
+
+    :param name: 指标名称
+    :param labels: 标签
+    :param snapshot: Histogram.snapshot() 的结果
+    :return:
+    """
+    lines = [
+        f"{name}_bucket{_format_labels({**labels, 'le': bound})} {count}"
+        for bound, count in snapshot["buckets"].items()
+    ]
+    lines.append(f"{name}_count{_format_labels(labels)} {snapshot['count']}")
+    lines.append(f"{name}_sum{_format_labels(labels)} {snapshot['sum']}")
+    return lines
+
+
+class LabeledHistogram:
+    """按标签值分组的直方图族"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], buckets: Sequence[float]) -> None:
+        """
+        初始化直方图族
+
+        :param name: 指标名称
+        :param documentation: 指标说明
+        :param labelnames: 标签名称
+        :param buckets: 分桶上界
+        :return:
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = buckets
+        self._children: dict[tuple[str, ...], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str) -> Histogram:
+        """获取标签值对应的直方图"""
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, Histogram(self.buckets))
+        return child
+
+    def render(self) -> list[str]:
+        """渲染为 Prometheus 文本格式"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for values, child in list(self._children.items()):
+            lines.extend(render_histogram(self.name, dict(zip(self.labelnames, values, strict=True)), child.snapshot()))
+        return lines
+
+
+@dataclasses.dataclass
+class RequestTimings:
+    """单个请求内的数据库耗时统计"""
+
+    queries: int = 0
+    db_time: float = 0.0
+    pool_wait: float = 0.0
+
+
+# 当前请求的统计, 由指标中间件设置, 数据库事件钩子累加
+request_timings: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
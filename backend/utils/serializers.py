@@ -1,11 +1,33 @@
 from typing import Any
 
 from msgspec import json
+from pydantic import BaseModel
 from starlette.responses import JSONResponse
 
 
+def _enc_hook(obj: Any) -> Any:
+    """msgspec 不支持的类型转换, 目前仅处理 pydantic 模型"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise NotImplementedError(f"Objects of type {type(obj).__name__} are not supported")
+
+
+# Encoder 复用内部缓冲区, 比每次调用 json.encode 更快
+_encoder = json.Encoder(enc_hook=_enc_hook)
+
+
+def encode_json(obj: Any) -> bytes:
+    """
+    使用 msgspec 序列化为 JSON
+
+    :param obj: 待序列化对象, 支持内置类型、datetime、dataclass 与 pydantic 模型
+    :return:
+    """
+    return _encoder.encode(obj)
+
+
 class MsgSpecJsonResponse(JSONResponse):
     """使用 MsgSpec 进行 JSON 序列化的响应类"""
 
     def render(self, content: Any) -> bytes:
-        return json.encode(content)
+        return _encoder.encode(content)
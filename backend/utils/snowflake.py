@@ -1,3 +1,4 @@
+import threading
 import time
 from dataclasses import dataclass
 
@@ -33,6 +34,9 @@ class SnowflakeConfig:
     DEFAULT_WORKER_ID: int = 0
     DEFAULT_SEQUENCE: int = 0
 
+    # 允许的时钟偏差(毫秒): 时钟小幅回拨时沿用上次时间戳, 序列号用尽时最多借用的未来毫秒数
+    MAX_CLOCK_SKEW_MS: int = 5
+
 
 class Snowflake:
     """雪花算法类"""
@@ -59,48 +63,114 @@ class Snowflake:
         self.cluster_id = cluster_id
         self.sequence = sequence
         self.last_timestamp = -1
+        # 节点租约的本地有效期 (time.monotonic), 为空表示节点不受租约约束
+        self.lease_deadline: float | None = None
+        self._lock = threading.Lock()
 
-    @staticmethod
-    def _current_millis() -> int:
-        """返回当前毫秒时间戳"""
-        return int(time.time() * 1000)
+    def reconfigure(self, cluster_id: int, node_id: int) -> None:
+        """
+        切换集群 ID 与节点 ID, 用于启动时按租约分配节点
 
-    def _next_millis(self, last_timestamp: int) -> int:
+        :param cluster_id: 集群 ID (0-31)
+        :param node_id: 节点 ID (0-31)
+        :return:
         """
-        等待至下一毫秒
+        if cluster_id < 0 or cluster_id > SnowflakeConfig.MAX_DATACENTER_ID:
+            raise errors.RequestError(msg=f"集群编号必须在 0-{SnowflakeConfig.MAX_DATACENTER_ID} 之间")
+        if node_id < 0 or node_id > SnowflakeConfig.MAX_WORKER_ID:
+            raise errors.RequestError(msg=f"节点编号必须在 0-{SnowflakeConfig.MAX_WORKER_ID} 之间")
+        with self._lock:
+            self.cluster_id = cluster_id
+            self.node_id = node_id
 
-        :param last_timestamp: 上次生成 ID 的时间戳
+    def set_lease_deadline(self, deadline: float | None) -> None:
+        """
+        设置节点租约的本地有效期, 超过后拒绝生成 ID 直到续期成功
+
+        :param deadline: time.monotonic() 时间, 为空表示不限制
         :return:
         """
-        timestamp = self._current_millis()
-        while timestamp <= last_timestamp:
-            time.sleep((last_timestamp - timestamp + 1) / 1000.0)
-            timestamp = self._current_millis()
-        return timestamp
+        with self._lock:
+            self.lease_deadline = deadline
 
-    def generate(self) -> int:
-        """生成雪花 ID"""
-        timestamp = self._current_millis()
+    @staticmethod
+    def _current_millis() -> int:
+        """返回当前毫秒时间戳"""
+        return time.time_ns() // 1_000_000
 
+    def _reserve(self, count: int) -> tuple[int, int, int]:
+        """
+        预留同一毫秒内连续的序列号, 调用方需持有锁
+
+        序列号用尽时直接借用下一毫秒而不是等待, 借用超过允许偏差后才休眠等待时钟追上
+
+        :param count: 期望预留的数量
+        :return: (时间戳, 起始序列号, 实际预留数量)
+        """
+        if self.lease_deadline is not None and time.monotonic() >= self.lease_deadline:
+            raise errors.ServerError(msg="雪花 ID 节点租约未能续期, 暂停生成 ID")
+        now = self._current_millis()
+        timestamp = now
         if timestamp < self.last_timestamp:
-            raise errors.ServerError(msg=f"系统时间倒退，拒绝生成 ID 直到 {self.last_timestamp}")
+            if self.last_timestamp - timestamp > SnowflakeConfig.MAX_CLOCK_SKEW_MS:
+                raise errors.ServerError(msg=f"系统时间倒退，拒绝生成 ID 直到 {self.last_timestamp}")
+            timestamp = self.last_timestamp
 
         if timestamp == self.last_timestamp:
-            self.sequence = (self.sequence + 1) & SnowflakeConfig.SEQUENCE_MASK
-            if self.sequence == 0:
-                timestamp = self._next_millis(self.last_timestamp)
+            start = self.sequence + 1
+            if start > SnowflakeConfig.SEQUENCE_MASK:
+                timestamp += 1
+                start = 0
         else:
-            self.sequence = 0
+            start = 0
+
+        ahead = timestamp - now
+        if ahead > SnowflakeConfig.MAX_CLOCK_SKEW_MS:
+            time.sleep((ahead - SnowflakeConfig.MAX_CLOCK_SKEW_MS) / 1000.0)
 
+        reserved = min(count, SnowflakeConfig.SEQUENCE_MASK + 1 - start)
         self.last_timestamp = timestamp
+        self.sequence = start + reserved - 1
+        return timestamp, start, reserved
 
+    def _base(self, timestamp: int) -> int:
         return (
             ((timestamp - SnowflakeConfig.EPOCH) << SnowflakeConfig.TIMESTAMP_LEFT_SHIFT)
             | (self.cluster_id << SnowflakeConfig.DATACENTER_ID_SHIFT)
             | (self.node_id << SnowflakeConfig.WORKER_ID_SHIFT)
-            | self.sequence
         )
 
+    def generate(self) -> int:
+        """生成雪花 ID"""
+        with self._lock:
+            timestamp, sequence, _ = self._reserve(1)
+            return self._base(timestamp) | sequence
+
+    def generate_batch(self, n: int) -> list[int]:
+        """
+        批量生成雪花 ID, 每毫秒内的序列号区间一次预留, 返回值单调递增
+
+        :param n: 数量
+        :return:
+        """
+        ids: list[int] = []
+        with self._lock:
+            while len(ids) < n:
+                timestamp, start, reserved = self._reserve(n - len(ids))
+                base = self._base(timestamp)
+                ids.extend(range(base | start, (base | start) + reserved))
+        return ids
+
+    @staticmethod
+    def floor_id(timestamp: int) -> int:
+        """
+        指定毫秒时间戳对应的最小雪花 ID, 用于按时间范围过滤或分区
+
+        :param timestamp: 毫秒时间戳
+        :return:
+        """
+        return max(timestamp - SnowflakeConfig.EPOCH, 0) << SnowflakeConfig.TIMESTAMP_LEFT_SHIFT
+
     @staticmethod
     def parse_id(snowflake_id: int) -> SnowflakeInfo:
         """
@@ -118,11 +188,11 @@ class Snowflake:
 
         return SnowflakeInfo(
             timestamp=timestamp,
-            datetime=time.strftime(settings.DATETIME_FORMAT, time.localtime(timestamp / 1000)),
+            datetime=time.strftime(settings.DATATIME_FORMAT, time.localtime(timestamp / 1000)),
             cluster_id=cluster_id,
             node_id=node_id,
             sequence=sequence,
         )
 
 
-snowflake = Snowflake()
+snowflake = Snowflake(settings.SNOWFLAKE_CLUSTER_ID, settings.SNOWFLAKE_NODE_ID)
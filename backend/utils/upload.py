@@ -1,14 +1,25 @@
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from io import BytesIO
-from typing import BinaryIO
+from typing import Any, BinaryIO, TypeVar
 
 from minio import Minio
 from minio.error import S3Error
 
 from backend.core.conf import settings
 
+T = TypeVar("T")
+
 
 class MinIOUploader:
-    """MinIO 文件上传工具类"""
+    """
+    MinIO 文件上传工具类
+
+    minio 官方客户端为同步实现, 所有网络调用都投递到有界线程池中执行, 并通过信号量限制同时进行的上传数量,
+    上传大文件时不会阻塞事件循环
+    """
 
     def __init__(self):
         """初始化 MinIO 客户端"""
@@ -16,29 +27,50 @@ class MinIOUploader:
             settings.MINIO_ENDPOINT,
             access_key=settings.MINIO_ROOT_USER,
             secret_key=settings.MINIO_ROOT_PASSWORD,
-            secure=False,  # 如果使用 HTTPS，设置为 True
+            secure=settings.MINIO_SECURE,
         )
         self.bucket_name = settings.AGENT_BUCKET
-        self._ensure_bucket_exists()
-
-    def _ensure_bucket_exists(self):
-        """确保 bucket 存在，不存在则创建"""
-        try:
-            if not self.client.bucket_exists(self.bucket_name):
-                self.client.make_bucket(self.bucket_name)
-        except S3Error as e:
-            raise Exception(f"创建 bucket 失败: {str(e)}")
-
-    def upload_file(
-        self, object_name: str, file_data: bytes | BinaryIO, content_type: str = "application/octet-stream"
+        self._executor = ThreadPoolExecutor(max_workers=settings.MINIO_MAX_WORKERS, thread_name_prefix="minio")
+        self._upload_semaphore = asyncio.Semaphore(settings.MINIO_UPLOAD_CONCURRENCY)
+        self._bucket_lock = asyncio.Lock()
+        self._bucket_ready = False
+
+    async def _run(self, func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+        """在线程池中执行同步的 minio 调用"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def _ensure_bucket_exists(self) -> None:
+        """确保 bucket 存在，不存在则创建(首次使用时检查一次)"""
+        if self._bucket_ready:
+            return
+        async with self._bucket_lock:
+            if self._bucket_ready:
+                return
+            try:
+                if not await self._run(self.client.bucket_exists, self.bucket_name):
+                    await self._run(self.client.make_bucket, self.bucket_name)
+            except S3Error as e:
+                raise Exception(f"创建 bucket 失败: {str(e)}")
+            self._bucket_ready = True
+
+    async def upload_file(
+        self,
+        object_name: str,
+        file_data: bytes | BinaryIO,
+        content_type: str = "application/octet-stream",
+        length: int | None = None,
     ) -> str:
         """
         上传文件到 MinIO
 
+        文件大于 ``MINIO_UPLOAD_PART_SIZE`` 或长度未知时以分片方式流式上传, 不会一次性读入内存
+
         Args:
             object_name: 对象名称（文件路径）
             file_data: 文件数据（bytes 或文件对象）
             content_type: 文件类型
+            length: 数据长度, 为 None 时自动获取, 不可 seek 的流传 -1
 
         Returns:
             str: 文件的下载路径
@@ -46,30 +78,70 @@ class MinIOUploader:
         Raises:
             Exception: 上传失败时抛出异常
         """
-        try:
-            # 如果是 bytes，转换为 BytesIO
-            if isinstance(file_data, bytes):
-                file_data = BytesIO(file_data)
-                file_size = len(file_data.getvalue())
-                file_data.seek(0)
-            else:
-                # 获取文件大小
+        if isinstance(file_data, bytes):
+            length = len(file_data)
+            file_data = BytesIO(file_data)
+        elif length is None:
+            if file_data.seekable():
                 file_data.seek(0, 2)
-                file_size = file_data.tell()
+                length = file_data.tell()
                 file_data.seek(0)
+            else:
+                length = -1
+
+        await self._ensure_bucket_exists()
+        async with self._upload_semaphore:
+            try:
+                await self._run(
+                    self.client.put_object,
+                    self.bucket_name,
+                    object_name,
+                    file_data,
+                    length,
+                    content_type=content_type,
+                    part_size=settings.MINIO_UPLOAD_PART_SIZE,
+                    num_parallel_uploads=settings.MINIO_UPLOAD_PARALLEL_PARTS,
+                )
+            except S3Error as e:
+                raise Exception(f"文件上传失败: {str(e)}")
+
+        return self.get_object_path(object_name)
+
+    async def upload_local_file(
+        self, object_name: str, file_path: str, content_type: str = "application/octet-stream"
+    ) -> str:
+        """
+        以分片方式流式上传本地文件到 MinIO
 
-            # 上传文件
-            self.client.put_object(
-                self.bucket_name, object_name, file_data, file_size, content_type=content_type
-            )
-
-            # 返回文件路径
-            return f"{settings.MINIO_ENDPOINT}/{self.bucket_name}/{object_name}"
+        Args:
+            object_name: 对象名称（文件路径）
+            file_path: 本地文件路径
+            content_type: 文件类型
 
-        except S3Error as e:
-            raise Exception(f"文件上传失败: {str(e)}")
+        Returns:
+            str: 文件的下载路径
 
-    def delete_file(self, object_name: str):
+        Raises:
+            Exception: 上传失败时抛出异常
+        """
+        await self._ensure_bucket_exists()
+        async with self._upload_semaphore:
+            try:
+                await self._run(
+                    self.client.fput_object,
+                    self.bucket_name,
+                    object_name,
+                    file_path,
+                    content_type=content_type,
+                    part_size=settings.MINIO_UPLOAD_PART_SIZE,
+                    num_parallel_uploads=settings.MINIO_UPLOAD_PARALLEL_PARTS,
+                )
+            except S3Error as e:
+                raise Exception(f"文件上传失败: {str(e)}")
+
+        return self.get_object_path(object_name)
+
+    async def delete_file(self, object_name: str) -> None:
         """
         删除 MinIO 中的文件
 
@@ -80,10 +152,22 @@ class MinIOUploader:
             Exception: 删除失败时抛出异常
         """
         try:
-            self.client.remove_object(self.bucket_name, object_name)
+            await self._run(self.client.remove_object, self.bucket_name, object_name)
         except S3Error as e:
             raise Exception(f"文件删除失败: {str(e)}")
 
+    def get_object_path(self, object_name: str) -> str:
+        """
+        获取文件的存储路径
+
+        Args:
+            object_name: 对象名称（文件路径）
+
+        Returns:
+            str: 文件的存储路径
+        """
+        return f"{settings.MINIO_ENDPOINT}/{self.bucket_name}/{object_name}"
+
     def get_file_url(self, object_name: str) -> str:
         """
         获取文件的访问 URL
@@ -96,6 +180,10 @@ class MinIOUploader:
         """
         return f"http://{settings.MINIO_ENDPOINT}/{self.bucket_name}/{object_name}"
 
+    def shutdown(self) -> None:
+        """关闭上传线程池"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
 
 # 单例模式
 minio_uploader = MinIOUploader()
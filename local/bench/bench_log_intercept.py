@@ -0,0 +1,49 @@
+"""
+标准库日志转发基准测试
+
+对比 InterceptHandler 回溯栈帧与不回溯栈帧两种模式下转发标准库日志的耗时, 日志写入空 sink 以排除 IO 影响
+
+用法: python local/bench/bench_log_intercept.py [--rows 100000]
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from loguru import logger  # noqa: E402
+
+from backend.common.log import InterceptHandler, _needs_caller_location  # noqa: E402
+
+
+def bench(caller_location: bool, rows: int) -> float:
+    std_logger = logging.getLogger("bench.intercept")
+    std_logger.handlers = [InterceptHandler(caller_location=caller_location)]
+    std_logger.propagate = False
+    std_logger.setLevel(logging.INFO)
+    start = time.perf_counter()
+    for i in range(rows):
+        std_logger.info("request %d", i)
+    return (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(lambda _: None, level="INFO", format="{name}:{function}:{line} {message}")
+
+    print(f"rows={args.rows} current settings caller_location={_needs_caller_location()}")
+    with_frame = bench(True, args.rows)
+    without_frame = bench(False, args.rows)
+    print(f"caller_location  on {with_frame:8.1f} ms  off {without_frame:8.1f} ms  x{with_frame / without_frame:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+响应序列化基准测试
+
+对比 /all 类列表接口在不同响应路径下的耗时, 不依赖数据库, 使用内存中的 ORM 对象模拟查询结果
+
+用法: python local/bench/bench_response.py [--rows 500] [--requests 200]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from backend.app.env.model.env_template import EnvTemplate  # noqa: E402
+from backend.app.env.schema.env_template import GetEnvTemplateDetail  # noqa: E402
+from backend.common.response.response_schema import ResponseSchemaModel, response_base  # noqa: E402
+from backend.utils.serializers import MsgSpecJsonResponse  # noqa: E402
+
+
+def make_rows(n: int) -> list[EnvTemplate]:
+    """构造带嵌套 param_schema 的 ORM 对象"""
+    rows = []
+    for i in range(n):
+        row = EnvTemplate(
+            name=f"template_{i}",
+            param_schema={
+                "type": "object",
+                "properties": {
+                    f"param_{j}": {"type": "number", "default": j * 0.5, "enum": list(range(8))} for j in range(16)
+                },
+                "required": [f"param_{j}" for j in range(4)],
+            },
+        )
+        row.id = i + 1
+        rows.append(row)
+    return rows
+
+
+def make_app(rows: list[EnvTemplate], response_class: type[JSONResponse], *, fast: bool = False) -> FastAPI:
+    app = FastAPI(default_response_class=response_class)
+
+    @app.get("/all")
+    async def get_all() -> ResponseSchemaModel[list[GetEnvTemplateDetail]]:
+        if fast:
+            return response_base.fast_success(data=rows, schema=list[GetEnvTemplateDetail])
+        return response_base.success(data=rows)
+
+    return app
+
+
+async def run(app: FastAPI, requests: int) -> tuple[float, int]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        body = (await client.get("/all")).content
+        start = time.perf_counter()
+        for _ in range(requests):
+            (await client.get("/all")).raise_for_status()
+        return (time.perf_counter() - start) / requests * 1000, len(body)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    variants = {
+        "JSONResponse (stdlib json)": make_app(rows, JSONResponse),
+        "MsgSpecJsonResponse": make_app(rows, MsgSpecJsonResponse),
+        "response_base.fast_success": make_app(rows, MsgSpecJsonResponse, fast=True),
+    }
+    print(f"rows={args.rows} requests={args.requests}")
+    baseline = None
+    for name, app in variants.items():
+        ms, size = asyncio.run(run(app, args.requests))
+        baseline = baseline or ms
+        print(f"{name:<32} {ms:8.2f} ms/req  {size / 1024:8.1f} KiB  x{baseline / ms:.2f}")
+
+
+if __name__ == "__main__":
+    main()
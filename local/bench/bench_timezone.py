@@ -0,0 +1,68 @@
+"""
+TimeZone 类型绑定参数处理基准测试
+
+对 10 万行 datetime 分别执行旧实现与当前实现的绑定参数处理, 覆盖目标时区、UTC 与无时区三种输入
+
+用法: python local/bench/bench_timezone.py [--rows 100000]
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta, timezone as datetime_timezone
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy.dialects import mysql, postgresql  # noqa: E402
+
+from backend.common.model import TimeZone  # noqa: E402
+from backend.utils.timezone import timezone  # noqa: E402
+
+
+class LegacyTimeZone(TimeZone):
+    """优化前的实现: 每个值都调用 timezone.now() 读取当前偏移"""
+
+    def process_bind_param(self, value, dialect):
+        if value is not None and value.utcoffset() != timezone.now().utcoffset():
+            value = timezone.f_datetime(value)
+        return value
+
+
+def make_values(rows: int) -> dict[str, list[datetime]]:
+    base = timezone.now()
+    return {
+        "target tz": [base + timedelta(seconds=i) for i in range(rows)],
+        "utc": [(base + timedelta(seconds=i)).astimezone(datetime_timezone.utc) for i in range(rows)],
+        "naive": [(base + timedelta(seconds=i)).replace(tzinfo=None) for i in range(rows)],
+    }
+
+
+def bench(type_: TimeZone, dialect, values: list[datetime]) -> float:
+    process = type_.bind_processor(dialect) or (lambda v: v)
+    start = time.perf_counter()
+    for value in values:
+        process(value)
+    return (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    values = make_values(args.rows)
+    print(f"rows={args.rows}")
+    for dialect in (postgresql.asyncpg.dialect(), mysql.aiomysql.dialect()):
+        for name, data in values.items():
+            legacy = bench(LegacyTimeZone(), dialect, data)
+            current = bench(TimeZone(), dialect, data)
+            print(
+                f"{dialect.name:<10} {name:<10} legacy {legacy:8.1f} ms  current {current:8.1f} ms  "
+                f"x{legacy / current:.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()